@@ -0,0 +1,294 @@
+"""
+Throughput benchmarks for the framework adapters.
+
+Each adapter serves the same resource in-process (no sockets). The
+asynchronous ones (ASGI & Tornado) have ``CONCURRENCY`` requests in flight at
+a time, while the WSGI ones (the plain WSGI adapter, Flask, Django & Pyramid)
+are called one request after another, measuring the time per call.
+
+Run with ``python benchmarks/adapters.py`` from the root of the checkout.
+"""
+import asyncio
+import os
+import sys
+import time
+import timeit
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restless.asgi import ASGIResource
+from restless.preparers import FieldsPreparer
+from restless.tnd import TornadoResource
+from restless.wsgi import WSGIResource
+
+
+CONCURRENCY = 50
+ITEMS = [
+    {'id': i, 'title': 'post {}'.format(i), 'author': 'user{}'.format(i % 10)}
+    for i in range(20)
+]
+PREPARER = FieldsPreparer(fields={
+    'id': 'id',
+    'title': 'title',
+    'author': 'author',
+})
+
+
+class AsgiPostResource(ASGIResource):
+    preparer = PREPARER
+
+    async def list(self):
+        # Stands in for a query.
+        await asyncio.sleep(0)
+        return ITEMS
+
+
+class TornadoPostResource(TornadoResource):
+    preparer = PREPARER
+
+    async def list(self):
+        await asyncio.sleep(0)
+        return ITEMS
+
+
+class WsgiPostResource(WSGIResource):
+    preparer = PREPARER
+
+    def list(self):
+        return ITEMS
+
+
+def make_asgi_request(app):
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/posts/',
+        'query_string': b'',
+        'headers': [(b'accept', b'application/json')],
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def request():
+        sent = []
+
+        async def receive():
+            return messages[0]
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        assert sent[0]['status'] == 200
+        return sent
+
+    return request
+
+
+def make_tornado_request(app):
+    from tornado import httputil
+
+    class FakeConnection(httputil.HTTPConnection):
+        # Collects the response instead of writing it to a socket.
+        def __init__(self):
+            self.sent = []
+            self.finished = asyncio.get_event_loop().create_future()
+
+        def set_close_callback(self, callback):
+            pass
+
+        def write_headers(self, start_line, headers, chunk=None):
+            self.sent.append(start_line)
+            return self.write(chunk or b'')
+
+        def write(self, chunk):
+            self.sent.append(chunk)
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(None)
+            return future
+
+        def finish(self):
+            self.finished.set_result(None)
+
+    async def request():
+        connection = FakeConnection()
+        req = httputil.HTTPServerRequest(
+            method='GET',
+            uri='/posts/',
+            headers=httputil.HTTPHeaders({'Accept': 'application/json'}),
+            connection=connection
+        )
+        app.find_handler(req).execute()
+        await connection.finished
+        assert connection.sent[0].code == 200
+        return connection.sent
+
+    return request
+
+
+def make_wsgi_request(app):
+    def start_response(status, headers, exc_info=None):
+        assert status.startswith('200')
+
+    def request():
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': '/posts/',
+            'QUERY_STRING': '',
+            'HTTP_ACCEPT': 'application/json',
+        }
+        setup_testing_defaults(environ)
+        result = app(environ, start_response)
+
+        try:
+            return b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    return request
+
+
+def make_flask_app():
+    import flask
+    from restless.fl import FlaskResource
+
+    class FlaskPostResource(FlaskResource):
+        preparer = PREPARER
+
+        def list(self):
+            return ITEMS
+
+    app = flask.Flask('benchmark')
+    FlaskPostResource.add_url_rules(app, rule_prefix='/posts/')
+    return app
+
+
+def make_django_app():
+    from django.conf import settings
+    from django.urls import include, path
+    from restless.dj import DjangoResource
+
+    class DjangoPostResource(DjangoResource):
+        preparer = PREPARER
+
+        def list(self):
+            return ITEMS
+
+    # This module doubles as the URLconf.
+    global urlpatterns
+    urlpatterns = [path('posts/', include(DjangoPostResource.urls()))]
+    settings.configure(
+        ALLOWED_HOSTS=['*'],
+        ROOT_URLCONF=__name__,
+        MIDDLEWARE=[],
+    )
+
+    import django
+    from django.core.wsgi import get_wsgi_application
+
+    django.setup()
+    return get_wsgi_application()
+
+
+def make_pyramid_app():
+    from pyramid.config import Configurator
+    from restless.pyr import PyramidResource
+
+    class PyramidPostResource(PyramidResource):
+        preparer = PREPARER
+
+        def list(self):
+            return ITEMS
+
+    config = Configurator()
+    config = PyramidPostResource.add_views(config, '/posts/')
+    return config.make_wsgi_app()
+
+
+def bench_wsgi(name, make_app, number):
+    try:
+        app = make_app()
+    except ImportError:
+        print('{:<12} not installed'.format(name))
+        return None
+
+    request = make_wsgi_request(app)
+    request()
+    best = min(timeit.repeat(request, number=number, repeat=5)) / number
+    print('{:<12} {:>10.0f} req/s {:>8.1f} us/req'.format(
+        name, 1 / best, best * 1e6
+    ))
+    return best
+
+
+def bench(name, request, total):
+    async def run():
+        for start in range(0, total, CONCURRENCY):
+            await asyncio.gather(*[request() for i in range(CONCURRENCY)])
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        loop.run_until_complete(run())
+        best = None
+
+        for i in range(5):
+            started = time.perf_counter()
+            loop.run_until_complete(run())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    print('{:<12} {:>10.0f} req/s {:>8.1f} us/req'.format(
+        name, total / best, best / total * 1e6
+    ))
+    return total / best
+
+
+def main():
+    from tornado import web
+
+    total = 2000
+    print('{} requests, {} at a time, {} items each'.format(
+        total, CONCURRENCY, len(ITEMS)
+    ))
+    asgi = bench(
+        'asgi',
+        make_asgi_request(AsgiPostResource.as_app('/posts/')),
+        total
+    )
+    tornado = bench(
+        'tornado',
+        make_tornado_request(web.Application([
+            (r'/posts/', TornadoPostResource.as_list()),
+        ])),
+        total
+    )
+    print('speedup (asgi): {:.2f}x'.format(asgi / tornado))
+    print()
+
+    number = 2000
+    print('{} requests, one at a time, {} items each'.format(number, len(ITEMS)))
+    wsgi = bench_wsgi(
+        'wsgi',
+        lambda: WsgiPostResource.as_app('/posts/'),
+        number
+    )
+
+    for name, make_app in (
+        ('flask', make_flask_app),
+        ('django', make_django_app),
+        ('pyramid', make_pyramid_app),
+    ):
+        best = bench_wsgi(name, make_app, number)
+
+        if best is not None:
+            print('speedup (wsgi vs {}): {:.2f}x'.format(name, best / wsgi))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Micro-benchmarks for the preparers.
+
+Run with ``python benchmarks/preparers.py`` from the root of the checkout.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restless.preparers import (CollectionSubPreparer, FieldsPreparer,
+                                SubPreparer)
+
+
+class Obj(object):
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class RecursiveFieldsPreparer(FieldsPreparer):
+    """
+    The original, recursive ``lookup_data``, kept around for comparison.
+    """
+    def prepare(self, data):
+        result = {}
+
+        for fieldname, lookup in self.fields.items():
+            result[fieldname] = self.lookup_data(lookup, data)
+
+        return result
+
+    def lookup_data(self, lookup, data):
+        value = data
+        parts = lookup.split('.')
+
+        if not parts or not parts[0]:
+            return value
+
+        part = parts[0]
+        remaining_lookup = '.'.join(parts[1:])
+
+        if callable(getattr(data, 'keys', None)) and hasattr(data, '__getitem__'):
+            value = data[part]
+        elif data is not None:
+            value = getattr(data, part)
+
+        if callable(value) and not hasattr(value, 'db_manager'):
+            value = value()
+
+        if not remaining_lookup:
+            return value
+
+        return self.lookup_data(remaining_lookup, value)
+
+
+FIELDS = dict(
+    [('field_{}'.format(i), 'field_{}'.format(i)) for i in range(15)] +
+    [
+        ('author', 'user.username'),
+        ('author_id', 'user.pk'),
+        ('email', 'user.profile.email'),
+        ('city', 'user.profile.address.city'),
+        ('upper', 'title.upper'),
+    ]
+)
+
+
+def nested_fields():
+    fields = dict(FIELDS)
+    fields['profile'] = SubPreparer('user.profile', FieldsPreparer(fields={
+        'email': 'email',
+        'city': 'address.city',
+    }))
+    fields['tags'] = CollectionSubPreparer('tags', FieldsPreparer(fields={
+        'tag': 'slug',
+    }))
+    return fields
+
+
+def make_items(count=500):
+    items = []
+
+    for i in range(count):
+        attrs = dict(('field_{}'.format(n), n) for n in range(15))
+        attrs['title'] = 'post {}'.format(i)
+        attrs['tags'] = [{'slug': 'a'}, {'slug': 'b'}, {'slug': 'c'}]
+        attrs['user'] = Obj(
+            pk=i,
+            username='user{}'.format(i),
+            profile=Obj(
+                email='user{}@example.com'.format(i),
+                address={'city': 'Lawrence'},
+            ),
+        )
+        items.append(Obj(**attrs))
+
+    return items
+
+
+def bench(name, func, number, item_count):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    per_item = best / number / item_count
+    print('{:<24} {:>10.2f} us/item'.format(name, per_item * 1e6))
+    return per_item
+
+
+def main():
+    items = make_items()
+    recursive = RecursiveFieldsPreparer(fields=FIELDS)
+    compiled = FieldsPreparer(fields=FIELDS)
+    generated = FieldsPreparer(fields=FIELDS, generate_code=True)
+    assert [recursive.prepare(i) for i in items] == [compiled.prepare(i) for i in items]
+    assert compiled.prepare_many(items) == [compiled.prepare(i) for i in items]
+    assert generated.prepare_many(items) == [compiled.prepare(i) for i in items]
+
+    item_count = len(items)
+    number = 20
+    print('{} items, {} fields'.format(item_count, len(FIELDS)))
+    old = bench(
+        'recursive lookup_data',
+        lambda: [recursive.prepare(i) for i in items],
+        number,
+        item_count
+    )
+    new = bench(
+        'compiled accessors',
+        lambda: [compiled.prepare(i) for i in items],
+        number,
+        item_count
+    )
+    bulk = bench(
+        'prepare_many',
+        lambda: compiled.prepare_many(items),
+        number,
+        item_count
+    )
+    gen = bench(
+        'generate_code',
+        lambda: generated.prepare_many(items),
+        number,
+        item_count
+    )
+    print('speedup (compiled): {:.2f}x'.format(old / new))
+    print('speedup (prepare_many): {:.2f}x'.format(old / bulk))
+    print('speedup (generate_code): {:.2f}x'.format(old / gen))
+
+    # ``prepare_many`` with & without the generated code, with nested
+    # ``SubPreparer``/``CollectionSubPreparer`` fields too.
+    columnar = FieldsPreparer(fields=nested_fields())
+    generated = FieldsPreparer(fields=nested_fields(), generate_code=True)
+    assert generated.prepare_many(items) == columnar.prepare_many(items)
+    print()
+    print('nested, prepare_many')
+    bulk = bench(
+        'columns',
+        lambda: columnar.prepare_many(items),
+        number,
+        item_count
+    )
+    gen = bench(
+        'generate_code',
+        lambda: generated.prepare_many(items),
+        number,
+        item_count
+    )
+    print('speedup (generate_code): {:.2f}x'.format(bulk / gen))
+
+
+if __name__ == '__main__':
+    main()
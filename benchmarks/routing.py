@@ -0,0 +1,86 @@
+"""
+Micro-benchmarks for ``restless.routing.Router``.
+
+Compares it with matching a list of regular expressions in turn (two per
+resource, the way the framework routers see ``urls()``, ``add_url_rules`` &
+``add_views``), looking up every resource's list & detail URLs.
+
+Run with ``python benchmarks/routing.py`` from the root of the checkout.
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restless.routing import Router
+from restless.wsgi import WSGIResource
+
+
+class PostResource(WSGIResource):
+    pass
+
+
+def make_regex_routes(count):
+    routes = []
+
+    for i in range(count):
+        prefix = 'api/v1/resource{}/'.format(i)
+        routes.append((re.compile(r'^{}$'.format(prefix)), 'list'))
+        routes.append((re.compile(r'^{}(?P<pk>[\w-]+)/$'.format(prefix)), 'detail'))
+
+    return routes
+
+
+def regex_match(routes, path):
+    path = path.lstrip('/')
+
+    for regex, endpoint in routes:
+        match = regex.match(path)
+
+        if match is not None:
+            return endpoint, match.groupdict()
+
+
+def make_paths(count):
+    paths = []
+
+    for i in range(count):
+        paths.append('/api/v1/resource{}/'.format(i))
+        paths.append('/api/v1/resource{}/{}/'.format(i, i * 7))
+
+    return paths
+
+
+def main():
+    for count in (10, 100, 500):
+        router = Router()
+
+        for i in range(count):
+            router.add('/api/v1/resource{}/'.format(i), PostResource)
+
+        routes = make_regex_routes(count)
+        paths = make_paths(count)
+
+        for path in paths:
+            assert router.match(path)[1] == regex_match(routes, path)[1]
+
+        number = max(1, 20000 // len(paths))
+        regex = min(timeit.repeat(
+            lambda: [regex_match(routes, path) for path in paths],
+            number=number,
+            repeat=5
+        )) / number / len(paths)
+        trie = min(timeit.repeat(
+            lambda: [router.match(path) for path in paths],
+            number=number,
+            repeat=5
+        )) / number / len(paths)
+        print('{:>4} resources  regex {:>8.2f} us  router {:>6.2f} us  speedup {:.1f}x'.format(
+            count, regex * 1e6, trie * 1e6, regex / trie
+        ))
+
+
+if __name__ == '__main__':
+    main()
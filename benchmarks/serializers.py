@@ -0,0 +1,67 @@
+"""
+Micro-benchmarks for the JSON backends.
+
+Run with ``python benchmarks/serializers.py`` from the root of the checkout.
+"""
+import datetime
+from decimal import Decimal
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restless.serializers import JSON_BACKENDS, JSONSerializer
+
+
+def make_data(count=500):
+    return {
+        'objects': [
+            {
+                'id': i,
+                'title': 'post {}'.format(i),
+                'author': 'user{}'.format(i % 10),
+                'price': Decimal('18.90'),
+                'uuid': uuid.UUID(int=i),
+                'created': datetime.datetime(2014, 3, 30, 12, 55, i % 60),
+                'tags': ['a', 'b', 'c'],
+                'published': bool(i % 2),
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def main():
+    data = make_data()
+    body = JSONSerializer().serialize(data)
+    number = 50
+    print('{} items, {} bytes'.format(len(data['objects']), len(body)))
+
+    for backend_class in JSON_BACKENDS:
+        try:
+            serializer = JSONSerializer(backend=backend_class.name)
+        except ImportError:
+            print('{:<12} not installed'.format(backend_class.name))
+            continue
+
+        dumps = min(timeit.repeat(
+            lambda: serializer.serialize(data),
+            number=number,
+            repeat=5
+        )) / number
+        loads = min(timeit.repeat(
+            lambda: serializer.deserialize(body),
+            number=number,
+            repeat=5
+        )) / number
+        print('{:<12} serialize {:>8.2f} ms  deserialize {:>8.2f} ms'.format(
+            backend_class.name,
+            dumps * 1e3,
+            loads * 1e3
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ from posts.models import Post
 
 
 class PostResource(DjangoResource):
+    # Fetch ``user`` alongside the posts, rather than once per post.
+    optimize_related = True
     preparer = FieldsPreparer(fields={
         'id': 'id',
         'title': 'title',
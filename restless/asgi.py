@@ -0,0 +1,349 @@
+import asyncio
+import threading
+from urllib.parse import parse_qs
+
+from .constants import OK
+from .resources import AsyncResource, _resolve
+from .utils import iter_chunks
+
+# ``get_event_loop`` is deprecated inside coroutines, but ``get_running_loop``
+# is only around from Python 3.7 on.
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class ReceiveStream(object):
+    """
+    A file-like view (with a ``read`` method) of an ASGI request body, for
+    code that expects to read the body synchronously.
+
+    Each ``read`` waits on the event loop for the next piece of the body, so
+    it can only be used from another thread (like the ones
+    ``ASGIResource.iter_request_items`` parses with). Calling it from the
+    event loop's own thread raises a ``RuntimeError``, rather than blocking
+    forever.
+    """
+    def __init__(self, resource, loop):
+        self.resource = resource
+        self.loop = loop
+        # Created by a coroutine, so this is the event loop's thread.
+        self.loop_thread = threading.get_ident()
+
+    def read(self, size=-1):
+        if threading.get_ident() == self.loop_thread:
+            raise RuntimeError(
+                "Can't read the request body synchronously from the event "
+                "loop. Use 'ASGIResource.read_body' instead."
+            )
+
+        future = asyncio.run_coroutine_threadsafe(
+            self.resource.receive_chunk(), self.loop
+        )
+        return future.result()
+
+
+async def _run_lifespan(receive, send, resource_classes):
+    # Answers the ASGI ``lifespan`` protocol, calling the ``startup`` (or
+    # ``shutdown``) of each of the resource classes in turn & telling the
+    # server whether the step failed (with the exception as the message).
+    while True:
+        message = await receive()
+        step = message['type'].split('.')[-1]
+
+        try:
+            for resource_class in resource_classes:
+                hook = getattr(resource_class, step, None)
+
+                if hook is not None:
+                    await _resolve(hook())
+        except Exception as err:
+            await send({
+                'type': 'lifespan.{}.failed'.format(step),
+                'message': str(err),
+            })
+        else:
+            await send({'type': 'lifespan.{}.complete'.format(step)})
+
+        if step == 'shutdown':
+            return
+
+
+class ASGIResource(AsyncResource):
+    """
+    An ASGI-specific ``Resource`` subclass.
+
+    ``as_list``, ``as_detail`` & ``as_view`` return ASGI applications for a
+    single endpoint (taking the URL arguments from the ``path_params`` of
+    the scope, which is where routers like Starlette's put them), while
+    ``as_app`` returns one handling all of the resource's endpoints.
+
+    As with any ``AsyncResource``, views may be ``async def``. The request
+    body is received a piece at a time (see ``iter_body``) & read in full
+    before the view runs, unless ``stream_requests`` is on, in which case
+    list endpoints get an asynchronous iterator of the items in
+    ``self.data`` (use ``async for``). Streamed responses are sent a chunk
+    at a time.
+
+    Example::
+
+        class PostResource(ASGIResource):
+            async def list(self):
+                return await db.fetch_all('SELECT * FROM posts')
+
+        app = PostResource.as_app('/api/posts/')
+
+    """
+    def __init__(self, *args, **kwargs):
+        super(ASGIResource, self).__init__(*args, **kwargs)
+        self.request = None
+        self.receive = None
+        self.send = None
+        self.body = None
+        self.more_body = True
+        self.disconnected = False
+        self._headers = None
+        self._params = None
+
+    @classmethod
+    def as_view(cls, view_type, *init_args, **init_kwargs):
+        """
+        Returns an ASGI application calling the ``view_type`` endpoint, with
+        the ``path_params`` of the scope as keyword arguments.
+
+        :param view_type: Should be one of ``list``, ``detail`` or ``custom``.
+        :type view_type: string
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+
+        :returns: ASGI application
+        """
+        async def app(scope, receive, send):
+            if scope['type'] == 'lifespan':
+                return await cls.handle_lifespan(receive, send)
+
+            inst = cls(*init_args, **init_kwargs)
+            inst.request, inst.receive, inst.send = scope, receive, send
+            return await inst.handle(view_type, **scope.get('path_params', {}))
+
+        return app
+
+    @classmethod
+    def as_app(cls, prefix='/', *init_args, **init_kwargs):
+        """
+        Returns an ASGI application for all of the resource's endpoints.
+
+        ``prefix`` itself goes to ``list`` & ``prefix<pk>/`` goes to
+        ``detail``, unless ``<pk>`` names a custom endpoint in
+        ``http_methods``. Anything else gets a ``404 Not Found``. (See
+        ``restless.routing.Router`` for serving several resources.)
+
+        :param prefix: (Optional) The start of the URLs to handle. Default is
+            ``/``
+        :type prefix: string
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+
+        :returns: ASGI application
+        """
+        from .routing import Router
+
+        router = Router()
+        router.add(prefix, cls, *init_args, **init_kwargs)
+        return router.as_asgi()
+
+    @classmethod
+    async def handle_lifespan(cls, receive, send):
+        """
+        Answers the ASGI ``lifespan`` protocol, calling ``startup`` &
+        ``shutdown``.
+
+        If either raises, the server is told the step failed (with the
+        exception as the message).
+        """
+        await _run_lifespan(receive, send, [cls])
+
+    @classmethod
+    def startup(cls):
+        """
+        Called once when the server starts (if it supports the ``lifespan``
+        protocol), for setting up shared resources like connection pools.
+
+        May be a coroutine. Does nothing by default.
+        """
+        pass
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Called once when the server stops, for cleaning up after
+        ``startup``.
+
+        May be a coroutine. Does nothing by default.
+        """
+        pass
+
+    def request_method(self):
+        return self.request['method']
+
+    def request_body(self):
+        # Only available once ``read_body`` has been awaited.
+        return self.body if self.body is not None else b''
+
+    def request_stream(self):
+        # Called from ``handle``, so the loop is running in this thread.
+        return ReceiveStream(self, _get_running_loop())
+
+    def request_header(self, name, default=None):
+        if self._headers is None:
+            # Only decoded when first needed, as many requests never look.
+            headers = {}
+
+            for key, value in self.request.get('headers', ()):
+                key = key.decode('latin-1').lower()
+                value = value.decode('latin-1')
+
+                if key in headers:
+                    value = headers[key] + ', ' + value
+
+                headers[key] = value
+
+            self._headers = headers
+
+        return self._headers.get(name.lower(), default)
+
+    def request_param(self, name, default=None):
+        if self._params is None:
+            self._params = parse_qs(
+                self.request.get('query_string', b'').decode('latin-1')
+            )
+
+        values = self._params.get(name)
+
+        if not values:
+            return default
+
+        return values[-1]
+
+    async def receive_chunk(self):
+        """
+        Receives the next (non-empty) piece of the request body.
+
+        :returns: The piece, or ``b''`` once the body (or the connection) has
+            ended
+        :rtype: bytes
+        """
+        while self.more_body:
+            message = await self.receive()
+
+            if message['type'] == 'http.disconnect':
+                self.more_body = False
+                self.disconnected = True
+                break
+
+            self.more_body = message.get('more_body', False)
+
+            if message.get('body'):
+                return message['body']
+
+        return b''
+
+    async def iter_body(self):
+        """
+        Asynchronously iterates over the pieces of the request body as they
+        arrive, without holding on to them.
+        """
+        while True:
+            chunk = await self.receive_chunk()
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    async def read_body(self):
+        """
+        Receives the whole request body (once), making it available to
+        ``request_body``.
+
+        :returns: The body
+        :rtype: bytes
+        """
+        if self.body is None:
+            self.body = b''.join([chunk async for chunk in self.iter_body()])
+
+        return self.body
+
+    async def iter_request_items(self, deserializer):
+        """
+        Asynchronously iterates over the items of a request body as it
+        arrives, using the deserializer's ``deserialize_iter``.
+
+        The (synchronous) parsing happens in the default executor, reading
+        from a ``ReceiveStream``, ``stream_chunk_size`` items at a time.
+        """
+        loop = _get_running_loop()
+        chunks = iter_chunks(
+            deserializer.deserialize_iter(ReceiveStream(self, loop)),
+            self.stream_chunk_size
+        )
+
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+
+            if chunk is None:
+                return
+
+            for item in chunk:
+                yield item
+
+    async def deserialize_request(self, method, endpoint):
+        if self.stream_requests and endpoint == 'list':
+            deserializer = self.get_deserializer()
+
+            if hasattr(deserializer, 'deserialize_iter'):
+                return self.iter_request_items(deserializer)
+
+        await self.read_body()
+        return self.deserialize(method, endpoint, self.request_body())
+
+    async def build_response(self, data, status=OK):
+        content_type = self.get_content_type(status)
+        data = self.encode_response(data, status)
+        headers = [(b'content-type', content_type.encode('latin-1'))]
+        streamed = not isinstance(data, (str, bytes))
+
+        if not streamed:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+
+            headers.append((b'content-length', str(len(data)).encode('latin-1')))
+
+        for name, value in self.response_headers.items():
+            headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+
+        await self.send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+
+        if not streamed:
+            await self.send({'type': 'http.response.body', 'body': data})
+            return
+
+        for chunk in data:
+            if chunk:
+                await self.send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+
+        await self.send({'type': 'http.response.body', 'body': b''})
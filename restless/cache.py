@@ -0,0 +1,93 @@
+import uuid
+
+from .utils import LRUCache
+
+
+class ResponseCache(object):
+    """
+    Stores serialized responses, for ``Resource.response_cache``.
+
+    Entries live in memory (in an ``LRUCache`` holding at most ``maxsize``
+    entries, each expiring after ``ttl`` seconds if given) unless a
+    ``backend`` is provided. Any object with ``get(key, default=None)`` &
+    ``set(key, value)`` methods works as a backend. Keys are tuples of
+    hashable values, so backends needing string keys (like Django's cache
+    framework) should convert them.
+
+    Entries are grouped by namespace (normally one per resource class). Each
+    namespace has a generation token that's part of every key, so
+    ``invalidate`` just swaps in a new token. The old entries are never read
+    again & age out on their own. (If the token gets evicted, a new one is
+    made up, which only costs some extra misses.)
+
+    Example::
+
+        class PostResource(DjangoResource):
+            response_cache = ResponseCache(maxsize=1000, ttl=60)
+
+    """
+    def __init__(self, maxsize=1024, ttl=None, backend=None):
+        if backend is None:
+            backend = LRUCache(maxsize=maxsize, ttl=ttl)
+
+        self.backend = backend
+
+    def get_generation(self, namespace):
+        """
+        Returns the current generation token for a namespace.
+
+        :param namespace: The namespace
+        :type namespace: string
+
+        :returns: The token
+        :rtype: string
+        """
+        key = ('generation', namespace)
+        generation = self.backend.get(key)
+
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation)
+
+        return generation
+
+    def make_key(self, namespace, key):
+        """
+        Builds the full key for an entry in the namespace's current
+        generation.
+
+        Build it before running the view & store the result under it
+        afterwards. That way, if the namespace gets invalidated in the
+        meantime, a stale response won't be picked up.
+
+        :param namespace: The namespace
+        :type namespace: string
+
+        :param key: What identifies the entry within the namespace
+        :type key: tuple
+
+        :returns: The full key
+        :rtype: tuple
+        """
+        return (namespace, self.get_generation(namespace), key)
+
+    def get(self, key, default=None):
+        """
+        Returns the entry stored for ``key`` or ``default`` if it's missing.
+        """
+        return self.backend.get(key, default)
+
+    def set(self, key, value):
+        """
+        Stores an entry.
+        """
+        self.backend.set(key, value)
+
+    def invalidate(self, namespace):
+        """
+        Drops every entry in a namespace.
+
+        :param namespace: The namespace
+        :type namespace: string
+        """
+        self.backend.set(('generation', namespace), uuid.uuid4().hex)
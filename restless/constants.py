@@ -4,6 +4,8 @@ CREATED = 201
 ACCEPTED = 202
 NO_CONTENT = 204
 
+NOT_MODIFIED = 304
+
 BAD_REQUEST = 400
 UNAUTHORIZED = 401
 FORBIDDEN = 403
@@ -12,6 +14,7 @@ METHOD_NOT_ALLOWED = 405
 NOT_ACCEPTABLE = 406
 CONFLICT = 409
 GONE = 410
+LENGTH_REQUIRED = 411
 PRECONDITION_FAILED = 412
 UNSUPPORTED_MEDIA_TYPE = 415
 EXPECTATION_FAILED = 417
@@ -1,15 +1,505 @@
+import copy
+from itertools import chain
+
 import six
 
 from django.conf import settings
 from django.conf.urls import url
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
 from django.core.paginator import Paginator
-from django.http import HttpResponse, Http404
+from django.db.models import ForeignKey, Model
+from django.db.models.query import QuerySet
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from .constants import OK, NO_CONTENT
+from .constants import OK
 from .exceptions import NotFound, BadRequest
+from .data import Data
+from .preparers import CachedPreparer, FieldsPreparer, SubPreparer
 from .resources import Resource
+from .utils import iter_chunks
+
+
+def _get_relation(model, name):
+    """
+    Returns a ``(related_model, is_many)`` tuple if ``name`` is a relation
+    on the model (forward or reverse), otherwise ``None``.
+    """
+    for rel in model._meta.related_objects:
+        if rel.get_accessor_name() == name:
+            return rel.related_model, not rel.one_to_one
+
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+    # ``get_field`` also answers to the ``attname`` (``user_id``), which is
+    # a plain column.
+    if not field.is_relation or field.name != name or field.related_model is None:
+        return None
+
+    return field.related_model, field.many_to_many
+
+
+def _follow_lookup(model, lookup):
+    """
+    Walks a dotted lookup across the model's relations.
+
+    Returns a ``(model, path, many)`` tuple, where ``path`` is the list of
+    relation names followed, ``many`` is the index of the first to-many
+    relation in ``path`` (or ``None``) & ``model`` is the model the lookup
+    ends on (or ``None`` if it ends on something other than a relation).
+    """
+    path = []
+    many = None
+
+    for part in lookup.split('.'):
+        if not part:
+            break
+
+        relation = _get_relation(model, part)
+
+        if relation is None:
+            if many is not None and many == len(path) - 1:
+                # ``comments.all`` is how collections get spelled in a
+                # preparer.
+                if part == 'all':
+                    continue
+
+                # Anything else (a custom manager method, say) wouldn't use
+                # the prefetched objects anyway.
+                path.pop()
+                many = None
+
+            return None, path, many
+
+        model, is_many = relation
+        path.append(part)
+
+        if is_many and many is None:
+            many = len(path) - 1
+
+    return model, path, many
+
+
+def _get_inner_preparer(subpreparer):
+    """
+    Returns the preparer the nested data of a ``SubPreparer`` goes through.
+    Collapsed ones only read their ``collapse`` lookup.
+    """
+    if subpreparer.collapse is None:
+        return subpreparer.preparer
+
+    return FieldsPreparer(fields={'collapse': subpreparer.collapse})
+
+
+def _cached_on(preparer, key, build):
+    """
+    Caches something worked out from a preparer on the preparer itself (with
+    its variants), so it's thrown away if the preparer's ``fields`` are
+    reassigned & doesn't keep the preparer alive.
+    """
+    if isinstance(preparer, FieldsPreparer):
+        return preparer.get_variant(key, build)
+
+    return build()
+
+
+def _collect_related(model, preparer, prefix, many, select_related, prefetch_related):
+    if isinstance(preparer, CachedPreparer):
+        # Anything missing from the cache still gets prepared.
+        preparer = preparer.preparer
+
+    fields = getattr(preparer, 'fields', None)
+
+    if not isinstance(preparer, FieldsPreparer) or not fields:
+        return
+
+    for lookup in fields.values():
+        if isinstance(lookup, SubPreparer):
+            end_model, path, path_many = _follow_lookup(model, lookup.lookup)
+        else:
+            end_model, path, path_many = _follow_lookup(model, lookup)
+
+        full_path = prefix + path
+        full_many = many
+
+        if full_many is None and path_many is not None:
+            full_many = len(prefix) + path_many
+
+        if full_many is None:
+            if full_path:
+                select_related.add('__'.join(full_path))
+        else:
+            if full_many:
+                select_related.add('__'.join(full_path[:full_many]))
+
+            prefetch_related.add('__'.join(full_path))
+
+        if isinstance(lookup, SubPreparer) and end_model is not None:
+            _collect_related(
+                end_model,
+                _get_inner_preparer(lookup),
+                full_path,
+                full_many,
+                select_related,
+                prefetch_related
+            )
+
+
+def get_related_lookups(model, preparer):
+    """
+    Given a model & a preparer, works out which relations the preparer will
+    touch.
+
+    Relations reached only through foreign keys/one-to-ones are returned as
+    ``select_related`` lookups. Anything reached through a to-many relation
+    (``CollectionSubPreparer('comments.all', ...)``, for instance) is
+    returned as a ``prefetch_related`` lookup.
+
+    :param model: The model class the preparer will be handed instances of
+    :type model: ``django.db.models.Model`` subclass
+
+    :param preparer: The preparer to inspect
+    :type preparer: ``restless.preparers.Preparer``
+
+    :returns: A ``(select_related, prefetch_related)`` tuple of (sorted)
+        lists of lookup strings
+    :rtype: tuple
+    """
+    if isinstance(preparer, CachedPreparer):
+        # Anything missing from the cache still gets prepared.
+        preparer = preparer.preparer
+
+    def build():
+        select_related = set()
+        prefetch_related = set()
+        _collect_related(model, preparer, [], None, select_related, prefetch_related)
+        return sorted(select_related), sorted(prefetch_related)
+
+    return _cached_on(preparer, ('django.related', model), build)
+
+
+def _shortcut_lookup(model, lookup):
+    parts = lookup.split('.')
+
+    if '' in parts:
+        parts = parts[:parts.index('')]
+
+    for offset, part in enumerate(parts[:-1]):
+        relation = _get_relation(model, part)
+
+        if relation is None or relation[1]:
+            return lookup
+
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            field = None
+
+        next_part = parts[offset + 1]
+
+        if isinstance(field, ForeignKey) and field.name == part and (
+            next_part == field.target_field.name or
+            (next_part == 'pk' and field.target_field.primary_key)
+        ):
+            # The value is already sitting in the local column.
+            return '.'.join(parts[:offset] + [field.attname] + parts[offset + 2:])
+
+        model = relation[0]
+
+    return lookup
+
+
+def shortcut_fk_lookups(model, preparer):
+    """
+    Given a model & a preparer, rewrites lookups like ``user.pk`` or
+    ``user.<to_field>`` to read the local ``user_id`` column instead, so the
+    related object never needs to be loaded.
+
+    Nested ``SubPreparer``/``CollectionSubPreparer`` definitions that follow
+    relations are rewritten for the related model too.
+
+    :param model: The model class the preparer will be handed instances of
+    :type model: ``django.db.models.Model`` subclass
+
+    :param preparer: The preparer to rewrite
+    :type preparer: ``restless.preparers.Preparer``
+
+    :returns: A rewritten copy of the preparer, or the preparer itself if
+        nothing needed changing
+    """
+    if (
+        not isinstance(preparer, FieldsPreparer) or
+        not preparer.fields or
+        type(preparer).lookup_data is not FieldsPreparer.lookup_data
+    ):
+        return preparer
+
+    return _cached_on(
+        preparer,
+        ('django.shortcut', model),
+        lambda: _shortcut_fk_lookups(model, preparer)
+    )
+
+
+def _shortcut_fk_lookups(model, preparer):
+    fields = {}
+
+    for fieldname, lookup in preparer.fields.items():
+        if type(lookup) is SubPreparer and lookup.collapse is not None:
+            # Reads the same value as the equivalent dotted lookup.
+            full_lookup = '.'.join(filter(None, [lookup.lookup, lookup.collapse]))
+            shortcut = _shortcut_lookup(model, full_lookup)
+
+            if shortcut != full_lookup:
+                lookup = shortcut
+        elif isinstance(lookup, SubPreparer):
+            end_model, _, _ = _follow_lookup(model, lookup.lookup)
+
+            if end_model is not None and lookup.collapse is not None:
+                collapse = _shortcut_lookup(end_model, lookup.collapse)
+
+                if collapse != lookup.collapse:
+                    lookup = copy.copy(lookup)
+                    lookup.collapse = collapse
+            elif end_model is not None:
+                subpreparer = shortcut_fk_lookups(end_model, lookup.preparer)
+
+                if subpreparer is not lookup.preparer:
+                    lookup = copy.copy(lookup)
+                    lookup.preparer = subpreparer
+        else:
+            lookup = _shortcut_lookup(model, lookup)
+
+        fields[fieldname] = lookup
+
+    if all(fields[name] is lookup for name, lookup in preparer.fields.items()):
+        return preparer
+
+    preparer = copy.copy(preparer)
+    preparer.fields = fields
+    return preparer
+
+
+def _get_column(model, name):
+    """
+    Returns the name to use for ``only``/``values`` if ``name`` is a plain
+    column on the model (including ``pk`` & ``<fk>_id``), otherwise ``None``.
+    """
+    if name == 'pk':
+        return name
+
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+    if not field.concrete or (field.is_relation and field.name == name):
+        return None
+
+    return name
+
+
+class _Projection(object):
+    """
+    The state built up while walking a preparer for ``get_projection``.
+    """
+    def __init__(self):
+        # Models reached through foreign keys/one-to-ones, keyed by the path
+        # of relation names used to get there.
+        self.models = {}
+        # The columns read off each of those models.
+        self.columns = {}
+        # Paths where we can't tell what gets read (methods, properties...).
+        self.opaque = set()
+        # The keys a ``values`` call needs, in order.
+        self.values = []
+        self.use_values = True
+
+    def add_model(self, path, model):
+        self.models[path] = model
+        self.columns.setdefault(path, set())
+
+    def add_column(self, path, name):
+        self.columns[path].add(name)
+
+    def add_value(self, key):
+        if key not in self.values:
+            self.values.append(key)
+
+    def add_opaque(self, path):
+        self.opaque.add(path)
+        self.use_values = False
+
+    def walk(self, model, preparer, path):
+        """
+        Walks a preparer, returning the ``fields`` a copy of it would need to
+        prepare the rows of a ``values`` query.
+        """
+        self.add_model(path, model)
+
+        if (
+            not isinstance(preparer, FieldsPreparer) or
+            not preparer.fields or
+            type(preparer).lookup_data is not FieldsPreparer.lookup_data
+        ):
+            self.add_opaque(path)
+            return None
+
+        if type(preparer) is not FieldsPreparer:
+            self.use_values = False
+
+        fields = {}
+
+        for fieldname, lookup in preparer.fields.items():
+            if isinstance(lookup, SubPreparer):
+                fields[fieldname] = self.walk_subpreparer(model, lookup, path)
+            else:
+                fields[fieldname] = self.walk_lookup(model, lookup, path)
+
+        return fields
+
+    def walk_relations(self, model, lookup, path):
+        """
+        Follows the leading foreign keys/one-to-ones in a dotted lookup.
+
+        Returns a ``(model, path, remaining_parts)`` tuple.
+        """
+        parts = lookup.split('.')
+
+        if '' in parts:
+            # An empty segment ends the lookup.
+            parts = parts[:parts.index('')]
+
+        while parts:
+            relation = _get_relation(model, parts[0])
+
+            if relation is None:
+                break
+
+            related_model, many = relation
+
+            if many:
+                # Collections get prefetched separately & can't be expressed
+                # as plain columns.
+                self.use_values = False
+                return None, path, parts
+
+            self.add_column(path, parts[0])
+            path = path + (parts.pop(0),)
+            model = related_model
+            self.add_model(path, model)
+
+        return model, path, parts
+
+    def walk_lookup(self, model, lookup, path):
+        model, path, parts = self.walk_relations(model, lookup, path)
+
+        if model is None:
+            return None
+
+        if not parts:
+            # Either an empty lookup or one that ends on a related object.
+            # Either way, the whole instance is wanted.
+            self.add_opaque(path)
+            return None
+
+        column = _get_column(model, parts[0])
+
+        if column is None:
+            self.add_opaque(path)
+            return None
+
+        if column != 'pk':
+            self.add_column(path, column)
+
+        key = '__'.join(path + (column,))
+        self.add_value(key)
+        return '.'.join([key] + parts[1:])
+
+    def walk_subpreparer(self, model, subpreparer, path):
+        if type(subpreparer) is not SubPreparer:
+            self.use_values = False
+
+        model, path, parts = self.walk_relations(model, subpreparer.lookup, path)
+
+        if model is None:
+            return None
+
+        if parts:
+            self.add_opaque(path)
+            return None
+
+        fields = self.walk(model, _get_inner_preparer(subpreparer), path)
+
+        if not self.use_values:
+            return None
+
+        if subpreparer.collapse is not None:
+            return fields['collapse']
+
+        preparer = copy.copy(subpreparer.preparer)
+        preparer.fields = fields
+        return SubPreparer('', preparer)
+
+
+def get_projection(model, preparer):
+    """
+    Given a model & a preparer, works out the smallest set of columns the
+    preparer needs.
+
+    If the preparer only reads plain columns (directly or through foreign
+    keys/one-to-ones), those can be fetched with ``QuerySet.values``. In that
+    case, ``values`` is the list of keys to pass it & ``values_preparer`` is a
+    copy of the preparer that knows how to read the resulting rows. Otherwise,
+    both are ``None``.
+
+    ``only`` is the list of names to pass to ``QuerySet.only`` (after the
+    ``select_related`` from ``get_related_lookups``) when full model instances
+    are needed. Models where a method or property is read keep all of their
+    columns. If nothing can be worked out, it's ``None``.
+
+    :param model: The model class the preparer will be handed instances of
+    :type model: ``django.db.models.Model`` subclass
+
+    :param preparer: The preparer to inspect
+    :type preparer: ``restless.preparers.Preparer``
+
+    :returns: A ``(values, only, values_preparer)`` tuple
+    :rtype: tuple
+    """
+    return _cached_on(
+        preparer,
+        ('django.projection', model),
+        lambda: _get_projection(model, preparer)
+    )
+
+
+def _get_projection(model, preparer):
+    projection = _Projection()
+    fields = projection.walk(model, preparer, ())
+
+    if () in projection.opaque:
+        return None, None, None
+
+    only = []
+
+    for path, path_model in projection.models.items():
+        if path in projection.opaque:
+            names = [field.name for field in path_model._meta.concrete_fields]
+        else:
+            names = sorted(projection.columns[path])
+
+        only.extend('__'.join(path + (name,)) for name in names)
+
+    if not projection.use_values:
+        return None, only, None
+
+    values_preparer = copy.copy(preparer)
+    values_preparer.fields = fields
+    return projection.values, only, values_preparer
 
 
 class DjangoResource(Resource):
@@ -18,12 +508,112 @@ class DjangoResource(Resource):
 
     Doesn't require any special configuration, but helps when working in a
     Django environment.
+
+    Setting ``optimize_related = True`` on a subclass makes the resource
+    inspect its ``preparer`` & apply the matching ``select_related`` and
+    ``prefetch_related`` calls to any ``QuerySet`` returned from ``list``,
+    avoiding a query per item for related data.
+
+    Setting ``projection = True`` goes further & only loads the columns the
+    ``preparer`` reads. If it only reads plain columns (directly or through
+    foreign keys), the ``QuerySet`` is turned into a ``.values(...)`` query &
+    the rows are prepared without building model instances at all. Otherwise
+    (methods, properties or collections are involved), ``.only(...)`` is used.
+
+    Setting ``fk_id_shortcut = True`` reads lookups like ``user.pk`` from the
+    local ``user_id`` column (see ``shortcut_fk_lookups``), saving a query per
+    item.
     """
+    optimize_related = False
+    projection = False
+    fk_id_shortcut = False
+
+    def get_model_preparer(self, model):
+        """
+        Returns the preparer to use for instances of the given model.
+
+        By default, this is the ``preparer``, with the foreign key shortcuts
+        applied if ``fk_id_shortcut`` is on (& ``prepare`` hasn't been
+        overridden on the resource).
+
+        :param model: The model class about to be prepared
+        :type model: ``django.db.models.Model`` subclass
+
+        :returns: A preparer
+        """
+        if not self.fk_id_shortcut or type(self).prepare is not Resource.prepare:
+            return self.preparer
+
+        return shortcut_fk_lookups(model, self.preparer)
+
+    def optimize_queryset(self, queryset):
+        """
+        Applies the ``select_related``/``prefetch_related`` lookups the
+        ``preparer`` needs to the given ``QuerySet``.
+
+        :param queryset: The ``QuerySet`` about to be serialized
+        :type queryset: ``django.db.models.query.QuerySet``
+
+        :returns: The optimized ``QuerySet``
+        """
+        select_related, prefetch_related = get_related_lookups(
+            queryset.model,
+            self.get_model_preparer(queryset.model)
+        )
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+    def project_queryset(self, queryset):
+        """
+        Restricts the given ``QuerySet`` to the columns the ``preparer``
+        reads (see ``get_projection``).
+
+        :param queryset: The ``QuerySet`` about to be serialized
+        :type queryset: ``django.db.models.query.QuerySet``
+
+        :returns: A ``(queryset, preparer)`` tuple. ``preparer`` is the one
+            to prepare the rows with if it isn't the resource's (ie. for a
+            ``values`` query), otherwise ``None``
+        """
+        values, only, values_preparer = get_projection(
+            queryset.model,
+            self.get_model_preparer(queryset.model)
+        )
+
+        # A custom ``prepare`` expects model instances, not rows.
+        if values is not None and type(self).prepare is Resource.prepare:
+            return queryset.values(*values), values_preparer
+
+        queryset = self.optimize_queryset(queryset)
+
+        if only:
+            queryset = queryset.only(*only)
+
+        return queryset, None
 
     def serialize_list(self, data):
         if data is None:
             return super(DjangoResource, self).serialize_list(data)
 
+        row_preparer = None
+
+        if isinstance(data, QuerySet):
+            model_preparer = self.get_model_preparer(data.model)
+
+            if self.projection:
+                data, row_preparer = self.project_queryset(data)
+            elif self.optimize_related:
+                data = self.optimize_queryset(data)
+
+            if row_preparer is None and model_preparer is not self.preparer:
+                row_preparer = model_preparer
+
         if getattr(self, 'paginate', False):
             page_size = getattr(self, 'page_size', getattr(settings, 'RESTLESS_PAGE_SIZE', 10))
             paginator = Paginator(data, page_size)
@@ -36,8 +626,36 @@ class DjangoResource(Resource):
             self.page = paginator.page(page_number)
             data = self.page.object_list
 
+        streaming = self.should_stream_list()
+
+        if (
+            streaming and
+            isinstance(data, QuerySet) and
+            not data._prefetch_related_lookups
+        ):
+            # Don't keep every row around while streaming. (Prefetching needs
+            # the whole result set, so those are left alone.)
+            data = data.iterator(chunk_size=self.stream_chunk_size)
+
+        if row_preparer is not None and streaming:
+            data = Data(chain.from_iterable(map(
+                row_preparer.prepare_many,
+                iter_chunks(data, self.stream_chunk_size)
+            )), should_prepare=False)
+        elif row_preparer is not None:
+            data = Data(row_preparer.prepare_many(data), should_prepare=False)
+
         return super(DjangoResource, self).serialize_list(data)
 
+    def serialize_detail(self, data):
+        if isinstance(data, Model):
+            preparer = self.get_model_preparer(type(data))
+
+            if preparer is not self.preparer:
+                data = Data(preparer.prepare(data), should_prepare=False)
+
+        return super(DjangoResource, self).serialize_detail(data)
+
     def wrap_list_response(self, data):
         response_dict = super(DjangoResource, self).wrap_list_response(data)
 
@@ -71,12 +689,21 @@ class DjangoResource(Resource):
         return settings.DEBUG
 
     def build_response(self, data, status=OK):
-        if status == NO_CONTENT:
-            # Avoid crashing the client when it tries to parse nonexisting JSON.
-            content_type = 'text/plain'
+        content_type = self.get_content_type(status)
+        data = self.encode_response(data, status)
+
+        if not isinstance(data, (six.text_type, six.binary_type)):
+            resp = StreamingHttpResponse(
+                data,
+                content_type=content_type,
+                status=status
+            )
         else:
-            content_type = 'application/json'
-        resp = HttpResponse(data, content_type=content_type, status=status)
+            resp = HttpResponse(data, content_type=content_type, status=status)
+
+        for name, value in self.response_headers.items():
+            resp[name] = value
+
         return resp
 
     def build_error(self, err):
@@ -3,7 +3,7 @@ from .constants import (APPLICATION_ERROR, UNAUTHORIZED, NOT_FOUND, BAD_REQUEST,
                         CONFLICT, UNSUPPORTED_MEDIA_TYPE, EXPECTATION_FAILED,
                         I_AM_A_TEAPOT, TOO_MANY_REQUESTS, UNPROCESSABLE_ENTITY,
                         UNAVAILABLE_FOR_LEGAL_REASONS, FAILED_DEPENDENCY,
-                        LOCKED)
+                        LOCKED, LENGTH_REQUIRED)
 from .constants import METHOD_NOT_ALLOWED, METHOD_NOT_IMPLEMENTED, UNAVAILABLE
 
 
@@ -65,7 +65,6 @@ class MethodNotAllowed(HttpError):
 
 
 class NotAcceptable(HttpError):
-    # TODO: make serializers handle it?
     status = NOT_ACCEPTABLE
     msg = "Unable to send content specified on the request's Accept header(s)."
 
@@ -80,6 +79,11 @@ class Gone(HttpError):
     msg = "Resource removed permanently."
 
 
+class LengthRequired(HttpError):
+    status = LENGTH_REQUIRED
+    msg = "A Content-Length is required for the request body."
+
+
 class PreconditionFailed(HttpError):
     status = PRECONDITION_FAILED
     msg = "Unable to satisfy one or more request preconditions."
@@ -1,7 +1,7 @@
-from flask import make_response
+from flask import make_response, stream_with_context
 from flask import request
 
-from .constants import OK, NO_CONTENT
+from .constants import OK
 from .resources import Resource
 
 
@@ -41,19 +41,32 @@ class FlaskResource(Resource):
     def request_body(self):
         return self.request.data
 
+    def request_stream(self):
+        return self.request.stream
+
+    def request_header(self, name, default=None):
+        return self.request.headers.get(name, default)
+
+    def request_param(self, name, default=None):
+        return self.request.args.get(name, default)
+
     def is_debug(self):
         from flask import current_app
         return current_app.debug
 
     def build_response(self, data, status=OK):
-        if status == NO_CONTENT:
-            # Avoid crashing the client when it tries to parse nonexisting JSON.
-            content_type = 'text/plain'
-        else:
-            content_type = 'application/json'
-        return make_response(data, status, {
+        content_type = self.get_content_type(status)
+        data = self.encode_response(data, status)
+
+        if not isinstance(data, (str, bytes)):
+            # Streamed, so keep the request around while it's being sent.
+            data = stream_with_context(data)
+
+        headers = {
             'Content-Type': content_type,
-        })
+        }
+        headers.update(self.response_headers)
+        return make_response(data, status, headers)
 
     @classmethod
     def build_endpoint_name(cls, name, endpoint_prefix=None):
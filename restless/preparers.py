@@ -1,3 +1,303 @@
+import copy
+from functools import lru_cache, partial
+import itertools
+import keyword
+import linecache
+from operator import attrgetter, itemgetter
+import weakref
+
+from .utils import LRUCache
+
+
+_MISSING = object()
+
+# Numbers the generated code's filenames (see ``get_generated``), so they're
+# never reused.
+_generated_ids = itertools.count()
+
+
+def _identity(data):
+    return data
+
+
+def _copy_prepared(data):
+    # Copies the dicts & lists preparers build, all the way down. Anything
+    # else is left as-is.
+    if isinstance(data, dict):
+        return {key: _copy_prepared(value) for key, value in data.items()}
+
+    if isinstance(data, list):
+        return [_copy_prepared(value) for value in data]
+
+    return data
+
+
+def _split_lookup(lookup):
+    parts = []
+
+    for part in lookup.split('.'):
+        # An empty segment ends the traversal, just like the old recursive
+        # lookup did.
+        if not part:
+            break
+
+        parts.append(part)
+
+    return tuple(parts)
+
+
+def _has_memoized(preparer):
+    # Whether any ``SubPreparer`` within the preparer has ``memoize`` on.
+    for lookup in (getattr(preparer, 'fields', None) or {}).values():
+        if not isinstance(lookup, SubPreparer):
+            continue
+
+        if lookup.memoize and lookup.collapse is None:
+            return True
+
+        if _has_memoized(lookup.preparer):
+            return True
+
+    return False
+
+
+def _prepare_many(preparer, items):
+    prepare_many = getattr(preparer, 'prepare_many', None)
+
+    if prepare_many is None:
+        return [preparer.prepare(item) for item in items]
+
+    return prepare_many(items)
+
+
+def compile_column(lookup, is_mapping):
+    """
+    Given a dotted lookup string & whether the items look like ``dict``
+    objects, returns a function that takes a list of items & returns a list
+    of the values found at the end of the path (one per item).
+
+    Used by ``FieldsPreparer.prepare_many`` once it knows every item has the
+    same shape, so the first step can skip the per-item type checks.
+    """
+    parts = _split_lookup(lookup)
+
+    if not parts:
+        return list
+
+    if is_mapping:
+        first = itemgetter(parts[0])
+    else:
+        first = attrgetter(parts[0])
+
+    rest = None
+
+    if len(parts) > 1:
+        rest = compile_lookup('.'.join(parts[1:]))
+
+    def column(items):
+        values = list(map(first, items))
+
+        if any(map(callable, values)):
+            values = [
+                value() if callable(value) and not hasattr(value, 'db_manager') else value
+                for value in values
+            ]
+
+        if rest is not None:
+            values = list(map(rest, values))
+
+        return values
+
+    return column
+
+
+@lru_cache(maxsize=1024)
+def compile_lookup(lookup):
+    """
+    Given a dotted lookup string, returns a function that takes an item &
+    returns the value found at the end of the path.
+
+    The result behaves exactly like ``FieldsPreparer.lookup_data``, but the
+    path is only split once. Compiled lookups are cached, so calling this
+    repeatedly with the same path is cheap.
+
+    Example::
+
+        >>> get_name = compile_lookup('person.name')
+        >>> get_name({'person': Person(name='daniel')})
+        'daniel'
+
+    """
+    parts = _split_lookup(lookup)
+
+    if not parts:
+        return _identity
+
+    if len(parts) == 1:
+        part = parts[0]
+
+        def accessor(data):
+            if callable(getattr(data, 'keys', None)) and hasattr(data, '__getitem__'):
+                value = data[part]
+            elif data is not None:
+                value = getattr(data, part)
+            else:
+                return None
+
+            # Call if it's callable except if it's a Django DB manager
+            # instance. We check if is a manager by checking the
+            # ``db_manager`` (duck typing).
+            if callable(value) and not hasattr(value, 'db_manager'):
+                value = value()
+
+            return value
+
+        return accessor
+
+    def accessor(data):
+        value = data
+
+        for part in parts:
+            if callable(getattr(value, 'keys', None)) and hasattr(value, '__getitem__'):
+                value = value[part]
+            elif value is not None:
+                value = getattr(value, part)
+            else:
+                return None
+
+            if callable(value) and not hasattr(value, 'db_manager'):
+                value = value()
+
+        return value
+
+    return accessor
+
+
+class _PrepareCodeGenerator(object):
+    """
+    Writes the Python source for ``FieldsPreparer(..., generate_code=True)``.
+
+    Each ``FieldsPreparer`` in the tree becomes a function that checks the
+    shape of the data once, reads each field with plain key/attribute access
+    & returns a single ``dict`` literal. Nested ``SubPreparer`` &
+    ``CollectionSubPreparer`` definitions get functions of their own.
+    """
+    def __init__(self):
+        self.functions = []
+        self.namespace = {}
+
+    def add_global(self, prefix, value):
+        name = '_{}_{}'.format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def read_field(self, var, parts, is_mapping):
+        part = parts[0]
+
+        if is_mapping:
+            lines = ['{} = data[{!r}]'.format(var, part)]
+        elif part.isidentifier() and not keyword.iskeyword(part):
+            lines = ['{} = data.{}'.format(var, part)]
+        else:
+            lines = ['{} = getattr(data, {!r})'.format(var, part)]
+
+        lines.extend([
+            "if callable({0}) and not hasattr({0}, 'db_manager'):".format(var),
+            '    {0} = {0}()'.format(var),
+        ])
+
+        if len(parts) > 1:
+            rest = self.add_global('lookup', compile_lookup('.'.join(parts[1:])))
+            lines.append('{0} = {1}({0})'.format(var, rest))
+
+        return lines
+
+    def read_subpreparer(self, subpreparer):
+        preparer = subpreparer.preparer
+        simple = type(subpreparer) in (SubPreparer, CollectionSubPreparer)
+
+        if simple and subpreparer.collapse is not None:
+            inner = self.add_global('lookup', compile_lookup(subpreparer.lookup))
+            collapse = self.add_global('lookup', compile_lookup(subpreparer.collapse))
+
+            if type(subpreparer) is SubPreparer:
+                return '{}({}(data))'.format(collapse, inner)
+
+            return '[{}(item) for item in {}(data)]'.format(collapse, inner)
+
+        inlinable = (
+            not subpreparer.memoize and
+            type(preparer) is FieldsPreparer and
+            preparer.fields
+        )
+
+        if inlinable and type(subpreparer) is SubPreparer:
+            inner = self.add_global('lookup', compile_lookup(subpreparer.lookup))
+            return '{}({}(data))'.format(self.write_function(preparer), inner)
+
+        if inlinable and type(subpreparer) is CollectionSubPreparer:
+            inner = self.add_global('lookup', compile_lookup(subpreparer.lookup))
+            return '[{}(item) for item in {}(data)]'.format(
+                self.write_function(preparer),
+                inner
+            )
+
+        return '{}(data)'.format(self.add_global('subpreparer', subpreparer.prepare))
+
+    def write_function(self, preparer):
+        index = len(self.functions)
+        name = 'prepare_{}'.format(index)
+        # Reserve the slot, so nested functions get the following ones.
+        self.functions.append(None)
+        fallback = self.add_global('fallback', preparer.prepare_fields)
+        mapping_lines = []
+        object_lines = []
+        values = []
+
+        for offset, (fieldname, lookup) in enumerate(preparer.fields.items()):
+            var = 'value_{}'.format(offset)
+            values.append('{!r}: {}'.format(fieldname, var))
+
+            if isinstance(lookup, SubPreparer):
+                line = '{} = {}'.format(var, self.read_subpreparer(lookup))
+                mapping_lines.append(line)
+                object_lines.append(line)
+                continue
+
+            parts = _split_lookup(lookup)
+
+            if not parts:
+                mapping_lines.append('{} = data'.format(var))
+                object_lines.append('{} = data'.format(var))
+                continue
+
+            mapping_lines.extend(self.read_field(var, parts, True))
+            object_lines.extend(self.read_field(var, parts, False))
+
+        lines = [
+            'def {}(data):'.format(name),
+            "    if callable(getattr(data, 'keys', None)) and hasattr(data, '__getitem__'):",
+        ]
+        lines.extend('        ' + line for line in mapping_lines)
+        lines.extend([
+            '    elif data is None:',
+            '        return {}(data)'.format(fallback),
+            '    else:',
+        ])
+        lines.extend('        ' + line for line in object_lines)
+        lines.append('    return {{{}}}'.format(', '.join(values)))
+        self.functions[index] = '\n'.join(lines)
+        return name
+
+    def generate(self, preparer):
+        """
+        Returns the source for the whole preparer tree & the namespace it
+        needs to run in. The entry point is ``prepare_0``.
+        """
+        self.write_function(preparer)
+        return '\n\n\n'.join(self.functions) + '\n', self.namespace
+
+
 class Preparer(object):
     """
     A plain preparation object which just passes through data.
@@ -16,6 +316,17 @@ class Preparer(object):
         """
         return data
 
+    def prepare_many(self, items):
+        """
+        Handles transforming a whole collection of items at once.
+
+        By default, this simply calls ``prepare`` on each item. Subclasses
+        can override it to share work across the items.
+
+        Returns a list of the prepared items.
+        """
+        return [self.prepare(item) for item in items]
+
 
 class FieldsPreparer(Preparer):
     """
@@ -34,33 +345,297 @@ class FieldsPreparer(Preparer):
             'user': 'author.pk',
         })
 
+    The lookups are compiled into getter functions the first time the
+    preparer is used (& again whenever ``fields`` is reassigned), so the
+    dotted paths aren't re-parsed for every item.
+
+    For the hottest endpoints, pass ``generate_code=True``. The preparer then
+    writes (& compiles, once) a specialized Python function for its fields,
+    including any nested ``SubPreparer``/``CollectionSubPreparer``, that
+    builds each result as a single ``dict`` literal. ``get_source`` returns
+    the generated code, if you'd like to inspect it.
     """
-    def __init__(self, fields):
+    #: How many restricted variants (see ``restrict``) to keep around.
+    max_variants = 128
+
+    def __init__(self, fields, generate_code=False):
         super(FieldsPreparer, self).__init__()
+        self.generate_code = generate_code
         self.fields = fields
 
+    @property
+    def fields(self):
+        return self._fields
+
+    @fields.setter
+    def fields(self, fields):
+        self._fields = fields
+        self._field_getters = None
+        self._field_columns = {}
+        self._generated = None
+        self._variants = None
+
+    def get_variant(self, key, build):
+        """
+        Used internally to cache variants of this preparer (see ``restrict``).
+
+        Returns the variant stored under ``key``, calling ``build`` to create
+        it if it's missing.
+        """
+        if self._variants is None:
+            self._variants = LRUCache(maxsize=self.max_variants)
+
+        variant = self._variants.get(key)
+
+        if variant is None:
+            variant = build()
+            self._variants.set(key, variant)
+
+        return variant
+
+    def restrict(self, fieldnames):
+        """
+        Returns a copy of this preparer that only exposes the given fields
+        (in the order they're defined here).
+
+        Variants are cached (up to ``max_variants`` of them), so asking for the
+        same set of fields again returns the same, already compiled, preparer.
+
+        Raises ``KeyError`` if any of the fields doesn't exist.
+        """
+        key = ('restrict', frozenset(fieldnames))
+
+        def build():
+            missing = key[1].difference(self.fields)
+
+            if missing:
+                raise KeyError(', '.join(sorted(missing)))
+
+            variant = copy.copy(self)
+            variant.fields = dict(
+                (fieldname, lookup)
+                for fieldname, lookup in self.fields.items()
+                if fieldname in key[1]
+            )
+            return variant
+
+        return self.get_variant(key, build)
+
+    def expand(self, fieldnames):
+        """
+        Returns a copy of this preparer where the given (collapsed)
+        ``SubPreparer``/``CollectionSubPreparer`` fields are prepared in full.
+
+        Dotted names (like ``comments.author``) expand fields within nested
+        preparers. Variants are cached the same way as for ``restrict``.
+
+        Raises ``KeyError`` if any of the names isn't a nested field.
+        """
+        key = ('expand', frozenset(fieldnames))
+
+        def build():
+            nested = {}
+
+            for fieldname in key[1]:
+                fieldname, _, remaining = fieldname.partition('.')
+                nested.setdefault(fieldname, [])
+
+                if remaining:
+                    nested[fieldname].append(remaining)
+
+            fields = dict(self.fields)
+
+            for fieldname, remaining in nested.items():
+                subpreparer = fields.get(fieldname)
+
+                if not isinstance(subpreparer, SubPreparer):
+                    raise KeyError(fieldname)
+
+                subpreparer = copy.copy(subpreparer)
+                subpreparer.collapse = None
+
+                if remaining:
+                    expand = getattr(subpreparer.preparer, 'expand', None)
+
+                    if expand is None:
+                        raise KeyError('{}.{}'.format(fieldname, remaining[0]))
+
+                    try:
+                        subpreparer.preparer = expand(remaining)
+                    except KeyError as err:
+                        raise KeyError('{}.{}'.format(fieldname, err.args[0]))
+
+                fields[fieldname] = subpreparer
+
+            variant = copy.copy(self)
+            variant.fields = fields
+            return variant
+
+        return self.get_variant(key, build)
+
+    def compile_fields(self):
+        """
+        Builds the list of ``(fieldname, getter)`` pairs used by ``prepare``.
+
+        Each getter takes the item being prepared & returns the value for
+        that field. Plain lookups are compiled with ``compile_lookup``, while
+        ``SubPreparer`` instances contribute their own ``prepare`` method.
+
+        If a subclass overrides ``lookup_data``, that method is used instead
+        of the compiled lookups.
+        """
+        getters = []
+        custom_lookup = type(self).lookup_data is not FieldsPreparer.lookup_data
+
+        for fieldname, lookup in self.fields.items():
+            if isinstance(lookup, SubPreparer):
+                getter = lookup.prepare
+            elif custom_lookup:
+                getter = partial(self.lookup_data, lookup)
+            else:
+                getter = compile_lookup(lookup)
+
+            getters.append((fieldname, getter))
+
+        return getters
+
+    def get_source(self):
+        """
+        Returns the Python source ``generate_code=True`` uses for this
+        preparer.
+
+        The entry point is the ``prepare_0`` function.
+        """
+        return self.get_generated()[0]
+
+    def get_generated(self):
+        """
+        Returns a ``(source, function)`` tuple for the generated code, creating
+        it the first time it's needed.
+        """
+        if self._generated is None:
+            source, namespace = _PrepareCodeGenerator().generate(self)
+            filename = '<restless generated FieldsPreparer {}>'.format(
+                next(_generated_ids)
+            )
+            exec(compile(source, filename, 'exec'), namespace)
+            # Lets tracebacks show the generated lines, until the preparer
+            # goes away.
+            linecache.cache[filename] = (
+                len(source),
+                None,
+                source.splitlines(True),
+                filename
+            )
+            weakref.finalize(self, linecache.cache.pop, filename, None)
+            self._generated = (source, namespace['prepare_0'])
+
+        return self._generated
+
     def prepare(self, data):
         """
         Handles transforming the provided data into the fielded data that should
         be exposed to the end user.
 
-        Uses the ``lookup_data`` method to traverse dotted paths.
+        Uses the compiled field getters (see ``compile_fields``) to traverse
+        dotted paths, or the generated code if ``generate_code`` is on.
 
         Returns a dictionary of data as the response.
         """
-        result = {}
-
         if not self.fields:
             # No fields specified. Serialize everything.
             return data
 
+        if self.generate_code and type(self).lookup_data is FieldsPreparer.lookup_data:
+            return self.get_generated()[1](data)
+
+        return self.prepare_fields(data)
+
+    def prepare_fields(self, data):
+        """
+        Used internally to prepare an item with the compiled field getters.
+        """
+        getters = self._field_getters
+
+        if getters is None:
+            getters = self._field_getters = self.compile_fields()
+
+        return {fieldname: getter(data) for fieldname, getter in getters}
+
+    def compile_columns(self, is_mapping):
+        """
+        Builds the list of ``(fieldname, column)`` pairs used by
+        ``prepare_many``.
+
+        Each column takes the full list of items & returns a list of the values
+        for that field. ``is_mapping`` says whether the items look like
+        ``dict`` objects (key access) or not (attribute access).
+        """
+        columns = []
+
         for fieldname, lookup in self.fields.items():
             if isinstance(lookup, SubPreparer):
-                result[fieldname] = lookup.prepare(data)
+                column = lookup.prepare_many
             else:
-                result[fieldname] = self.lookup_data(lookup, data)
+                column = compile_column(lookup, is_mapping)
 
-        return result
+            columns.append((fieldname, column))
+
+        return columns
+
+    def prepare_many(self, items):
+        """
+        Handles transforming a whole collection of items at once.
+
+        If every item is of the same type, the shape of the data (``dict``-like
+        or object) is only detected once & each field is looked up across all
+        the items in bulk. Otherwise, this falls back to calling ``prepare``
+        on each item.
+
+        With ``generate_code=True``, the generated function is mapped over the
+        items instead, since it's the faster of the two (see
+        ``benchmarks/preparers.py``: roughly 2.8-4.0us vs. 3.8-6.4us per item
+        for 20 flat fields & 6.1-9.1us vs. 9.0-12.0us with nested preparers).
+        Trees with memoized ``SubPreparer`` fields still use the columns.
+
+        Returns a list of dictionaries, one per item.
+        """
+        items = list(items)
+
+        if not self.fields:
+            return items
+
+        if not items:
+            return []
+
+        if (
+            self.generate_code and
+            type(self).prepare is FieldsPreparer.prepare and
+            type(self).lookup_data is FieldsPreparer.lookup_data and
+            # The generated code prepares one item at a time, so memoizing
+            # (which works across the whole list) needs the columns below.
+            not self.get_variant(('memoized',), lambda: _has_memoized(self))
+        ):
+            return list(map(self.get_generated()[1], items))
+
+        if (
+            type(self).prepare is not FieldsPreparer.prepare or
+            type(self).lookup_data is not FieldsPreparer.lookup_data or
+            items[0] is None or
+            len(set(map(type, items))) > 1
+        ):
+            return [self.prepare(item) for item in items]
+
+        sample = items[0]
+        is_mapping = callable(getattr(sample, 'keys', None)) and hasattr(sample, '__getitem__')
+        columns = self._field_columns.get(is_mapping)
+
+        if columns is None:
+            columns = self._field_columns[is_mapping] = self.compile_columns(is_mapping)
+
+        fieldnames = [fieldname for fieldname, _ in columns]
+        values = [column(items) for _, column in columns]
+        return [dict(zip(fieldnames, row)) for row in zip(*values)]
 
     def lookup_data(self, lookup, data):
         """
@@ -95,32 +670,7 @@ class FieldsPreparer(Preparer):
             'daniel'
 
         """
-        value = data
-        parts = lookup.split('.')
-
-        if not parts or not parts[0]:
-            return value
-
-        part = parts[0]
-        remaining_lookup = '.'.join(parts[1:])
-
-        if callable(getattr(data, 'keys', None)) and hasattr(data, '__getitem__'):
-            # Dictionary enough for us.
-            value = data[part]
-        elif data is not None:
-            # Assume it's an object.
-            value = getattr(data, part)
-
-        # Call if it's callable except if it's a Django DB manager instance
-        #   We check if is a manager by checking the db_manager (duck typing)
-        if callable(value) and not hasattr(value, 'db_manager'):
-            value = value()
-
-        if not remaining_lookup:
-            return value
-
-        # There's more to lookup, so dive in recursively.
-        return self.lookup_data(remaining_lookup, value)
+        return compile_lookup(lookup)(data)
 
 
 class SubPreparer(FieldsPreparer):
@@ -174,10 +724,88 @@ class SubPreparer(FieldsPreparer):
         final_data = preparer.prepare(initial_data)
         // final_data == {'name': 'Joe', 'parents': {'mother': 'Janice', 'father': 'James'}}
 
+    When many items share the same nested object (say, a list of posts by a
+    handful of authors), pass ``memoize`` to prepare each nested object only
+    once per collection being prepared & reuse the result. ``memoize=True``
+    compares the nested objects by identity. A lookup path (like ``'pk'``) or
+    a callable can be given instead, for when equal objects aren't the same
+    instance (as with Django's ``select_related``).
+
+    Example::
+
+        preparer = FieldsPreparer(fields={
+            'author': SubPreparer('user', author_preparer, memoize='pk'),
+            'content': 'post',
+        })
+
+    Nested data can also be left out unless a client asks for it. Passing
+    ``collapse`` (a lookup path on the nested object, like ``'pk'``) emits just
+    that value in place of the nested data. ``FieldsPreparer.expand`` builds a
+    variant where the nested data is prepared in full.
+
+    Example::
+
+        preparer = FieldsPreparer(fields={
+            # ``"author": 5``, unless expanded.
+            'author': SubPreparer('user', author_preparer, collapse='pk'),
+            'content': 'post',
+        })
+
     """
-    def __init__(self, lookup, preparer):
+    def __init__(self, lookup, preparer, memoize=False, collapse=None):
         self.lookup = lookup
         self.preparer = preparer
+        self.memoize = memoize
+        self.collapse = collapse
+
+    def get_memo_key(self, data):
+        """
+        Used internally to work out which nested objects are the same when
+        ``memoize`` is on.
+        """
+        if self.memoize is True:
+            return id(data)
+
+        if callable(self.memoize):
+            key = self.memoize(data)
+        else:
+            key = self.lookup_data(self.memoize, data)
+
+        if key is None:
+            # Without a key (ie. an unsaved object), assume it's unique.
+            return (None, id(data))
+
+        return key
+
+    def prepare_inner_many(self, inner_items):
+        """
+        Used internally to hand a list of nested data to the configured
+        preparer, reusing the results for repeated objects when ``memoize``
+        is on.
+
+        If ``collapse`` is set, only that lookup is read off each item.
+        """
+        if self.collapse is not None:
+            return list(map(compile_lookup(self.collapse), inner_items))
+
+        if not self.memoize:
+            return _prepare_many(self.preparer, inner_items)
+
+        positions = {}
+        offsets = []
+        unique_items = []
+
+        for inner in inner_items:
+            key = self.get_memo_key(inner)
+
+            if key not in positions:
+                positions[key] = len(unique_items)
+                unique_items.append(inner)
+
+            offsets.append(positions[key])
+
+        prepared = _prepare_many(self.preparer, unique_items)
+        return [prepared[offset] for offset in offsets]
 
     def get_inner_data(self, data):
         """
@@ -194,10 +822,29 @@ class SubPreparer(FieldsPreparer):
         Uses the ``get_inner_data`` method to provide the correct subset of
         the data.
 
-        Returns a dictionary of data as the response.
+        Returns a dictionary of data as the response (or just the ``collapse``
+        value, if set).
         """
+        if self.collapse is not None:
+            return self.lookup_data(self.collapse, self.get_inner_data(data))
+
         return self.preparer.prepare(self.get_inner_data(data))
 
+    def prepare_many(self, items):
+        """
+        Handles passing the data for a collection of items to the configured
+        preparer, all at once.
+
+        Returns a list of the prepared data, one per item.
+        """
+        if (
+            type(self).prepare is not SubPreparer.prepare or
+            type(self).get_inner_data is not SubPreparer.get_inner_data
+        ):
+            return [self.prepare(item) for item in items]
+
+        return self.prepare_inner_many(list(map(self.get_inner_data, items)))
+
 
 class CollectionSubPreparer(SubPreparer):
     """
@@ -223,20 +870,252 @@ class CollectionSubPreparer(SubPreparer):
             'comments': CollectionSubPreparer('comments.all', comment_preparer),
         })
 
+    ``memoize`` works the same way it does for ``SubPreparer``, reusing the
+    prepared data for items that show up in more than one collection.
     """
     def prepare(self, data):
         """
         Handles passing each item in the collection data to the configured
         subpreparer.
 
-        Uses a loop and the ``get_inner_data`` method to provide the correct
-        item of the data.
+        Uses the ``get_inner_data`` method to provide the correct collection
+        of data, which is handed to the subpreparer's ``prepare_many`` (if it
+        has one).
 
         Returns a list of data as the response.
         """
+        return self.prepare_inner_many(list(self.get_inner_data(data)))
+
+    def prepare_many(self, items):
+        """
+        Handles preparing the nested collections for many items at once.
+
+        The collections are flattened so the subpreparer only gets called once,
+        then split back up per item.
+
+        Returns a list of lists, one per item.
+        """
+        if (
+            type(self).prepare is not CollectionSubPreparer.prepare or
+            type(self).get_inner_data is not CollectionSubPreparer.get_inner_data
+        ):
+            return [self.prepare(item) for item in items]
+
+        collections = [list(self.get_inner_data(item)) for item in items]
+        prepared = self.prepare_inner_many(
+            [inner for collection in collections for inner in collection]
+        )
         result = []
+        offset = 0
 
-        for item in self.get_inner_data(data):
-            result.append(self.preparer.prepare(item))
+        for collection in collections:
+            result.append(prepared[offset:offset + len(collection)])
+            offset += len(collection)
 
         return result
+
+
+class CachedPreparer(Preparer):
+    """
+    A preparation class that remembers the prepared data for items between
+    requests.
+
+    This wraps another preparer. Each item gets a version key (from the
+    ``key`` parameter), & as long as the key stays the same, the previously
+    prepared data is reused rather than prepared again. Including something
+    that changes whenever the item does (a modification timestamp, a version
+    counter, etc.) in the key means stale data never gets served.
+
+    ``key`` can either be a callable (taking the item & returning a hashable
+    key, or ``None`` to skip caching for that item) or a list of lookup paths
+    (like the ones ``FieldsPreparer`` uses), whose values make up the key.
+    Items where any of those values is ``None`` aren't cached.
+
+    At most ``maxsize`` items are kept (least-recently used ones are evicted
+    first). If ``ttl`` (in seconds) is given, entries expire after that long.
+    ``hits`` & ``misses`` count how well the cache is doing.
+
+    Example::
+
+        class PostResource(DjangoResource):
+            preparer = CachedPreparer(
+                FieldsPreparer(fields={
+                    'id': 'id',
+                    'title': 'title',
+                    'author': 'user.username',
+                }),
+                key=['pk', 'updated_on'],
+                maxsize=10000
+            )
+
+    Since the items are keyed only by the version key, use a separate
+    ``CachedPreparer`` for each kind of item.
+
+    ``restrict`` & ``expand`` are passed on to the wrapped preparer (if it
+    has them), with each variant getting a cache of its own.
+    """
+    #: How many restricted/expanded variants (each with its own cache) to
+    #: keep around.
+    max_variants = 128
+
+    def __init__(self, preparer, key, maxsize=1024, ttl=None):
+        super(CachedPreparer, self).__init__()
+        self.preparer = preparer
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._variants = None
+
+        if callable(key):
+            self.get_key = key
+        else:
+            getters = [compile_lookup(lookup) for lookup in key]
+
+            def get_key(data):
+                parts = tuple([getter(data) for getter in getters])
+
+                # An item missing part of its key (say, an unsaved object
+                # with no ``pk`` yet) can't be told apart from others.
+                if any(part is None for part in parts):
+                    return None
+
+                return parts
+
+            self.get_key = get_key
+
+    @property
+    def hits(self):
+        return self.cache.hits
+
+    @property
+    def misses(self):
+        return self.cache.misses
+
+    def clear(self):
+        """
+        Empties the cache (& drops any variants).
+        """
+        self.cache.clear()
+        self._variants = None
+
+    def get_variant(self, key, build):
+        """
+        Used internally to cache variants of this preparer (see ``restrict``).
+
+        Returns a ``CachedPreparer`` wrapping the preparer ``build`` returns,
+        with an empty cache, or this one if that's the preparer it already
+        wraps.
+        """
+        if self._variants is None:
+            self._variants = LRUCache(maxsize=self.max_variants)
+
+        variant = self._variants.get(key)
+
+        if variant is None:
+            preparer = build()
+
+            if preparer is self.preparer:
+                return self
+
+            variant = copy.copy(self)
+            variant.preparer = preparer
+            variant.cache = LRUCache(
+                maxsize=self.cache.maxsize,
+                ttl=self.cache.ttl,
+                timer=self.cache.timer
+            )
+            variant._variants = None
+            self._variants.set(key, variant)
+
+        return variant
+
+    def restrict(self, fieldnames):
+        """
+        Returns a copy of this preparer wrapping the wrapped preparer's
+        ``restrict``-ed variant, with a cache of its own.
+
+        Preparers without a ``restrict`` method are left as-is.
+
+        Raises ``KeyError`` if any of the fields doesn't exist.
+        """
+        restrict = getattr(self.preparer, 'restrict', None)
+
+        if restrict is None:
+            return self
+
+        return self.get_variant(
+            ('restrict', frozenset(fieldnames)),
+            lambda: restrict(fieldnames)
+        )
+
+    def expand(self, fieldnames):
+        """
+        Returns a copy of this preparer wrapping the wrapped preparer's
+        ``expand``-ed variant, with a cache of its own.
+
+        Preparers without an ``expand`` method are left as-is.
+
+        Raises ``KeyError`` if any of the names isn't a nested field.
+        """
+        expand = getattr(self.preparer, 'expand', None)
+
+        if expand is None:
+            return self
+
+        return self.get_variant(
+            ('expand', frozenset(fieldnames)),
+            lambda: expand(fieldnames)
+        )
+
+    def prepare(self, data):
+        """
+        Returns the cached prepared data for the item, preparing (& caching)
+        it with the wrapped preparer if needed.
+
+        The cached data is shared, so a copy of it (including any nested
+        dictionaries & lists) is returned to keep callers from altering it.
+        """
+        key = self.get_key(data)
+
+        if key is None:
+            return self.preparer.prepare(data)
+
+        prepped = self.cache.get(key, _MISSING)
+
+        if prepped is _MISSING:
+            prepped = self.preparer.prepare(data)
+            self.cache.set(key, prepped)
+
+        return _copy_prepared(prepped)
+
+    def prepare_many(self, items):
+        """
+        Handles a whole collection of items, sending only the ones missing
+        from the cache on to the wrapped preparer (in one go).
+
+        Returns a list of the prepared items.
+        """
+        items = list(items)
+        result = []
+        missing = []
+
+        for offset, item in enumerate(items):
+            key = self.get_key(item)
+            prepped = _MISSING
+
+            if key is not None:
+                prepped = self.cache.get(key, _MISSING)
+
+            if prepped is _MISSING:
+                missing.append((offset, key, item))
+
+            result.append(prepped)
+
+        if missing:
+            prepared = _prepare_many(self.preparer, [item for _, _, item in missing])
+
+            for (offset, key, _), prepped in zip(missing, prepared):
+                if key is not None:
+                    self.cache.set(key, prepped)
+
+                result[offset] = prepped
+
+        return [_copy_prepared(prepped) for prepped in result]
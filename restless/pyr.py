@@ -1,6 +1,6 @@
 from pyramid.response import Response
 
-from .constants import OK, NO_CONTENT
+from .constants import OK
 from .resources import Resource
 
 
@@ -28,13 +28,30 @@ class PyramidResource(Resource):
 
         return _wrapper
 
+    def request_stream(self):
+        return self.request.body_file
+
+    def request_header(self, name, default=None):
+        return self.request.headers.get(name, default)
+
     def build_response(self, data, status=OK):
-        if status == NO_CONTENT:
-            # Avoid crashing the client when it tries to parse nonexisting JSON.
-            content_type = 'text/plain'
+        content_type = self.get_content_type(status)
+        data = self.encode_response(data, status)
+
+        if isinstance(data, str):
+            # From a serializer that doesn't produce bytes.
+            data = data.encode('utf-8')
+
+        if not isinstance(data, bytes):
+            resp = Response(
+                app_iter=data,
+                status_code=status,
+                content_type=content_type
+            )
         else:
-            content_type = 'application/json'
-        resp = Response(data, status_code=status, content_type=content_type)
+            resp = Response(body=data, status_code=status, content_type=content_type)
+
+        resp.headers.update(self.response_headers)
         return resp
 
     @classmethod
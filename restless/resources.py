@@ -1,12 +1,33 @@
+import asyncio
+import concurrent.futures
 from functools import wraps
+import hashlib
+import inspect
 import sys
+from types import MappingProxyType
+import uuid
+import weakref
 
-from .constants import OK, CREATED, ACCEPTED, NO_CONTENT
+from .constants import OK, CREATED, ACCEPTED, NO_CONTENT, NOT_MODIFIED
 from .data import Data
-from .exceptions import MethodNotImplemented, Unauthorized
+from .exceptions import (BadRequest, MethodNotAllowed, MethodNotImplemented,
+                         NotAcceptable, Unauthorized, UnsupportedMediaType)
 from .preparers import Preparer
 from .serializers import JSONSerializer
-from .utils import format_traceback
+from .utils import (best_encoding, best_match, compress, compress_iter,
+                    format_traceback, http_date, iter_chunks, parse_etags,
+                    parse_http_date)
+
+
+#: Stands in for the list of items while the rest of a streamed list response
+#: gets serialized.
+STREAM_MARKER = '__restless_stream_{}__'.format(uuid.uuid4().hex)
+
+#: Methods that get a ``405 Method Not Allowed`` (rather than a
+#: ``501 Not Implemented``) when an endpoint doesn't handle them.
+STANDARD_METHODS = frozenset([
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+])
 
 
 def skip_prepare(func):
@@ -20,6 +41,82 @@ def skip_prepare(func):
     return _wrapper
 
 
+def _late_bound_view(view_name):
+    def view(resource, *args, **kwargs):
+        return getattr(resource, view_name)(*args, **kwargs)
+
+    return view
+
+
+def build_dispatch_table(resource_class, http_methods, status_map):
+    """
+    Builds the table ``Resource.handle`` dispatches requests with.
+
+    Maps each endpoint to a tuple of a (read-only) dict & the value for its
+    ``Allow`` header. The dict maps each HTTP method to a tuple of the view's
+    name, the view function (taking the resource as its first argument) & the
+    status code for a successful response.
+
+    :param resource_class: The resource class
+    :type resource_class: class
+
+    :param http_methods: The endpoints, methods & view names (like
+        ``Resource.http_methods``)
+    :type http_methods: dict
+
+    :param status_map: The view names & status codes (like
+        ``Resource.status_map``)
+    :type status_map: dict
+
+    :returns: The table
+    :rtype: dict
+    """
+    table = {}
+
+    for endpoint, methods in http_methods.items():
+        routes = {}
+
+        for method, view_name in methods.items():
+            view = getattr(resource_class, view_name, None)
+
+            if view is None:
+                # Look it up on the instance when it's called instead.
+                view = _late_bound_view(view_name)
+
+            routes[method] = (view_name, view, status_map.get(view_name, OK))
+
+        table[endpoint] = (MappingProxyType(routes), ', '.join(methods))
+
+    return MappingProxyType(table)
+
+
+def build_serializer_map(serializers):
+    """
+    Builds the (read-only) dict ``Resource.negotiate_serializer`` &
+    ``Resource.get_deserializer`` pick serializers from.
+
+    Maps each content type the serializers handle (including any
+    ``aliases``) to the first serializer handling it, in the order they're
+    given.
+
+    :param serializers: The serializers (like ``Resource.serializers``)
+    :type serializers: list
+
+    :returns: The mapping
+    :rtype: dict
+    """
+    mapping = {}
+
+    for serializer in serializers:
+        content_types = [serializer.content_type]
+        content_types.extend(getattr(serializer, 'aliases', ()))
+
+        for content_type in content_types:
+            mapping.setdefault(content_type, serializer)
+
+    return MappingProxyType(mapping)
+
+
 class Resource(object):
     """
     Defines a RESTful resource.
@@ -45,6 +142,43 @@ class Resource(object):
     Users may also choose to override the ``status_map`` and/or ``http_methods``
     on the class. These respectively control the HTTP status codes returned by
     the views and the way views are looked up (based on HTTP method & endpoint).
+
+    Setting ``fields_param`` (for instance, to ``'fields'``) lets clients ask
+    for a subset of the preparer's fields (``?fields=id,title``). The requested
+    names are available to the views as ``self.requested_fields``. Similarly,
+    ``expand_param`` lets clients ask for collapsed nested fields to be
+    expanded (``?expand=author``), exposed as ``self.requested_expansions``.
+
+    To offer more than one format, set ``serializers`` to a list of
+    serializers. The one used for the response is picked based on the
+    ``Accept`` header (the first one is the default) & request bodies are
+    deserialized based on the ``Content-Type`` header.
+
+    ``converters`` (a dictionary of types mapped to functions) teaches the
+    serializers how to encode types they don't know about, just for this
+    resource.
+
+    Setting ``streaming = True`` sends list responses a chunk (of
+    ``stream_chunk_size`` items) at a time, preparing the items as they're
+    sent. Similarly, ``stream_requests = True`` makes ``self.data`` an
+    iterator for bodies sent to list endpoints, parsed as the view consumes
+    it.
+
+    Setting ``compress = True`` compresses responses (with one of the
+    ``compress_encodings`` the client lists in ``Accept-Encoding``) once
+    they're at least ``compress_min_size`` bytes, at ``compress_level``.
+
+    Setting ``response_cache`` (to a ``restless.cache.ResponseCache``) caches
+    the serialized responses to ``GET`` requests, keyed by the endpoint, the
+    URL arguments, the response format, the query string parameters in
+    ``cache_params`` (plus ``fields_param`` & ``expand_param``) & the headers
+    in ``cache_headers``. Any other successful request to the resource clears
+    its cached responses.
+
+    Setting ``etags = True`` sends an ``ETag`` (a hash of the body) with
+    ``GET`` responses & answers a matching ``If-None-Match`` with a
+    ``304 Not Modified``. Implementing ``get_etag`` and/or
+    ``get_last_modified`` lets that happen before the view even runs.
     """
     status_map = {
         'list': OK,
@@ -72,6 +206,21 @@ class Resource(object):
     }
     preparer = Preparer()
     serializer = JSONSerializer()
+    serializers = None
+    converters = None
+    fields_param = None
+    expand_param = None
+    streaming = False
+    stream_chunk_size = 100
+    stream_requests = False
+    compress = False
+    compress_encodings = ('gzip', 'deflate')
+    compress_min_size = 1024
+    compress_level = 6
+    response_cache = None
+    cache_params = ()
+    cache_headers = ()
+    etags = False
 
     def __init__(self, *args, **kwargs):
         self.init_args = args
@@ -79,7 +228,12 @@ class Resource(object):
         self.request = None
         self.data = None
         self.endpoint = None
+        self.method = None
         self.status = 200
+        self.requested_fields = None
+        self.requested_expansions = None
+        self.response_headers = {}
+        self.cache_key = None
 
     @classmethod
     def as_list(cls, *init_args, **init_kwargs):
@@ -171,15 +325,152 @@ class Resource(object):
         # By default, Django-esque.
         return self.request.body
 
+    def request_stream(self):
+        """
+        Returns the body of the current request as a file-like object (with
+        a ``read`` method), for reading it a piece at a time.
+
+        If you're integrating with a new web framework, you might need to
+        override this method within your subclass.
+
+        :returns: The body of the request
+        :rtype: file-like object
+        """
+        # By default, Django-esque.
+        return self.request
+
+    def request_header(self, name, default=None):
+        """
+        Returns a single header from the current request.
+
+        If you're integrating with a new web framework, you might need to
+        override this method within your subclass.
+
+        :param name: The name of the header (ex. ``Content-Type``)
+        :type name: string
+
+        :param default: (Optional) What to return if the header is missing.
+            Default is ``None``
+        :type default: string
+
+        :returns: The value of the header
+        :rtype: string
+        """
+        # By default, Django-esque.
+        key = name.upper().replace('-', '_')
+
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+
+        return self.request.META.get(key, default)
+
+    def request_param(self, name, default=None):
+        """
+        Returns a single query string parameter from the current request.
+
+        If you're integrating with a new web framework, you might need to
+        override this method within your subclass.
+
+        :param name: The name of the parameter
+        :type name: string
+
+        :param default: (Optional) What to return if the parameter is missing.
+            Default is ``None``
+        :type default: string
+
+        :returns: The value of the parameter
+        :rtype: string
+        """
+        # By default, Django-esque.
+        return self.request.GET.get(name, default)
+
+    def get_content_type(self, status=OK):
+        """
+        Returns the ``Content-Type`` to send the response with.
+
+        :param status: (Optional) The status code of the response. Default is
+            ``200``
+        :type status: integer
+
+        :returns: The content type
+        :rtype: string
+        """
+        if status == NO_CONTENT:
+            # Avoid crashing the client when it tries to parse nonexisting JSON.
+            return 'text/plain'
+
+        return getattr(self.serializer, 'content_type', None) or 'application/json'
+
+    def encode_response(self, data, status=OK):
+        """
+        Applies any content coding (ie. compression) to the response body,
+        filling in the matching headers (``Content-Encoding`` & ``Vary``) in
+        ``self.response_headers``.
+
+        Called by ``build_response``, which should send the returned body along
+        with ``self.response_headers``.
+
+        :param data: The body of the response
+        :type data: bytes (or an iterable of bytes, if streamed)
+
+        :param status: (Optional) The status code of the response. Default is
+            ``200``
+        :type status: integer
+
+        :returns: The body to send
+        """
+        vary = []
+
+        if self.serializers:
+            vary.append('Accept')
+
+        if self.compress:
+            vary.append('Accept-Encoding')
+
+        if vary:
+            self.response_headers['Vary'] = ', '.join(vary)
+
+        if not self.compress or status in (NO_CONTENT, NOT_MODIFIED):
+            return data
+
+        streamed = not isinstance(data, (str, bytes))
+
+        if not streamed and len(data) < self.compress_min_size:
+            return data
+
+        encoding = best_encoding(
+            self.request_header('Accept-Encoding', ''),
+            tuple(self.compress_encodings)
+        )
+
+        if encoding is None:
+            return data
+
+        self.response_headers['Content-Encoding'] = encoding
+        etag = self.response_headers.get('ETag')
+
+        if etag is not None:
+            # The compressed body is a different representation, so it needs
+            # its own strong ETag.
+            self.response_headers['ETag'] = '{}-{}"'.format(etag[:-1], encoding)
+
+        if streamed:
+            return compress_iter(data, encoding, self.compress_level)
+
+        return compress(data, encoding, self.compress_level)
+
     def build_response(self, data, status=200):
         """
         Given some data, generates an HTTP response.
 
         If you're integrating with a new web framework, you **MUST**
-        override this method within your subclass.
+        override this method within your subclass. It should pass the body
+        through ``encode_response`` & send ``self.response_headers``.
 
-        :param data: The body of the response to send
-        :type data: string
+        :param data: The body of the response to send, usually as bytes that
+            can be sent as-is (when ``streaming``, list responses are an
+            iterable of bytes)
+        :type data: bytes
 
         :param status: (Optional) The status code to respond with. Default is
             ``200``
@@ -208,6 +499,11 @@ class Resource(object):
             # Add the traceback.
             data['traceback'] = format_traceback(sys.exc_info())
 
+        # Validators (from ``check_not_modified``) describe the resource,
+        # not the error.
+        self.response_headers.pop('ETag', None)
+        self.response_headers.pop('Last-Modified', None)
+
         body = self.serializer.serialize(data)
         status = getattr(err, 'status', 500)
         return self.build_response(body, status=status)
@@ -264,33 +560,446 @@ class Resource(object):
 
         :returns: A response object
         """
-        self.endpoint = endpoint
-        method = self.request_method()
+        method = self.start_request(endpoint)
 
         try:
-            # Use ``.get()`` so we can also dodge potentially incorrect
-            # ``endpoint`` errors as well.
-            if not method in self.http_methods.get(endpoint, {}):
-                raise MethodNotImplemented(
-                    "Unsupported method '{}' for {} endpoint.".format(
-                        method,
-                        endpoint
-                    )
-                )
+            view, status = self.select_view(method, endpoint)
 
             if not self.is_authenticated():
                 raise Unauthorized()
 
-            self.data = self.deserialize(method, endpoint, self.request_body())
-            view_method = getattr(self, self.http_methods[endpoint][method])
-            data = view_method(*args, **kwargs)
-            serialized = self.serialize(method, endpoint, data)
+            cached = self.get_early_response(method, endpoint, args, kwargs)
+
+            if cached is not None:
+                status, serialized = cached
+            else:
+                self.data = self.deserialize_request(method, endpoint)
+                data = view(self, *args, **kwargs)
+                serialized = self.serialize(method, endpoint, data)
         except Exception as err:
             return self.handle_error(err)
 
-        status = self.status_map.get(self.http_methods[endpoint][method], OK)
+        status, serialized = self.finish_response(
+            method, status, serialized, cached is not None
+        )
         return self.build_response(serialized, status=status)
 
+    def start_request(self, endpoint):
+        """
+        Resets the per-request state for a new request to ``endpoint``.
+
+        The first step of ``handle``, shared with ``AsyncResource.handle``.
+
+        :param endpoint: The style of URI call (typically either ``list`` or
+            ``detail``)
+        :type endpoint: string
+
+        :returns: The HTTP method of the request
+        :rtype: string
+        """
+        self.endpoint = endpoint
+        # Set here too, in case a subclass' ``__init__`` skips ours.
+        self.response_headers = {}
+        self.cache_key = None
+        self.method = self.request_method()
+        return self.method
+
+    def select_view(self, method, endpoint):
+        """
+        Picks the serializer for the response & the view for the request
+        (see ``get_route``).
+
+        :param method: The HTTP method of the request
+        :type method: string
+
+        :param endpoint: The style of URI call (typically either ``list`` or
+            ``detail``)
+        :type endpoint: string
+
+        :returns: A tuple of the view function (taking the resource as its
+            first argument) & the status code for a successful response
+        :rtype: tuple
+        """
+        self.select_serializer()
+        _, view, status = self.get_route(method, endpoint)
+        return view, status
+
+    def get_early_response(self, method, endpoint, args, kwargs):
+        """
+        Picks the preparer for the request, then checks whether it can be
+        answered without running the view (from ``If-None-Match``/
+        ``If-Modified-Since`` or the response cache).
+
+        Called once the request is authenticated.
+
+        :returns: A ``(status, serialized)`` tuple or ``None`` to run the view
+        :rtype: tuple
+        """
+        self.select_preparer()
+
+        if self.check_not_modified(method, endpoint, args, kwargs):
+            return NOT_MODIFIED, b''
+
+        return self.get_cached_response(method, endpoint, args, kwargs)
+
+    def finish_response(self, method, status, serialized, cached):
+        """
+        Stores a freshly serialized response in the response cache & swaps
+        it for a ``304 Not Modified`` if the client already has it.
+
+        :param method: The HTTP method of the request
+        :type method: string
+
+        :param status: The status code of the response
+        :type status: int
+
+        :param serialized: The serialized body
+        :type serialized: bytes
+
+        :param cached: Whether the response came from ``get_early_response``
+        :type cached: bool
+
+        :returns: The ``(status, serialized)`` to send
+        :rtype: tuple
+        """
+        if not cached:
+            self.update_response_cache(method, status, serialized)
+
+        if self.check_body_etag(method, status, serialized):
+            return NOT_MODIFIED, b''
+
+        return status, serialized
+
+    def get_etag(self, *args, **kwargs):
+        """
+        Returns a version for the response to a ``GET`` request, checked
+        before the view runs.
+
+        This should be cheap to work out & change whenever the response would
+        (say, a revision number or an update timestamp). It's combined with
+        the response format & requested fields into the ``ETag``.
+
+        ``self.endpoint`` says which endpoint is being requested.
+
+        :param args: The positional URI parameters
+        :param kwargs: The keyword URI parameters
+
+        :returns: A version or ``None`` (the default) to skip the early check
+        """
+        return None
+
+    def get_last_modified(self, *args, **kwargs):
+        """
+        Returns when the response to a ``GET`` request last changed, checked
+        before the view runs. Sent as the ``Last-Modified`` header &
+        compared to ``If-Modified-Since``.
+
+        ``self.endpoint`` says which endpoint is being requested.
+
+        :param args: The positional URI parameters
+        :param kwargs: The keyword URI parameters
+
+        :returns: A ``datetime`` (naive ones are taken to be in UTC) or
+            ``None`` (the default)
+        """
+        return None
+
+    def get_matching_etag(self, etag):
+        """
+        Checks an ``ETag`` against the request's ``If-None-Match`` header.
+
+        Tags the client got for a compressed copy of the response also match.
+
+        :param etag: The (quoted) entity tag
+        :type etag: string
+
+        :returns: The client's matching tag or ``None``
+        :rtype: string
+        """
+        header = self.request_header('If-None-Match')
+
+        if not header:
+            return None
+
+        for client_etag in parse_etags(header):
+            if client_etag == '*' or client_etag == etag:
+                return client_etag
+
+            for encoding in self.compress_encodings:
+                suffix = '-{}"'.format(encoding)
+
+                if client_etag.endswith(suffix) and client_etag[:-len(suffix)] == etag[:-1]:
+                    return client_etag
+
+        return None
+
+    def check_not_modified(self, method, endpoint, args, kwargs):
+        """
+        Before the view runs, works out whether the client's copy of the
+        response to a ``GET`` request is still current, using ``get_etag`` &
+        ``get_last_modified``. Also fills in the ``ETag`` & ``Last-Modified``
+        headers (which ``build_error`` drops again if the request fails).
+
+        :returns: Whether to send a ``304 Not Modified``
+        :rtype: bool
+        """
+        if method != 'GET':
+            return False
+
+        etag = None
+        version = self.get_etag(*args, **kwargs)
+
+        if version is not None:
+            variant = self.get_cache_key(endpoint, args, kwargs)
+            digest = hashlib.sha1(repr((version, variant)).encode('utf-8'))
+            etag = '"{}"'.format(digest.hexdigest())
+            self.response_headers['ETag'] = etag
+
+        last_modified = self.get_last_modified(*args, **kwargs)
+
+        if last_modified is not None:
+            self.response_headers['Last-Modified'] = http_date(last_modified)
+
+        if self.request_header('If-None-Match'):
+            # Takes precedence over ``If-Modified-Since``.
+            return etag is not None and self.check_etag(etag)
+
+        if last_modified is None:
+            return False
+
+        since = parse_http_date(self.request_header('If-Modified-Since'))
+
+        if since is None:
+            return False
+
+        # HTTP dates only go down to the second.
+        modified = parse_http_date(self.response_headers['Last-Modified'])
+        return modified <= since
+
+    def check_etag(self, etag):
+        """
+        Whether the client already has the response with the given ``ETag``.
+
+        If so, the ``ETag`` header is set to the client's own tag, so that the
+        ``304 Not Modified`` matches whichever copy it has.
+
+        :rtype: bool
+        """
+        client_etag = self.get_matching_etag(etag)
+
+        if client_etag is None:
+            return False
+
+        if client_etag != '*':
+            self.response_headers['ETag'] = client_etag
+
+        return True
+
+    def check_body_etag(self, method, status, serialized):
+        """
+        After the response to a ``GET`` request has been serialized, adds an
+        ``ETag`` made from the body (if ``etags`` is on & ``get_etag`` didn't
+        already provide one) & checks it against the request.
+
+        Streamed responses don't get one.
+
+        :returns: Whether to send a ``304 Not Modified`` instead
+        :rtype: bool
+        """
+        if method != 'GET' or status != OK:
+            return False
+
+        etag = self.response_headers.get('ETag')
+
+        if etag is None:
+            if not self.etags or not isinstance(serialized, (str, bytes)):
+                return False
+
+            if isinstance(serialized, str):
+                serialized = serialized.encode('utf-8')
+
+            etag = '"{}"'.format(hashlib.sha1(serialized).hexdigest())
+            self.response_headers['ETag'] = etag
+
+        return self.check_etag(etag)
+
+    def get_cache_namespace(self):
+        """
+        Returns the namespace the resource's cached responses are grouped
+        under (& invalidated by).
+
+        Defaults to the full name of the resource's class. Override it to
+        share a namespace between resources, so writes to one clear the
+        others' cached responses too.
+
+        :rtype: string
+        """
+        cls = type(self)
+        return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+    def get_cache_key(self, endpoint, args, kwargs):
+        """
+        Returns what identifies the response to a ``GET`` request, within the
+        resource's namespace.
+
+        Override this to add anything else the response depends on (like the
+        current user) or return ``None`` to skip caching the request.
+
+        :param endpoint: The style of URI call (typically either ``list`` or
+            ``detail``)
+        :type endpoint: string
+
+        :param args: The positional URI parameters
+        :type args: tuple
+
+        :param kwargs: The keyword URI parameters
+        :type kwargs: dict
+
+        :returns: A hashable key or ``None``
+        :rtype: tuple
+        """
+        params = [self.fields_param, self.expand_param]
+        params.extend(self.cache_params)
+        return (
+            endpoint,
+            args,
+            tuple(sorted(kwargs.items())),
+            self.get_content_type(),
+            tuple([self.request_param(name) for name in params if name]),
+            tuple([self.request_header(name) for name in self.cache_headers]),
+        )
+
+    def get_cached_response(self, method, endpoint, args, kwargs):
+        """
+        Looks up the cached response to a ``GET`` request (if there's a
+        ``response_cache``).
+
+        Also sets ``self.cache_key``, which ``update_response_cache`` stores
+        the response under.
+
+        :returns: A tuple of the status code & the serialized body, or
+            ``None`` if it isn't cached
+        :rtype: tuple
+        """
+        self.cache_key = None
+
+        if self.response_cache is None or method != 'GET':
+            return None
+
+        key = self.get_cache_key(endpoint, args, kwargs)
+
+        if key is None:
+            return None
+
+        self.cache_key = self.response_cache.make_key(
+            self.get_cache_namespace(),
+            key
+        )
+        return self.response_cache.get(self.cache_key)
+
+    def update_response_cache(self, method, status, serialized):
+        """
+        Updates the ``response_cache`` after a successful request.
+
+        The response to a ``GET`` request is stored (unless it was streamed),
+        while any other method clears the resource's cached responses.
+
+        :param method: The HTTP method of the request
+        :type method: string
+
+        :param status: The status code of the response
+        :type status: integer
+
+        :param serialized: The serialized body
+        :type serialized: bytes
+        """
+        if self.response_cache is None:
+            return
+
+        if method != 'GET':
+            self.response_cache.invalidate(self.get_cache_namespace())
+        elif self.cache_key is not None and isinstance(serialized, (str, bytes)):
+            self.response_cache.set(self.cache_key, (status, serialized))
+
+    def get_dispatch_table(self, rebuild=False):
+        """
+        Returns the table ``handle`` dispatches requests with (see
+        ``build_dispatch_table``).
+
+        It's built from ``http_methods`` & ``status_map`` the first time it's
+        needed, then shared by every instance of the class. If an instance
+        has its own ``http_methods`` or ``status_map``, a table is built just
+        for it.
+
+        :param rebuild: (Optional) Whether to build the class' table again.
+            Default is ``False``
+        :type rebuild: bool
+
+        :returns: The table
+        :rtype: dict
+        """
+        cls = type(self)
+
+        if 'http_methods' in self.__dict__ or 'status_map' in self.__dict__:
+            return build_dispatch_table(cls, self.http_methods, self.status_map)
+
+        table = None if rebuild else cls.__dict__.get('_dispatch_table')
+
+        if table is None:
+            table = build_dispatch_table(cls, cls.http_methods, cls.status_map)
+            cls._dispatch_table = table
+
+        return table
+
+    def get_route(self, method, endpoint):
+        """
+        Finds the view for a request in the dispatch table.
+
+        Raises ``MethodNotAllowed`` (setting the ``Allow`` header) if the
+        endpoint doesn't handle a standard HTTP method &
+        ``MethodNotImplemented`` for anything else it doesn't handle.
+
+        :param method: The HTTP method of the request
+        :type method: string
+
+        :param endpoint: The style of URI call (typically either ``list`` or
+            ``detail``)
+        :type endpoint: string
+
+        :returns: A tuple of the view's name, the view function (taking the
+            resource as its first argument) & the status code for a successful
+            response
+        :rtype: tuple
+        """
+        table = self.get_dispatch_table()
+
+        if endpoint not in table and endpoint in self.http_methods:
+            # Added to ``http_methods`` after the table was built (say, by an
+            # ``__init__``).
+            table = self.get_dispatch_table(rebuild=True)
+
+        if endpoint in table:
+            routes, allow = table[endpoint]
+
+            if method in routes:
+                return routes[method]
+
+            if method in STANDARD_METHODS:
+                self.response_headers['Allow'] = allow
+                raise MethodNotAllowed(
+                    "Method '{}' not allowed for {} endpoint.".format(
+                        method,
+                        endpoint
+                    )
+                )
+
+        raise MethodNotImplemented(
+            "Unsupported method '{}' for {} endpoint.".format(
+                method,
+                endpoint
+            )
+        )
+
     def handle_error(self, err):
         """
         When an exception is encountered, this generates a serialized error
@@ -307,6 +1016,246 @@ class Resource(object):
 
         return self.build_error(err)
 
+    def select_serializer(self):
+        """
+        Picks the serializer to use for the response, based on the ``Accept``
+        header.
+
+        Only applies if the resource has several ``serializers``, in which
+        case ``self.serializer`` is set to the chosen one. If the resource
+        has ``converters``, ``self.serializer`` is a copy using them.
+
+        Raises ``NotAcceptable`` if the client won't accept any of them.
+        """
+        if self.serializers:
+            self.serializer = self.negotiate_serializer()
+
+        if self.converters:
+            self.serializer = self.get_converting_serializer(self.serializer)
+
+    def get_converting_serializer(self, serializer):
+        """
+        Returns a copy of a serializer using the resource's ``converters``
+        (see ``with_converters``).
+
+        Like the dispatch table, copies are made the first time they're
+        needed, then shared by every instance of the class (& made again if
+        the class' ``converters`` are reassigned). They're only kept while the
+        original serializer is around. If an instance has its own
+        ``converters``, a copy is made just for it.
+
+        :param serializer: The serializer to copy
+        :type serializer: ``Serializer``
+
+        :returns: A serializer
+        """
+        cls = type(self)
+
+        if 'converters' in self.__dict__:
+            return serializer.with_converters(self.converters)
+
+        cached = cls.__dict__.get('_converting_serializers')
+
+        if cached is None or cached[0] is not cls.converters:
+            cached = (cls.converters, weakref.WeakKeyDictionary())
+            cls._converting_serializers = cached
+
+        copied = cached[1].get(serializer)
+
+        if copied is None:
+            copied = serializer.with_converters(cls.converters)
+            cached[1][serializer] = copied
+
+        return copied
+
+    def get_serializer_map(self):
+        """
+        Returns the content types the ``serializers`` handle, mapped to the
+        serializer for each (see ``build_serializer_map``).
+
+        Like the dispatch table, it's built the first time it's needed, then
+        shared by every instance of the class (& built again if the class'
+        ``serializers`` are reassigned). If an instance has its own
+        ``serializers``, a mapping is built just for it.
+
+        :returns: The mapping
+        :rtype: dict
+        """
+        cls = type(self)
+
+        if 'serializers' in self.__dict__:
+            return build_serializer_map(self.serializers)
+
+        cached = cls.__dict__.get('_serializer_map')
+
+        if cached is None or cached[0] is not cls.serializers:
+            cached = (cls.serializers, build_serializer_map(cls.serializers))
+            cls._serializer_map = cached
+
+        return cached[1]
+
+    def negotiate_serializer(self):
+        """
+        Picks one of the ``serializers``, based on the ``Accept`` header.
+
+        Raises ``NotAcceptable`` if the client won't accept any of them.
+
+        :returns: A serializer
+        """
+        serializers = self.get_serializer_map()
+        content_type = best_match(
+            self.request_header('Accept', ''),
+            tuple(serializers)
+        )
+
+        if content_type is None:
+            # Send the error in the default format.
+            self.serializer = self.serializers[0]
+            raise NotAcceptable(
+                "Can't respond with any of the accepted content types. "
+                "Available: {}.".format(', '.join(serializers))
+            )
+
+        return serializers[content_type]
+
+    def get_deserializer(self):
+        """
+        Returns the serializer to deserialize the request body with.
+
+        If the resource has several ``serializers``, this is picked based on
+        the ``Content-Type`` header. Otherwise (or without the header), it's
+        ``self.serializer``.
+
+        Raises ``UnsupportedMediaType`` if none of them handle the
+        ``Content-Type``.
+
+        :returns: A serializer
+        """
+        if not self.serializers:
+            return self.serializer
+
+        content_type = self.request_header('Content-Type')
+
+        if not content_type:
+            return self.serializer
+
+        content_type = content_type.partition(';')[0].strip().lower()
+        serializer = self.get_serializer_map().get(content_type)
+
+        if serializer is not None:
+            return serializer
+
+        raise UnsupportedMediaType(
+            "Unsupported content type '{}'.".format(content_type)
+        )
+
+    def get_requested_names(self, param):
+        """
+        Parses a comma-separated list of names out of a query string
+        parameter.
+
+        :param param: The name of the parameter (may be ``None``)
+        :type param: string
+
+        :returns: The names (in the order given, without duplicates) or
+            ``None`` if the parameter is disabled or wasn't provided
+        :rtype: list or None
+        """
+        if not param:
+            return None
+
+        value = self.request_param(param)
+
+        if not value:
+            return None
+
+        names = []
+
+        for name in value.split(','):
+            name = name.strip()
+
+            if name and name not in names:
+                names.append(name)
+
+        return names or None
+
+    def get_requested_fields(self):
+        """
+        Returns the fields the client asked for (see ``fields_param``).
+
+        :returns: The requested field names or ``None``
+        :rtype: list or None
+        """
+        return self.get_requested_names(self.fields_param)
+
+    def get_requested_expansions(self):
+        """
+        Returns the nested fields the client asked to have expanded (see
+        ``expand_param``).
+
+        :returns: The requested field names or ``None``
+        :rtype: list or None
+        """
+        return self.get_requested_names(self.expand_param)
+
+    def select_preparer(self):
+        """
+        Picks the preparer to use for the current request.
+
+        If the client asked for collapsed nested fields to be expanded (see
+        ``expand_param``) or for a subset of the fields (see
+        ``fields_param``), this swaps ``self.preparer`` for an expanded and/or
+        restricted version of it. Preparers without ``expand``/``restrict``
+        methods are left as-is.
+
+        Raises ``BadRequest`` if any of the requested fields don't exist.
+        """
+        self.requested_expansions = self.get_requested_expansions()
+        self.requested_fields = self.get_requested_fields()
+        expand = getattr(self.preparer, 'expand', None)
+
+        if self.requested_expansions is not None and expand is not None:
+            try:
+                self.preparer = expand(self.requested_expansions)
+            except KeyError as err:
+                raise BadRequest(
+                    "Can't expand field(s): {}".format(err.args[0])
+                )
+
+        restrict = getattr(self.preparer, 'restrict', None)
+
+        if self.requested_fields is not None and restrict is not None:
+            try:
+                self.preparer = restrict(self.requested_fields)
+            except KeyError as err:
+                raise BadRequest("Unknown field(s): {}".format(err.args[0]))
+
+    def deserialize_request(self, method, endpoint):
+        """
+        Reads & deserializes the body of the current request.
+
+        Usually, this hands the whole body to ``deserialize``. If
+        ``stream_requests`` is on, bodies sent to list-style endpoints are
+        instead deserialized lazily from ``request_stream`` (if the
+        deserializer supports it), so ``self.data`` is an iterator of items.
+
+        :param method: The HTTP method of the current request
+        :type method: string
+
+        :param endpoint: The endpoint style (``list`` or ``detail``)
+        :type endpoint: string
+
+        :returns: The deserialized data
+        :rtype: ``list``, ``dict`` or iterator
+        """
+        if self.stream_requests and endpoint == 'list':
+            deserializer = self.get_deserializer()
+
+            if hasattr(deserializer, 'deserialize_iter'):
+                return deserializer.deserialize_iter(self.request_stream())
+
+        return self.deserialize(method, endpoint, self.request_body())
+
     def deserialize(self, method, endpoint, body):
         """
         A convenience method for deserializing the body of a request.
@@ -341,7 +1290,7 @@ class Resource(object):
         :returns: The deserialized body or an empty ``list``
         """
         if body:
-            return self.serializer.deserialize(body)
+            return self.get_deserializer().deserialize(body)
 
         return []
 
@@ -355,7 +1304,7 @@ class Resource(object):
         :returns: The deserialized body or an empty ``dict``
         """
         if body:
-            return self.serializer.deserialize(body)
+            return self.get_deserializer().deserialize(body)
 
         return {}
 
@@ -376,7 +1325,7 @@ class Resource(object):
         :type data: string
 
         :returns: A serialized version of the data
-        :rtype: string
+        :rtype: bytes
         """
         if endpoint == 'list':
             # Create is a special-case, because you POST it to the collection,
@@ -395,20 +1344,70 @@ class Resource(object):
         :type data: list or iterable
 
         :returns: The serialized body
-        :rtype: string
+        :rtype: bytes
         """
         if data is None:
-            return ''
+            return b''
+
+        if self.should_stream_list():
+            return self.serialize_list_stream(data)
 
         # Check for a ``Data``-like object. We should assume ``True`` (all
         # data gets prepared) unless it's explicitly marked as not.
         if not getattr(data, 'should_prepare', True):
             prepped_data = data.value
         else:
-            prepped_data = [self.prepare(item) for item in data]
+            prepped_data = self.prepare_many(data)
+
+        if getattr(self.serializer, 'wrap_lists', True):
+            prepped_data = self.wrap_list_response(prepped_data)
+
+        return self.serializer.serialize(prepped_data)
+
+    def should_stream_list(self):
+        """
+        Whether list responses should be streamed.
+
+        They are if ``streaming`` is on (or the serializer always streams
+        lists, like ``NDJSONSerializer``) & the serializer has a
+        ``serialize_stream`` method.
+
+        :rtype: bool
+        """
+        if not hasattr(self.serializer, 'serialize_stream'):
+            return False
+
+        return self.streaming or getattr(self.serializer, 'stream_lists', False)
+
+    def serialize_list_stream(self, data):
+        """
+        Given a collection of data (``objects`` or ``dicts``), lazily
+        serializes them.
+
+        Used in place of ``serialize_list`` when ``should_stream_list`` says
+        so. The items are prepared ``stream_chunk_size``
+        at a time, as the response is sent.
+
+        :param data: The collection of items to serialize
+        :type data: list or iterable
+
+        :returns: The serialized body, in pieces
+        :rtype: iterable of bytes
+        """
+        if not getattr(data, 'should_prepare', True):
+            chunks = iter_chunks(data.value, self.stream_chunk_size)
+        else:
+            chunks = map(
+                self.prepare_many,
+                iter_chunks(data, self.stream_chunk_size)
+            )
+
+        final_data = STREAM_MARKER
 
-        final_data = self.wrap_list_response(prepped_data)
-        return self.serializer.serialize(final_data)
+        if getattr(self.serializer, 'wrap_lists', True):
+            final_data = self.wrap_list_response(STREAM_MARKER)
+
+        return self.serializer.serialize_stream(final_data, STREAM_MARKER, chunks)
 
     def serialize_detail(self, data):
         """
@@ -418,10 +1417,10 @@ class Resource(object):
         :type data: object or dict
 
         :returns: The serialized body
-        :rtype: string
+        :rtype: bytes
         """
         if data is None:
-            return ''
+            return b''
 
         # Check for a ``Data``-like object. We should assume ``True`` (all
         # data gets prepared) unless it's explicitly marked as not.
@@ -445,6 +1444,28 @@ class Resource(object):
         """
         return self.preparer.prepare(data)
 
+    def prepare_many(self, data):
+        """
+        Given a collection of items (``objects`` or ``dicts``), prepares them
+        all for serialization.
+
+        If the ``preparer`` offers a ``prepare_many`` method, the whole
+        collection is handed to it at once. If not (or if ``prepare`` has been
+        overridden on the resource), this calls ``prepare`` on each item.
+
+        :param data: The collection of items to prepare
+        :type data: list or iterable
+
+        :returns: A list of potentially reshaped dicts
+        :rtype: list
+        """
+        prepare_many = getattr(self.preparer, 'prepare_many', None)
+
+        if prepare_many is None or type(self).prepare is not Resource.prepare:
+            return [self.prepare(item) for item in data]
+
+        return prepare_many(data)
+
     def wrap_list_response(self, data):
         """
         Takes a list of data & wraps it in a dictionary (within the ``objects``
@@ -479,7 +1500,7 @@ class Resource(object):
         :returns: Whether the request is authenticated or not.
         :rtype: boolean
         """
-        if self.request_method() == 'GET':
+        if (self.method or self.request_method()) == 'GET':
             return True
 
         return False
@@ -590,3 +1611,124 @@ class Resource(object):
         :returns: ``None``
         """
         raise MethodNotImplemented()
+
+
+async def _resolve(value):
+    # Awaits anything awaitable (including futures from thread pools),
+    # passing everything else through.
+    if isinstance(value, concurrent.futures.Future):
+        value = asyncio.wrap_future(value)
+
+    if inspect.isawaitable(value):
+        value = await value
+
+    return value
+
+
+class AsyncResource(Resource):
+    """
+    A ``Resource`` for ``asyncio``-based frameworks, whose ``handle`` is a
+    coroutine.
+
+    Views, ``is_authenticated``, ``deserialize_request`` (& so
+    ``request_body``, via an overridden ``deserialize_request``),
+    ``build_response`` & ``handle_error`` may all be ``async def`` (or return
+    something awaitable), as may the preparer's ``prepare``/``prepare_many``
+    (or the resource's ``prepare``). Plain methods work as usual, so
+    synchronous code can be moved over gradually. Nested preparers (inside a
+    ``SubPreparer``/``CollectionSubPreparer``) are always called
+    synchronously, so they can't be coroutines.
+
+    While a view awaits I/O, the worker can get on with other requests.
+
+    Framework adapters subclass this & implement the usual hooks
+    (``request_method``, ``request_body``, ``build_response``...) just like
+    for ``Resource``.
+    """
+    async def handle(self, endpoint, *args, **kwargs):
+        """
+        The coroutine version of ``Resource.handle``, awaiting whichever
+        steps return something awaitable.
+
+        :returns: A response object
+        """
+        method = self.start_request(endpoint)
+
+        try:
+            view, status = self.select_view(method, endpoint)
+
+            if not await _resolve(self.is_authenticated()):
+                raise Unauthorized()
+
+            cached = self.get_early_response(method, endpoint, args, kwargs)
+
+            if cached is not None:
+                status, serialized = cached
+            else:
+                self.data = await _resolve(
+                    self.deserialize_request(method, endpoint)
+                )
+                data = await _resolve(view(self, *args, **kwargs))
+                data = await self.prepare_async(method, endpoint, data)
+                serialized = self.serialize(method, endpoint, data)
+        except Exception as err:
+            return await _resolve(self.handle_error(err))
+
+        status, serialized = self.finish_response(
+            method, status, serialized, cached is not None
+        )
+        return await _resolve(self.build_response(serialized, status=status))
+
+    def has_async_preparer(self):
+        """
+        Whether preparing the data involves any coroutines (the preparer's
+        ``prepare``/``prepare_many`` or the resource's ``prepare``).
+
+        :rtype: bool
+        """
+        return (
+            inspect.iscoroutinefunction(self.prepare) or
+            inspect.iscoroutinefunction(getattr(self.preparer, 'prepare', None)) or
+            inspect.iscoroutinefunction(getattr(self.preparer, 'prepare_many', None))
+        )
+
+    async def prepare_async(self, method, endpoint, data):
+        """
+        Prepares the data returned by a view up front, if the preparation
+        involves coroutines (see ``has_async_preparer``). List items are
+        prepared concurrently.
+
+        Otherwise, the data is left to ``serialize`` to prepare as usual.
+
+        :param method: The HTTP method of the current request
+        :type method: string
+
+        :param endpoint: The endpoint style (``list`` or ``detail``)
+        :type endpoint: string
+
+        :param data: The data returned by the view
+
+        :returns: The prepared data (as a ``Data`` object) or the data as-is
+        """
+        if (
+            data is None or
+            not getattr(data, 'should_prepare', True) or
+            not self.has_async_preparer()
+        ):
+            return data
+
+        if endpoint != 'list' or method == 'POST':
+            return Data(await _resolve(self.prepare(data)), should_prepare=False)
+
+        prepare_many = getattr(self.preparer, 'prepare_many', None)
+
+        if (
+            inspect.iscoroutinefunction(prepare_many) and
+            type(self).prepare is Resource.prepare
+        ):
+            return Data(await prepare_many(data), should_prepare=False)
+
+        prepped = await asyncio.gather(*[
+            _resolve(self.prepare(item)) for item in data
+        ])
+        return Data(list(prepped), should_prepare=False)
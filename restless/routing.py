@@ -0,0 +1,285 @@
+from .asgi import _run_lifespan
+from .exceptions import NotFound
+from .serializers import JSONSerializer
+
+
+#: The body sent for paths no route matches.
+NOT_FOUND_BODY = JSONSerializer().serialize({'error': NotFound.msg})
+
+
+class Route(object):
+    """
+    A single route, pointing at an application (usually from a resource's
+    ``as_view``) & naming the URL arguments it takes, in order.
+    """
+    def __init__(self, path, app, params, resource_class=None):
+        self.path = path
+        self.app = app
+        self.params = params
+        self.resource_class = resource_class
+
+    def __repr__(self):
+        return '<Route: {}>'.format(self.path)
+
+
+class Node(object):
+    """
+    A node of the ``Router``'s trie, for one segment of a path.
+
+    Static segments are looked up in ``children``, while ``param`` is the
+    node for any other (non-empty) segment, which gets captured as a URL
+    argument.
+    """
+    def __init__(self):
+        self.children = {}
+        self.param = None
+        self.route = None
+
+
+class Router(object):
+    """
+    Routes requests for many resources from a single WSGI or ASGI
+    application.
+
+    Routes are compiled into a trie of path segments, so finding one takes a
+    dictionary lookup per segment (& routes without URL arguments take just
+    one), no matter how many there are. Static segments win over URL
+    arguments (so ``/posts/schema/`` goes to a custom endpoint rather than
+    the detail one), falling back to the argument if nothing matches past
+    them. Leading & trailing slashes don't matter.
+
+    The router only looks at the path. Each route leads to an application
+    from the resource's ``as_view``, which gets the URL arguments the usual
+    way (``wsgiorg.routing_args`` or the ``path_params`` in the scope) &
+    handles the HTTP method as ever.
+
+    Example::
+
+        router = Router()
+        router.add('/api/posts/', PostResource)
+        router.add('/api/users/', UserResource)
+        router.add_route(
+            '/api/posts/<post_id>/comments/', CommentResource, 'list'
+        )
+
+        application = router.as_wsgi()  # Or ``router.as_asgi()``.
+
+    """
+    def __init__(self):
+        self.root = Node()
+        self.static = {}
+        self.resource_classes = []
+
+    def add(self, prefix, resource_class, *init_args, **init_kwargs):
+        """
+        Adds routes for all of a resource's endpoints: ``list`` at
+        ``prefix``, ``detail`` at ``prefix<pk>/`` & any custom endpoints in
+        its ``http_methods`` at ``prefix<name>/``.
+
+        :param prefix: The start of the URLs to handle
+        :type prefix: string
+
+        :param resource_class: The resource (a ``WSGIResource`` or
+            ``ASGIResource`` subclass, depending on the application)
+        :type resource_class: class
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+        """
+        prefix = prefix.strip('/')
+        base = prefix + '/' if prefix else ''
+
+        for endpoint in resource_class.http_methods:
+            if endpoint == 'list':
+                path = prefix
+            elif endpoint == 'detail':
+                path = base + '<pk>'
+            else:
+                path = base + endpoint
+
+            self.add_route(
+                path, resource_class, endpoint, *init_args, **init_kwargs
+            )
+
+    def add_route(self, path, resource_class, endpoint, *init_args,
+                  **init_kwargs):
+        """
+        Adds a route to one endpoint of a resource.
+
+        Segments of the path like ``<name>`` capture that segment of the URL
+        as the ``name`` keyword argument.
+
+        Raises ``ValueError`` if the path is already routed.
+
+        :param path: The path (ex. ``/posts/<pk>/comments/``)
+        :type path: string
+
+        :param resource_class: The resource
+        :type resource_class: class
+
+        :param endpoint: The endpoint to call (ex. ``list``)
+        :type endpoint: string
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+        """
+        app = resource_class.as_view(endpoint, *init_args, **init_kwargs)
+        self.add_app(path, app, resource_class=resource_class)
+
+        if resource_class not in self.resource_classes:
+            self.resource_classes.append(resource_class)
+
+    def add_app(self, path, app, resource_class=None):
+        """
+        Adds a route to any application (of the same kind as the router's).
+
+        :param path: The path, as for ``add_route``
+        :type path: string
+
+        :param app: The WSGI or ASGI application
+        :type app: callable
+
+        :returns: The new route
+        :rtype: ``Route``
+        """
+        path = path.strip('/')
+        node = self.root
+        params = []
+
+        for segment in (path.split('/') if path else ()):
+            if segment.startswith('<') and segment.endswith('>'):
+                params.append(segment[1:-1])
+
+                if node.param is None:
+                    node.param = Node()
+
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, Node())
+
+        if node.route is not None:
+            raise ValueError("'/{}' is already routed to {!r}.".format(
+                path, node.route
+            ))
+
+        node.route = Route('/' + path, app, tuple(params), resource_class)
+
+        if not params:
+            self.static[path] = node.route
+
+        return node.route
+
+    def match(self, path):
+        """
+        Finds the route for a path.
+
+        :param path: The path of the request
+        :type path: string
+
+        :returns: The route & a dictionary of its URL arguments, or ``None``
+            if nothing matches
+        :rtype: tuple
+        """
+        path = path.strip('/')
+        route = self.static.get(path)
+
+        if route is not None:
+            return route, {}
+
+        return self._match(self.root, path.split('/'), 0, ())
+
+    def _match(self, node, segments, index, values):
+        if index == len(segments):
+            if node.route is None:
+                return None
+
+            return node.route, dict(zip(node.route.params, values))
+
+        segment = segments[index]
+        child = node.children.get(segment)
+
+        if child is not None:
+            found = self._match(child, segments, index + 1, values)
+
+            if found is not None:
+                return found
+
+        if node.param is not None and segment:
+            return self._match(
+                node.param, segments, index + 1, values + (segment,)
+            )
+
+        return None
+
+    def as_wsgi(self):
+        """
+        Returns a WSGI application for all the routes, answering paths
+        without one with a ``404 Not Found``.
+
+        :returns: WSGI application
+        """
+        match = self.match
+
+        def application(environ, start_response):
+            found = match(environ.get('PATH_INFO') or '/')
+
+            if found is None:
+                start_response('404 Not Found', [
+                    ('Content-Type', 'application/json'),
+                    ('Content-Length', str(len(NOT_FOUND_BODY))),
+                ])
+                return [NOT_FOUND_BODY]
+
+            route, kwargs = found
+            environ['wsgiorg.routing_args'] = ((), kwargs)
+            return route.app(environ, start_response)
+
+        return application
+
+    def as_asgi(self):
+        """
+        Returns an ASGI application for all the routes, answering paths
+        without one with a ``404 Not Found``.
+
+        ``lifespan`` events call the ``startup``/``shutdown`` of each
+        resource (in the order they were added).
+
+        :returns: ASGI application
+        """
+        match = self.match
+
+        async def app(scope, receive, send):
+            if scope['type'] == 'lifespan':
+                return await self.handle_lifespan(receive, send)
+
+            found = match(scope['path'])
+
+            if found is None:
+                await send({
+                    'type': 'http.response.start',
+                    'status': NotFound.status,
+                    'headers': [
+                        (b'content-type', b'application/json'),
+                        (b'content-length', str(len(NOT_FOUND_BODY)).encode('latin-1')),
+                    ],
+                })
+                await send({'type': 'http.response.body', 'body': NOT_FOUND_BODY})
+                return
+
+            route, kwargs = found
+            scope = dict(scope, path_params=kwargs)
+            return await route.app(scope, receive, send)
+
+        return app
+
+    async def handle_lifespan(self, receive, send):
+        """
+        Answers the ASGI ``lifespan`` protocol for all the resources.
+        """
+        await _run_lifespan(receive, send, self.resource_classes)
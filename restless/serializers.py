@@ -1,5 +1,18 @@
+import codecs
+import copy
+import enum
+import re
+
 from .exceptions import BadRequest
-from .utils import json, MoreTypesJSONEncoder
+from .utils import (json, default_converters, more_types_default,
+                    TypeConverters)
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'-?[0-9][0-9.eE+-]*')
+
+#: The most ``iter_json_array`` will buffer for a single item.
+MAX_ITEM_SIZE = 16 * 1024 * 1024
 
 
 class Serializer(object):
@@ -11,7 +24,24 @@ class Serializer(object):
 
     Either subclass this or provide an object with the same
     ``deserialize/serialize`` methods on it.
+
+    ``content_type`` is what responses are sent as & what's matched against
+    the ``Accept``/``Content-Type`` headers when a resource offers several
+    serializers. ``aliases`` lists other content types it understands.
+
+    Serializers that encode values through a ``TypeConverters`` registry keep
+    it as ``converters``.
+
+    ``wrap_lists`` says whether list responses get wrapped in an object
+    (``{"objects": [...]}``) & ``stream_lists`` whether they're always
+    streamed (if the serializer has a ``serialize_stream`` method).
     """
+    content_type = None
+    aliases = ()
+    converters = None
+    wrap_lists = True
+    stream_lists = False
+
     def deserialize(self, body):
         """
         Handles deserializing data coming from the user.
@@ -20,7 +50,7 @@ class Serializer(object):
         containing the data.
 
         :param body: The body of the current request
-        :type body: string
+        :type body: bytes (or string)
 
         :returns: The deserialized data
         :rtype: ``list`` or ``dict``
@@ -31,19 +61,317 @@ class Serializer(object):
         """
         Handles serializing data being sent to the user.
 
-        Should return a plain Python string containing the serialized data
-        in the appropriate format.
+        Should return bytes containing the serialized data in the appropriate
+        format, ready to be sent as-is. (Plain strings work too, but get
+        encoded again by the web framework.)
 
         :param data: The body for the response
         :type data: ``list`` or ``dict``
 
         :returns: A serialized version of the data
-        :rtype: string
+        :rtype: bytes
         """
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def with_converters(self, converters):
+        """
+        Returns a copy of the serializer that also uses the given converters
+        (on top of its own).
+
+        :param converters: Types mapped to the functions that convert them
+        :type converters: dict
+
+        :returns: A serializer
+        """
+        serializer = copy.copy(self)
+        serializer.converters = TypeConverters(
+            converters,
+            parent=self.converters
+        )
+        return serializer
+
+
+def _has_non_finite(data):
+    # Whether there are any ``NaN`` or infinite floats in the data.
+    pending = [data]
+
+    while pending:
+        value = pending.pop()
+
+        if isinstance(value, float):
+            if value - value != 0.0:
+                return True
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+
+    return False
+
+
+class JSONBackend(object):
+    """
+    The standard library ``json`` module, used by ``JSONSerializer`` by
+    default.
+
+    Other backends wrap faster JSON libraries, falling back to this one for
+    anything the library can't encode exactly the same way (like integers too
+    big for 64 bits or dictionaries with non-string keys).
+    """
+    name = 'json'
+
+    #: Types the library encodes itself, without calling ``default``, where
+    #: the standard library would. ``JSONSerializer`` uses the standard
+    #: library instead if it has converters for any of them.
+    native_types = ()
+
+    def dumps(self, data, default=more_types_default):
+        return json.dumps(data, default=default).encode('utf-8')
+
+    def loads(self, body):
+        return json.loads(body)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Uses ``orjson`` (https://github.com/ijl/orjson).
+    """
+    name = 'orjson'
+    native_types = (enum.Enum,)
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        # Hand dates & times to the ``default`` converter, which matches
+        # ``isoformat`` exactly, & dataclasses too, as the standard library
+        # can't encode them.
+        self.option = (
+            orjson.OPT_PASSTHROUGH_DATETIME |
+            orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def dumps(self, data, default=more_types_default):
+        try:
+            body = self.orjson.dumps(data, default=default, option=self.option)
+        except TypeError:
+            return super(OrjsonBackend, self).dumps(data, default=default)
+
+        # ``orjson`` writes ``NaN`` & infinities as ``null``, unlike the
+        # others. Only look for them if there's a ``null`` they could be.
+        if b'null' in body and _has_non_finite(data):
+            return super(OrjsonBackend, self).dumps(data, default=default)
+
+        return body
+
+    def loads(self, body):
+        return self.orjson.loads(body)
+
+
+class RapidJSONBackend(JSONBackend):
+    """
+    Uses ``python-rapidjson`` (https://github.com/python-rapidjson/python-rapidjson).
+    """
+    name = 'rapidjson'
+
+    def __init__(self):
+        import rapidjson
+        self.rapidjson = rapidjson
+
+    def dumps(self, data, default=more_types_default):
+        try:
+            body = self.rapidjson.dumps(data, default=default)
+        except (TypeError, ValueError, OverflowError):
+            return super(RapidJSONBackend, self).dumps(data, default=default)
+
+        return body.encode('utf-8')
+
+    def loads(self, body):
+        return self.rapidjson.loads(body)
+
+
+_default_backend = JSONBackend()
+
+
+#: The available backends, fastest first (which is the order ``'auto'`` tries
+#: them in).
+JSON_BACKENDS = [
+    OrjsonBackend,
+    RapidJSONBackend,
+    JSONBackend,
+]
+
+
+def get_json_backend(name='auto'):
+    """
+    Returns a JSON backend instance, by name.
+
+    ``'auto'`` picks the fastest one that's installed.
+
+    Raises ``ImportError`` if the library for the backend isn't installed &
+    ``ValueError`` if there's no such backend.
+    """
+    for backend_class in JSON_BACKENDS:
+        if name == 'auto':
+            try:
+                return backend_class()
+            except ImportError:
+                continue
+
+        if backend_class.name == name:
+            return backend_class()
+
+    raise ValueError("Unknown JSON backend '{}'.".format(name))
+
+
+def _may_continue(err, length):
+    # Whether a decoding error might just be down to the item being cut off
+    # by the end of the buffer, rather than invalid. Errors from truncated
+    # literals, numbers & escapes are reported within a few characters of the
+    # end, while unterminated strings are reported at their start.
+    msg = getattr(err, 'msg', '')
+    pos = getattr(err, 'pos', length)
+    return msg.startswith('Unterminated string') or pos >= length - 16
+
+
+def iter_json_array(stream, read_size=65536, max_item_size=MAX_ITEM_SIZE):
+    """
+    Lazily parses the items out of a JSON array, reading from a file-like
+    ``stream`` (of bytes) as needed.
+
+    Only the current item (& whatever's left of the last read) is held in
+    memory, so huge request bodies can be processed a piece at a time.
+
+    Raises ``BadRequest`` if the body isn't a valid JSON array, or if an item
+    is bigger than ``max_item_size`` characters.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read(buf, pos, size=read_size):
+        chunk = stream.read(size)
+
+        try:
+            text = text_decoder.decode(chunk or b'', final=not chunk)
+        except UnicodeDecodeError:
+            raise BadRequest('Request body is not valid JSON')
+
+        return buf[pos:] + text, not chunk
+
+    def skip_whitespace(buf, pos, eof):
+        # Ensures there's a non-whitespace character at ``pos`` (unless the
+        # body has run out).
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+
+            if pos < len(buf) or eof:
+                return buf, pos, eof
+
+            buf, eof = read(buf, pos)
+            pos = 0
+
+    buf, pos, eof = skip_whitespace(buf, pos, eof)
+
+    if pos == len(buf):
+        # An empty body.
+        return
+
+    if buf[pos] != '[':
+        raise BadRequest('Request body is not a JSON array')
+
+    def finish(buf, pos, eof):
+        # Only whitespace may follow the closing bracket.
+        buf, pos, eof = skip_whitespace(buf, pos + 1, eof)
+
+        if pos < len(buf):
+            raise BadRequest('Request body is not valid JSON')
+
+    buf, pos, eof = skip_whitespace(buf, pos + 1, eof)
+
+    if buf[pos:pos + 1] == ']':
+        finish(buf, pos, eof)
+        return
+
+    size = read_size
+
+    while True:
+        item = end = None
+        number = _NUMBER.match(buf, pos)
+
+        # A number running up to the end of what's been read so far might
+        # carry on in the next read (``1.`` then ``5``), so only decode it
+        # once something follows it.
+        if number is None or number.end() < len(buf) or eof:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError as err:
+                if eof or not _may_continue(err, len(buf)):
+                    raise BadRequest('Request body is not valid JSON')
+
+        if end is None:
+            if len(buf) - pos > max_item_size:
+                raise BadRequest('Request body item is too large')
+
+            # Read more each time the same item comes up short, so
+            # re-decoding a large item doesn't take quadratic time.
+            buf, eof = read(buf, pos, size)
+            pos = 0
+            size *= 2
+            continue
+
+        size = read_size
+        yield item
+        buf, pos, eof = skip_whitespace(buf, end, eof)
+        separator = buf[pos:pos + 1]
+
+        if separator == ']':
+            finish(buf, pos, eof)
+            return
+
+        if separator != ',':
+            raise BadRequest('Request body is not valid JSON')
+
+        buf, pos, eof = skip_whitespace(buf, pos + 1, eof)
+
 
 class JSONSerializer(Serializer):
+    """
+    Serializes to/from JSON.
+
+    Uses the standard library's ``json`` module by default. Pass ``backend``
+    to use a faster library instead, either by name (``'orjson'`` or
+    ``'rapidjson'``), as ``'auto'`` (the fastest one installed) or as an
+    object with ``dumps/loads`` methods.
+
+    Dates, times, ``Decimal`` & ``UUID`` objects are encoded the same way
+    (see ``restless.utils.default_converters``) regardless of the backend,
+    though whitespace & escaping may vary. Other types can be handled by
+    passing ``converters``, a dictionary of types mapped to functions that
+    convert them into something JSON can encode.
+
+    Example::
+
+        class PostResource(Resource):
+            serializer = JSONSerializer(
+                backend='auto',
+                converters={set: sorted}
+            )
+
+    """
+    content_type = 'application/json'
+
+    #: The biggest item ``deserialize_iter`` will accept from a request body.
+    max_item_size = MAX_ITEM_SIZE
+
+    def __init__(self, backend='json', converters=None):
+        if isinstance(backend, str):
+            backend = get_json_backend(backend)
+
+        self.backend = backend
+        self.converters = TypeConverters(converters, parent=default_converters)
+
     def deserialize(self, body):
         """
         The low-level deserialization.
@@ -54,15 +382,13 @@ class JSONSerializer(Serializer):
         Has no built-in smarts, simply loads the JSON.
 
         :param body: The body of the current request
-        :type body: string
+        :type body: bytes (or string)
 
         :returns: The deserialized data
         :rtype: ``list`` or ``dict``
         """
         try:
-            if isinstance(body, bytes):
-                return json.loads(body.decode('utf-8'))
-            return json.loads(body)
+            return self.backend.loads(body)
         except ValueError:
             raise BadRequest('Request body is not valid JSON')
 
@@ -79,6 +405,229 @@ class JSONSerializer(Serializer):
         :type data: string
 
         :returns: A serialized version of the data
-        :rtype: string
+        :rtype: bytes
+        """
+        backend = self.backend
+
+        for type_ in getattr(backend, 'native_types', ()):
+            if self.converters.covers(type_):
+                # The library would skip the converter.
+                backend = _default_backend
+                break
+
+        return backend.dumps(data, default=self.converters.convert)
+
+    def deserialize_iter(self, stream):
+        """
+        Lazily deserializes the items in a JSON array, reading the request
+        body from a file-like ``stream`` as needed.
+
+        :param stream: The body of the current request
+        :type stream: file-like object
+
+        :returns: A generator of the items
+        """
+        return iter_json_array(stream, max_item_size=self.max_item_size)
+
+    def serialize_stream(self, data, marker, chunks):
+        """
+        Serializes a response a piece at a time.
+
+        ``data`` is serialized as normal, except that ``marker`` (a placeholder
+        string somewhere within it) is replaced by a JSON array of the items
+        in ``chunks``, an iterable of lists of items.
+
+        :param data: The body for the response, containing the ``marker``
+        :type data: ``dict``
+
+        :param marker: The placeholder for the array
+        :type marker: string
+
+        :param chunks: The lists of items making up the array
+        :type chunks: iterable
+
+        :returns: A generator of serialized bytes
+        """
+        head, tail = self.serialize(data).split(self.serialize(marker), 1)
+        yield head + b'['
+        separator = b''
+
+        for chunk in chunks:
+            if chunk:
+                # Drop the brackets, as the chunks are all one array.
+                yield separator + self.serialize(chunk)[1:-1]
+                separator = b', '
+
+        yield b']' + tail
+
+
+class NDJSONSerializer(JSONSerializer):
+    """
+    Serializes to/from newline-delimited JSON (http://ndjson.org/), where each
+    line is a JSON document of its own.
+
+    Request bodies deserialize to a list of the documents, which makes it a
+    handy format for bulk uploads. List responses are sent one item per line
+    (without the ``{"objects": [...]}`` wrapper) & streamed, so clients can
+    handle the items as they arrive.
+    """
+    content_type = 'application/x-ndjson'
+    aliases = ('application/ndjson', 'application/jsonlines')
+    wrap_lists = False
+    stream_lists = True
+
+    #: How much of the request body to read at a time.
+    read_size = 65536
+
+    def deserialize(self, body):
+        """
+        Deserializes each (non-blank) line.
+
+        :param body: The body of the current request
+        :type body: bytes (or string)
+
+        :returns: The deserialized documents
+        :rtype: ``list``
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        return [
+            super(NDJSONSerializer, self).deserialize(line)
+            for line in body.split(b'\n')
+            if line.strip()
+        ]
+
+    def serialize(self, data):
+        """
+        Serializes a list as one document per line. Anything else is
+        serialized as a single line.
+
+        :param data: The body for the response
+        :type data: ``list`` or ``dict``
+
+        :returns: A serialized version of the data
+        :rtype: bytes
+        """
+        if not isinstance(data, (list, tuple)):
+            data = [data]
+
+        return b''.join([
+            super(NDJSONSerializer, self).serialize(item) + b'\n'
+            for item in data
+        ])
+
+    def serialize_stream(self, data, marker, chunks):
+        """
+        Serializes the items in ``chunks`` (an iterable of lists of items) a
+        chunk at a time, one document per line.
+
+        There's no way to wrap the items in anything else, so ``data`` should
+        be the ``marker`` itself.
+
+        :returns: A generator of serialized bytes
+        """
+        if data != marker:
+            raise ValueError("NDJSON responses can't be wrapped.")
+
+        for chunk in chunks:
+            if chunk:
+                yield self.serialize(chunk)
+
+    def deserialize_iter(self, stream):
+        """
+        Lazily deserializes each (non-blank) line, reading the request body
+        from a file-like ``stream`` as needed.
+
+        :param stream: The body of the current request
+        :type stream: file-like object
+
+        :returns: A generator of the documents
+        """
+        # The pieces of the current (unfinished) line, joined once it ends.
+        pending = []
+        pending_size = 0
+
+        while True:
+            chunk = stream.read(self.read_size)
+
+            if not chunk:
+                break
+
+            lines = chunk.split(b'\n')
+            last = lines.pop()
+
+            if lines:
+                lines[0] = b''.join(pending) + lines[0]
+                pending, pending_size = [], 0
+
+            if last:
+                pending.append(last)
+                pending_size += len(last)
+
+                if pending_size > self.max_item_size:
+                    raise BadRequest('Request body item is too large')
+
+            for line in lines:
+                if line.strip():
+                    yield super(NDJSONSerializer, self).deserialize(line)
+
+        buf = b''.join(pending)
+
+        if buf.strip():
+            yield super(NDJSONSerializer, self).deserialize(buf)
+
+
+class MsgPackSerializer(Serializer):
+    """
+    Serializes to/from MessagePack (https://msgpack.org/), a compact binary
+    format that's quicker to encode & decode than JSON.
+
+    Requires the ``msgpack`` library. Dates, times, ``Decimal`` & ``UUID``
+    objects are encoded as strings, the same as ``JSONSerializer`` does, &
+    ``converters`` works the same way too.
+
+    Example::
+
+        class PostResource(Resource):
+            serializers = [JSONSerializer(), MsgPackSerializer()]
+
+    """
+    content_type = 'application/msgpack'
+    aliases = ('application/x-msgpack',)
+
+    def __init__(self, converters=None):
+        import msgpack
+        self.msgpack = msgpack
+        self.converters = TypeConverters(converters, parent=default_converters)
+
+    def deserialize(self, body):
+        """
+        Unpacks the MessagePack body.
+
+        :param body: The body of the current request
+        :type body: bytes
+
+        :returns: The deserialized data
+        :rtype: ``list`` or ``dict``
+        """
+        try:
+            return self.msgpack.unpackb(body, raw=False)
+        except (ValueError, TypeError, self.msgpack.UnpackException):
+            raise BadRequest('Request body is not valid MessagePack')
+
+    def serialize(self, data):
+        """
+        Packs the data as MessagePack.
+
+        :param data: The body for the response
+        :type data: ``list`` or ``dict``
+
+        :returns: A serialized version of the data
+        :rtype: bytes
         """
-        return json.dumps(data, cls=MoreTypesJSONEncoder)
+        return self.msgpack.packb(
+            data,
+            default=self.converters.convert,
+            use_bin_type=True
+        )
@@ -1,37 +1,12 @@
 from tornado import web, gen
-from .constants import OK, NO_CONTENT
-from .resources import Resource
-from .exceptions import MethodNotImplemented, Unauthorized
+from .constants import OK
+from .resources import AsyncResource
 
+import io
 import weakref
 import inspect
 
 
-try:
-    from tornado.concurrent import is_future
-except ImportError:
-    is_future = None
-
-if is_future is None:
-    """
-    Please refer to tornado.concurrent module(newer than 4.0)
-    for implementation of this function.
-    """
-    try:
-        from concurrent import futures
-    except ImportError:
-        futures = None
-
-    from tornado.concurrent import Future
-
-    if futures is None:
-        FUTURES = Future
-    else:
-        FUTURES = (Future, futures.Future)
-
-    is_future = lambda x: isinstance(x, FUTURES)
-
-
 @gen.coroutine
 def _method(self, *args, **kwargs):
     """
@@ -58,9 +33,12 @@ class _BridgeMixin(object):
         self.resource_handler.ref_rh = weakref.proxy(self) # avoid circular reference between
 
 
-class TornadoResource(Resource):
+class TornadoResource(AsyncResource):
     """
     A Tornado-specific ``Resource`` subclass.
+
+    Built on ``AsyncResource``, so views may be ``async def`` (or
+    ``gen.coroutine``) methods.
     """
 
     _request_handler_base_ = web.RequestHandler
@@ -115,7 +93,7 @@ class TornadoResource(Resource):
         and then add corresponding http-methods used by Tornado.
         """
         bases = inspect.getmro(cls)
-        bases = bases[0:bases.index(Resource)-1]
+        bases = bases[0:bases.index(TornadoResource)]
         for k, v in cls.http_methods[view_type].items():
             if any(v in base_cls.__dict__ for base_cls in bases):
                 setattr(new_cls, k.lower(), _method)
@@ -128,52 +106,52 @@ class TornadoResource(Resource):
     def request_body(self):
         return self.request.body 
 
+    def request_stream(self):
+        # Tornado has already read the body by the time the handler runs.
+        return io.BytesIO(self.request.body)
+
+    def request_header(self, name, default=None):
+        return self.request.headers.get(name, default)
+
+    def request_param(self, name, default=None):
+        values = self.request.query_arguments.get(name)
+
+        if not values:
+            return default
+
+        return values[-1].decode('utf-8')
+
     def build_response(self, data, status=OK):
-        if status == NO_CONTENT:
-            # Avoid crashing the client when it tries to parse nonexisting JSON.
-            content_type = 'text/plain'
-        else:
-            content_type = 'application/json'
-        self.ref_rh.set_header("Content-Type", "{}; charset=UTF-8"
-                               .format(content_type))
+        content_type = self.get_content_type(status)
+
+        if content_type in ('application/json', 'text/plain'):
+            content_type += '; charset=UTF-8'
+
+        self.ref_rh.set_header("Content-Type", content_type)
+        data = self.encode_response(data, status)
+
+        for name, value in self.response_headers.items():
+            self.ref_rh.set_header(name, value)
 
         self.ref_rh.set_status(status)
-        self.ref_rh.finish(data)
 
-    def is_debug(self):
-        return self.application.settings.get('debug', False)
+        if not isinstance(data, (str, bytes)):
+            return self.stream_response(data)
+
+        # Tornado won't send even an empty body with a 204/304.
+        self.ref_rh.finish(data or None)
 
     @gen.coroutine
-    def handle(self, endpoint, *args, **kwargs):
+    def stream_response(self, chunks):
         """
-        almost identical to Resource.handle, except
-        the way we handle the return value of view_method.
+        Writes a streamed body out a chunk at a time, flushing each one to the
+        client before moving on.
         """
-        method = self.request_method()
-
-        try:
-            if not method in self.http_methods.get(endpoint, {}):
-                raise MethodNotImplemented(
-                    "Unsupported method '{}' for {} endpoint.".format(
-                        method,
-                        endpoint
-                    )
-                )
-
-            if not self.is_authenticated():
-                raise Unauthorized()
-
-            self.data = self.deserialize(method, endpoint, self.request_body())
-            view_method = getattr(self, self.http_methods[endpoint][method])
-            data = view_method(*args, **kwargs)
-            if is_future(data):
-                # need to check if the view_method is a generator or not
-                data = yield data
-            serialized = self.serialize(method, endpoint, data)
-        except Exception as err:
-            raise gen.Return(self.handle_error(err))
-
-        status = self.status_map.get(self.http_methods[endpoint][method], OK)
-        raise gen.Return(self.build_response(serialized, status=status))
+        for chunk in chunks:
+            self.ref_rh.write(chunk)
+            yield self.ref_rh.flush()
 
+        self.ref_rh.finish()
 
+    def is_debug(self):
+        return self.application.settings.get('debug', False)
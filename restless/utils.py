@@ -1,9 +1,181 @@
 
+from collections import OrderedDict
 import datetime
 import decimal
+import email.utils
+from functools import lru_cache
+from itertools import islice
 import json
+import re
+import threading
+import time
 import traceback
 import uuid
+import weakref
+import zlib
+
+
+class TypeConverters(object):
+    """
+    A registry of functions that turn values of a given type into something
+    the serializers know how to encode.
+
+    Converters are found by the exact type of the value first, then by
+    walking its MRO, so registering a base class (like ``enum.Enum`` or
+    Django's ``Model``) covers its subclasses too. Lookups are cached per
+    type.
+
+    A registry with a ``parent`` falls back to the parent's converters (& sees
+    anything registered on it later).
+
+    Example::
+
+        converters = TypeConverters({set: sorted})
+        converters.register(Enum, lambda member: member.value)
+        converters.convert({3, 1, 2})  # [1, 2, 3]
+
+    """
+    def __init__(self, converters=None, parent=None):
+        self.parent = parent
+        self._converters = {}
+        self._cache = {}
+        self._covered = {}
+        self._children = weakref.WeakSet()
+
+        if parent is not None:
+            parent._children.add(self)
+
+        for type_, converter in dict(converters or {}).items():
+            self.register(type_, converter)
+
+    def register(self, type_, converter=None):
+        """
+        Registers a converter for a type (& its subclasses).
+
+        Can also be used as a decorator, by leaving out the ``converter``.
+
+        :param type_: The type to convert
+        :type type_: type
+
+        :param converter: A function taking the value & returning something
+            that can be encoded
+        :type converter: callable
+
+        :returns: The converter
+        """
+        if converter is None:
+            def decorator(func):
+                return self.register(type_, func)
+
+            return decorator
+
+        self._converters[type_] = converter
+        self.clear_cache()
+        return converter
+
+    def clear_cache(self):
+        """
+        Forgets the converters looked up so far, here & in any registries
+        using this one as their parent.
+        """
+        self._cache.clear()
+        self._covered.clear()
+
+        for child in list(self._children):
+            child.clear_cache()
+
+    def get_converter(self, type_):
+        """
+        Finds the converter for a type.
+
+        :param type_: The type of the value to convert
+        :type type_: type
+
+        :returns: The converter or ``None`` if there isn't one
+        :rtype: callable or None
+        """
+        try:
+            return self._cache[type_]
+        except KeyError:
+            pass
+
+        converter = None
+
+        for base in type_.__mro__:
+            if base in self._converters:
+                converter = self._converters[base]
+                break
+        else:
+            if self.parent is not None:
+                converter = self.parent.get_converter(type_)
+
+        self._cache[type_] = converter
+        return converter
+
+    def covers(self, type_):
+        """
+        Checks whether there's a converter registered for a type or any of its
+        subclasses (here or in the parent).
+
+        Used by serializers whose library encodes some types itself, without
+        asking for a converter.
+
+        :param type_: The type
+        :type type_: type
+
+        :rtype: bool
+        """
+        try:
+            return self._covered[type_]
+        except KeyError:
+            pass
+
+        covered = any(issubclass(base, type_) for base in self._converters)
+
+        if not covered and self.parent is not None:
+            covered = self.parent.covers(type_)
+
+        self._covered[type_] = covered
+        return covered
+
+    def convert(self, data):
+        """
+        Converts a value using the converter registered for its type.
+
+        Can be handed to JSON/MessagePack libraries as their ``default``.
+
+        Raises ``TypeError`` if there's no converter for it.
+
+        :param data: The value to convert
+        :type data: object
+
+        :returns: The converted value
+        """
+        converter = self.get_converter(type(data))
+
+        if converter is None:
+            raise TypeError(
+                "Object of type '{}' is not serializable".format(
+                    type(data).__name__
+                )
+            )
+
+        return converter(data)
+
+
+def _isoformat(data):
+    return data.isoformat()
+
+
+#: The converters used by default, for dates, times, ``Decimal`` & ``UUID``
+#: objects. Anything registered here applies to every serializer.
+default_converters = TypeConverters({
+    datetime.datetime: _isoformat,
+    datetime.date: _isoformat,
+    datetime.time: _isoformat,
+    decimal.Decimal: str,
+    uuid.UUID: str,
+})
 
 
 class MoreTypesJSONEncoder(json.JSONEncoder):
@@ -18,15 +190,24 @@ class MoreTypesJSONEncoder(json.JSONEncoder):
         * ``decimal.Decimal``
         * ``uuid.UUID``
 
+    As well as anything else registered in ``converters`` (which defaults to
+    ``default_converters``).
     """
+    converters = default_converters
+
     def default(self, data):
-        if isinstance(data, (datetime.datetime, datetime.date, datetime.time)):
-            return data.isoformat()
-        elif isinstance(data, decimal.Decimal) or isinstance(data, uuid.UUID):
-            return str(data)
-        else:
+        converter = self.converters.get_converter(type(data))
+
+        if converter is None:
             return super(MoreTypesJSONEncoder, self).default(data)
 
+        return converter(data)
+
+
+#: Converts anything in ``default_converters``, for JSON libraries that take a
+#: ``default`` callable.
+more_types_default = default_converters.convert
+
 
 def format_traceback(exc_info):
     stack = traceback.format_stack()
@@ -38,3 +219,348 @@ def format_traceback(exc_info):
     # Remove the last \n
     stack_str = stack_str[:-1]
     return stack_str
+
+
+def iter_chunks(iterable, size):
+    """
+    Lazily splits an iterable into lists of (at most) ``size`` items.
+
+    Example::
+
+        >>> list(iter_chunks(range(5), 2))
+        [[0, 1], [2, 3], [4]]
+
+    """
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+@lru_cache(maxsize=256)
+def parse_accept(header):
+    """
+    Parses an ``Accept`` header into a tuple of ``(media_range, quality)``
+    pairs (in the order given).
+
+    Results are cached, as clients tend to send the same few headers over &
+    over.
+
+    Example::
+
+        >>> parse_accept('application/json, text/*;q=0.5')
+        (('application/json', 1.0), ('text/*', 0.5))
+
+    """
+    ranges = []
+
+    for part in header.split(','):
+        media_range, _, params = part.partition(';')
+        media_range = media_range.strip().lower()
+
+        if not media_range:
+            continue
+
+        if media_range == '*':
+            media_range = '*/*'
+
+        quality = 1.0
+
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        ranges.append((media_range, quality))
+
+    return tuple(ranges)
+
+
+@lru_cache(maxsize=256)
+def best_match(header, content_types):
+    """
+    Picks the content type the client would most like, given an ``Accept``
+    header & a tuple of the content types on offer.
+
+    Each content type gets the quality of the most specific media range
+    matching it. Ties go to whichever is offered first. A missing/empty
+    header accepts anything.
+
+    :returns: One of the ``content_types`` or ``None`` if the client won't
+        accept any of them
+    """
+    if not header or not header.strip():
+        return content_types[0] if content_types else None
+
+    ranges = parse_accept(header)
+    best = None
+    best_quality = 0.0
+
+    for content_type in content_types:
+        main_type = content_type.split('/', 1)[0] + '/*'
+        quality = None
+        specificity = -1
+
+        for media_range, range_quality in ranges:
+            if media_range == content_type:
+                range_specificity = 2
+            elif media_range == main_type:
+                range_specificity = 1
+            elif media_range == '*/*':
+                range_specificity = 0
+            else:
+                continue
+
+            if range_specificity > specificity:
+                quality = range_quality
+                specificity = range_specificity
+
+        if quality is not None and quality > best_quality:
+            best = content_type
+            best_quality = quality
+
+    return best
+
+
+@lru_cache(maxsize=256)
+def best_encoding(header, encodings):
+    """
+    Picks the content coding (like ``gzip``) the client would most like,
+    given an ``Accept-Encoding`` header & a tuple of the codings on offer.
+
+    Each coding gets the quality it's listed with (or that of ``*``). Ties go
+    to whichever is offered first.
+
+    :returns: One of the ``encodings`` or ``None`` if the client didn't ask
+        for any of them (so the body should be sent as-is)
+    """
+    if not header:
+        return None
+
+    qualities = {}
+
+    for coding, quality in parse_accept(header):
+        qualities.setdefault(coding, quality)
+
+    best = None
+    best_quality = 0.0
+
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get('*/*', 0.0))
+
+        if quality > best_quality:
+            best = encoding
+            best_quality = quality
+
+    return best
+
+
+_ETAG = re.compile(r'(?:W/)?("[^"]*"|\*)')
+
+
+def http_date(value):
+    """
+    Formats a ``datetime`` as an HTTP date (like ``Last-Modified`` uses).
+
+    Naive datetimes are assumed to be in UTC.
+
+    :rtype: string
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+
+    return email.utils.format_datetime(
+        value.astimezone(datetime.timezone.utc),
+        usegmt=True
+    )
+
+
+def parse_http_date(value):
+    """
+    Parses an HTTP date (like ``If-Modified-Since`` uses).
+
+    :returns: An aware ``datetime`` or ``None`` if it's missing/invalid
+    """
+    if not value:
+        return None
+
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if parsed is None:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+
+    return parsed
+
+
+def parse_etags(header):
+    """
+    Parses an ``If-None-Match``/``If-Match`` header into a list of entity
+    tags (or ``*``), with any weak (``W/``) prefixes dropped.
+
+    Example::
+
+        >>> parse_etags('"abc", W/"def"')
+        ['"abc"', '"def"']
+
+    """
+    if not header:
+        return []
+
+    return _ETAG.findall(header)
+
+
+#: The ``wbits`` giving ``zlib`` the container each HTTP content coding uses.
+COMPRESSION_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+
+def compress(data, encoding, level=6):
+    """
+    Compresses a body with the given content coding (``'gzip'`` or
+    ``'deflate'``).
+
+    The output only depends on the input (no timestamps in the gzip header),
+    so it's safe to cache.
+
+    :returns: The compressed body
+    :rtype: bytes
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    compressor = zlib.compressobj(
+        level,
+        zlib.DEFLATED,
+        COMPRESSION_WBITS[encoding]
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_iter(chunks, encoding, level=6):
+    """
+    Lazily compresses a streamed body, an iterable of chunks.
+
+    Each chunk is flushed through as it comes in, so the client can start
+    decompressing right away.
+
+    :returns: A generator of compressed bytes
+    """
+    compressor = zlib.compressobj(
+        level,
+        zlib.DEFLATED,
+        COMPRESSION_WBITS[encoding]
+    )
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
+
+
+class LRUCache(object):
+    """
+    A small, thread-safe, least-recently-used cache.
+
+    Holds at most ``maxsize`` entries, evicting the least recently used one
+    when full. If ``ttl`` (in seconds) is provided, entries older than that
+    are treated as missing.
+
+    Keeps ``hits`` & ``misses`` counters, which is handy for checking the
+    cache is pulling its weight.
+
+    Example::
+
+        >>> cache = LRUCache(maxsize=2)
+        >>> cache.set('a', 1)
+        >>> cache.get('a')
+        1
+        >>> cache.get('b', 'nope')
+        'nope'
+
+    """
+    def __init__(self, maxsize=128, ttl=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for ``key`` or ``default`` if it's missing
+        (or has expired).
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires is not None and expires <= self.timer():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Stores ``value`` for ``key``, evicting the least recently used entry
+        if the cache is full.
+        """
+        expires = None
+
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes ``key`` from the cache, if it's present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Empties the cache & resets the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
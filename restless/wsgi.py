@@ -0,0 +1,232 @@
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from .constants import OK
+from .exceptions import BadRequest, LengthRequired
+from .resources import Resource
+
+
+#: The status lines for ``start_response``, built once rather than per
+#: response.
+STATUS_LINES = dict(
+    (status.value, '{} {}'.format(status.value, status.phrase))
+    for status in HTTPStatus
+)
+
+
+class InputStream(object):
+    """
+    A file-like view of ``wsgi.input`` that stops at the end of the body
+    (``CONTENT_LENGTH``), as reading past it may block on some servers.
+
+    A ``length`` of ``None`` reads until the stream ends, for servers that
+    set ``wsgi.input_terminated``.
+    """
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining is None:
+            return self.stream.read(-1 if size is None else size)
+
+        if self.remaining <= 0:
+            return b''
+
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+
+        chunk = self.stream.read(size)
+        self.remaining -= len(chunk)
+
+        if not chunk:
+            # The client went away early.
+            self.remaining = 0
+
+        return chunk
+
+
+class WSGIResource(Resource):
+    """
+    A ``Resource`` that's a WSGI application of its own, for small services
+    that don't need a web framework.
+
+    It works straight from the WSGI ``environ`` (``self.request``). The body
+    is only read if the view needs it & responses are handed back to the
+    server as-is (a list holding the body, an iterator for streamed
+    responses, or ``wsgi.file_wrapper`` for file-like bodies).
+
+    ``as_list``, ``as_detail`` & ``as_view`` return WSGI applications for a
+    single endpoint (taking the URL arguments from
+    ``wsgiorg.routing_args``), while ``as_app`` returns one handling all of
+    the resource's endpoints.
+
+    Example::
+
+        class PostResource(WSGIResource):
+            def list(self):
+                return Post.select()
+
+        application = PostResource.as_app('/api/posts/')
+
+    """
+    #: How much of a file-like body to send at a time.
+    file_block_size = 65536
+
+    def __init__(self, *args, **kwargs):
+        super(WSGIResource, self).__init__(*args, **kwargs)
+        self.request = None
+        self.start_response = None
+        self.body = None
+        self._params = None
+
+    @classmethod
+    def as_view(cls, view_type, *init_args, **init_kwargs):
+        """
+        Returns a WSGI application calling the ``view_type`` endpoint, with
+        the (positional & keyword) URL arguments from
+        ``wsgiorg.routing_args`` in the environ, if any.
+
+        :param view_type: Should be one of ``list``, ``detail`` or ``custom``.
+        :type view_type: string
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+
+        :returns: WSGI application
+        """
+        def application(environ, start_response):
+            inst = cls(*init_args, **init_kwargs)
+            inst.request, inst.start_response = environ, start_response
+            args, kwargs = environ.get('wsgiorg.routing_args', ((), {}))
+            return inst.handle(view_type, *args, **kwargs)
+
+        return application
+
+    @classmethod
+    def as_app(cls, prefix='/', *init_args, **init_kwargs):
+        """
+        Returns a WSGI application for all of the resource's endpoints.
+
+        ``prefix`` itself goes to ``list`` & ``prefix<pk>/`` goes to
+        ``detail``, unless ``<pk>`` names a custom endpoint in
+        ``http_methods``. Anything else gets a ``404 Not Found``. (See
+        ``restless.routing.Router`` for serving several resources.)
+
+        :param prefix: (Optional) The start of the URLs to handle. Default is
+            ``/``
+        :type prefix: string
+
+        :param init_args: (Optional) Positional params to be persisted along
+            for instantiating the class itself.
+
+        :param init_kwargs: (Optional) Keyword params to be persisted along
+            for instantiating the class itself.
+
+        :returns: WSGI application
+        """
+        from .routing import Router
+
+        router = Router()
+        router.add(prefix, cls, *init_args, **init_kwargs)
+        return router.as_wsgi()
+
+    def request_method(self):
+        return self.request['REQUEST_METHOD']
+
+    def request_body(self):
+        if self.body is None:
+            self.body = self.request_stream().read()
+
+        return self.body
+
+    def request_stream(self):
+        """
+        Returns the body as a file-like object.
+
+        It's bounded by ``CONTENT_LENGTH``, or read until it ends if the
+        server sets ``wsgi.input_terminated`` (as it may for chunked
+        requests). Raises ``LengthRequired`` for a chunked body the server
+        can't terminate. Otherwise, requests without a ``CONTENT_LENGTH``
+        have no body.
+        """
+        length = self.request.get('CONTENT_LENGTH')
+
+        if length:
+            try:
+                length = int(length)
+            except ValueError:
+                raise BadRequest('Invalid Content-Length.')
+        elif self.request.get('wsgi.input_terminated'):
+            length = None
+        elif self.request.get('HTTP_TRANSFER_ENCODING'):
+            raise LengthRequired()
+        else:
+            length = 0
+
+        return InputStream(self.request['wsgi.input'], length)
+
+    def request_header(self, name, default=None):
+        key = name.upper().replace('-', '_')
+
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+
+        return self.request.get(key, default)
+
+    def request_param(self, name, default=None):
+        if self._params is None:
+            self._params = parse_qs(self.request.get('QUERY_STRING', ''))
+
+        values = self._params.get(name)
+
+        if not values:
+            return default
+
+        return values[-1]
+
+    def build_response(self, data, status=OK):
+        headers = [('Content-Type', self.get_content_type(status))]
+
+        if hasattr(data, 'read'):
+            blocks = _iter_file(data, self.file_block_size)
+            body = self.encode_response(blocks, status)
+
+            if body is blocks:
+                # Sent as-is, so the server may be able to send the file more
+                # efficiently.
+                body = self.request.get('wsgi.file_wrapper', _iter_file)(
+                    data, self.file_block_size
+                )
+        else:
+            body = self.encode_response(data, status)
+
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+
+            if isinstance(body, bytes):
+                headers.append(('Content-Length', str(len(body))))
+                body = [body]
+
+        headers.extend(self.response_headers.items())
+        status_line = STATUS_LINES.get(status) or '{} Unknown'.format(status)
+        self.start_response(status_line, headers)
+        return body
+
+
+def _iter_file(filelike, block_size):
+    # For servers without ``wsgi.file_wrapper``.
+    try:
+        while True:
+            block = filelike.read(block_size)
+
+            if not block:
+                return
+
+            yield block
+    finally:
+        if hasattr(filelike, 'close'):
+            filelike.close()
@@ -1,3 +1,7 @@
+import asyncio
+import io
+from wsgiref.util import setup_testing_defaults
+
 import six
 
 
@@ -7,8 +11,25 @@ class FakeHttpRequest(object):
         self.body = body
         if six.PY3:
             self.body = body.encode('utf-8')
-        if self.method == 'GET':
-            self.GET = kwargs.get('get_request', {})
+        self.GET = kwargs.get('get_request', {})
+        self.headers = kwargs.get('headers', {})
+        # Django-style, for the default ``Resource.request_header``.
+        self.META = {}
+
+        for name, value in self.headers.items():
+            key = name.upper().replace('-', '_')
+
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+
+            self.META[key] = value
+
+    def read(self, size=-1):
+        # Django-style, for the default ``Resource.request_stream``.
+        if not hasattr(self, '_stream'):
+            self._stream = io.BytesIO(self.body)
+
+        return self._stream.read(size)
 
 
 class FakeHttpResponse(object):
@@ -18,6 +39,140 @@ class FakeHttpResponse(object):
         self.status_code = 200
 
 
+class FakeASGIResponse(object):
+    def __init__(self, messages):
+        start = messages[0]
+        self.status_code = start['status']
+        self.headers = dict(
+            (name.decode('latin-1'), value.decode('latin-1'))
+            for name, value in start['headers']
+        )
+        self.chunks = [message['body'] for message in messages[1:]]
+        self.body = b''.join(self.chunks)
+
+
+class FakeASGIClient(object):
+    """
+    Calls an ASGI application in-process, each request on a fresh event loop.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def run(self, coroutine):
+        loop = asyncio.new_event_loop()
+
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def request(self, method, path, body=b'', headers=None, query_string=b'',
+                chunk_size=None, **scope):
+        if chunk_size is None:
+            chunks = [body]
+        else:
+            chunks = [
+                body[i:i + chunk_size] for i in range(0, len(body), chunk_size)
+            ] or [b'']
+
+        messages = [
+            {'type': 'http.request', 'body': chunk, 'more_body': True}
+            for chunk in chunks
+        ]
+        messages[-1]['more_body'] = False
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = dict({
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': query_string,
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in (headers or {}).items()
+            ],
+        }, **scope)
+        self.run(self.app(scope, receive, send))
+        return FakeASGIResponse(sent)
+
+    def lifespan(self):
+        messages = [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        self.run(self.app({'type': 'lifespan'}, receive, send))
+        return sent
+
+
+class FakeWSGIResponse(object):
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.status_code = int(status.split(' ', 1)[0])
+        self.headers = dict(headers)
+        self.body = body
+
+
+class FakeWSGIClient(object):
+    """
+    Calls a WSGI application in-process.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, body=b'', headers=None, query_string='',
+                **environ):
+        environ = dict({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query_string,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }, **environ)
+
+        for name, value in (headers or {}).items():
+            key = name.upper().replace('-', '_')
+
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+
+            environ[key] = value
+
+        setup_testing_defaults(environ)
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started.append((status, headers))
+
+        result = self.app(environ, start_response)
+
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        resp = FakeWSGIResponse(started[0][0], started[0][1], body)
+        resp.result = result
+        return resp
+
+
 class FakeModel(object):
     def __init__(self, **kwargs):
         for k, v in kwargs.items():
@@ -0,0 +1,186 @@
+import asyncio
+import unittest
+import zlib
+
+from restless.asgi import ASGIResource
+from restless.exceptions import NotFound
+from restless.utils import json
+
+from .fakes import FakeASGIClient
+
+
+class AsgiTestResource(ASGIResource):
+    fake_db = []
+    events = []
+    http_methods = dict(ASGIResource.http_methods, schema={
+        'GET': 'schema',
+    })
+
+    def __init__(self, *args, **kwargs):
+        super(AsgiTestResource, self).__init__(*args, **kwargs)
+        self.__class__.fake_db = [
+            {"id": 'dead-beef', "title": 'First post'},
+            {"id": 'de-faced', "title": 'Another'},
+        ]
+
+    def is_authenticated(self):
+        return True
+
+    async def list(self):
+        await asyncio.sleep(0)
+        return self.fake_db
+
+    async def detail(self, pk):
+        for item in self.fake_db:
+            if item['id'] == pk:
+                return item
+
+        raise NotFound('Model with pk {} not found.'.format(pk))
+
+    def create(self):
+        self.fake_db.append(self.data)
+        return self.data
+
+    def schema(self):
+        return {'fields': self.request_param('fields', 'all')}
+
+    @classmethod
+    async def startup(cls):
+        cls.events.append('startup')
+
+    @classmethod
+    def shutdown(cls):
+        cls.events.append('shutdown')
+        raise ValueError('Already stopped')
+
+
+class AsgiStreamingTestResource(AsgiTestResource):
+    streaming = True
+    stream_chunk_size = 1
+    stream_requests = True
+
+    async def create(self):
+        titles = []
+
+        async for item in self.data:
+            titles.append(item['title'])
+
+        return {'titles': titles}
+
+
+class ASGIResourceTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ASGIResourceTestCase, self).setUp()
+        self.client = FakeASGIClient(AsgiTestResource.as_app('/posts/'))
+        AsgiTestResource.events = []
+
+    def test_list(self):
+        resp = self.client.request('GET', '/posts/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers['content-type'], 'application/json')
+        self.assertEqual(resp.headers['content-length'], str(len(resp.body)))
+        self.assertEqual(json.loads(resp.body), {
+            'objects': [
+                {"id": 'dead-beef', "title": 'First post'},
+                {"id": 'de-faced', "title": 'Another'},
+            ],
+        })
+
+        # No trailing slash is fine too.
+        resp = self.client.request('GET', '/posts')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_detail(self):
+        resp = self.client.request('GET', '/posts/de-faced/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {
+            'id': 'de-faced',
+            'title': 'Another',
+        })
+
+        resp = self.client.request('GET', '/posts/nope/')
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(json.loads(resp.body), {
+            'error': 'Model with pk nope not found.',
+        })
+
+    def test_custom(self):
+        resp = self.client.request('GET', '/posts/schema/', query_string=b'fields=id')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {'fields': 'id'})
+
+    def test_not_found(self):
+        for path in ('/', '/postsx/', '/posts/de-faced/comments/'):
+            resp = self.client.request('GET', path)
+            self.assertEqual(resp.status_code, 404)
+            self.assertIn('error', json.loads(resp.body))
+
+    def test_not_allowed(self):
+        resp = self.client.request('PATCH', '/posts/')
+        self.assertEqual(resp.status_code, 405)
+        self.assertEqual(resp.headers['allow'], 'GET, POST, PUT, DELETE')
+
+    def test_create(self):
+        body = json.dumps({'id': 'bad-f00d', 'title': 'Last'}).encode('utf-8')
+        # Sent a few bytes at a time.
+        resp = self.client.request('POST', '/posts/', body=body, chunk_size=4)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(json.loads(resp.body), {'id': 'bad-f00d', 'title': 'Last'})
+
+    def test_as_view(self):
+        client = FakeASGIClient(AsgiTestResource.as_detail())
+        resp = client.request('GET', '/', path_params={'pk': 'dead-beef'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body)['title'], 'First post')
+
+    def test_streaming(self):
+        client = FakeASGIClient(AsgiStreamingTestResource.as_app())
+        resp = client.request('GET', '/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('content-length', resp.headers)
+        self.assertTrue(len(resp.chunks) > 2)
+        self.assertEqual(resp.chunks[-1], b'')
+        self.assertEqual(len(json.loads(resp.body)['objects']), 2)
+
+        body = json.dumps([{'title': 'A'}, {'title': 'B'}, {'title': 'C'}])
+        resp = client.request(
+            'POST',
+            '/',
+            body=body.encode('utf-8'),
+            chunk_size=5
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(json.loads(resp.body), {'titles': ['A', 'B', 'C']})
+
+        resp = client.request('POST', '/', body=b'[{"title": ')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_request_stream(self):
+        res = AsgiTestResource()
+
+        async def read():
+            with self.assertRaises(RuntimeError):
+                res.request_stream().read()
+
+        self.client.run(read())
+
+    def test_compress(self):
+        class CompressedResource(AsgiTestResource):
+            compress = True
+            compress_min_size = 0
+
+        client = FakeASGIClient(CompressedResource.as_app())
+        resp = client.request('GET', '/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resp.headers['content-encoding'], 'gzip')
+        self.assertEqual(resp.headers['vary'], 'Accept-Encoding')
+        self.assertEqual(
+            json.loads(zlib.decompress(resp.body, 16 + zlib.MAX_WBITS)),
+            json.loads(self.client.request('GET', '/posts/').body)
+        )
+
+    def test_lifespan(self):
+        self.assertEqual(self.client.lifespan(), [
+            {'type': 'lifespan.startup.complete'},
+            {'type': 'lifespan.shutdown.failed', 'message': 'Already stopped'},
+        ])
+        self.assertEqual(AsgiTestResource.events, ['startup', 'shutdown'])
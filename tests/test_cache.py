@@ -0,0 +1,54 @@
+import unittest
+
+from restless.cache import ResponseCache
+
+
+class DictBackend(object):
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ResponseCacheTestCase, self).setUp()
+        self.cache = ResponseCache(maxsize=10)
+
+    def test_get_set(self):
+        key = self.cache.make_key('posts', ('list',))
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, (200, b'[]'))
+        self.assertEqual(self.cache.get(key), (200, b'[]'))
+        self.assertEqual(self.cache.make_key('posts', ('list',)), key)
+        self.assertNotEqual(self.cache.make_key('users', ('list',)), key)
+
+    def test_invalidate(self):
+        posts = self.cache.make_key('posts', ('list',))
+        users = self.cache.make_key('users', ('list',))
+        self.cache.set(posts, (200, b'[]'))
+        self.cache.set(users, (200, b'[]'))
+
+        self.cache.invalidate('posts')
+        self.assertIsNone(self.cache.get(self.cache.make_key('posts', ('list',))))
+        self.assertEqual(
+            self.cache.get(self.cache.make_key('users', ('list',))),
+            (200, b'[]')
+        )
+
+        # Anything stored under a key made before the invalidation stays out
+        # of sight.
+        self.cache.set(posts, (200, b'["stale"]'))
+        self.assertIsNone(self.cache.get(self.cache.make_key('posts', ('list',))))
+
+    def test_backend(self):
+        backend = DictBackend()
+        cache = ResponseCache(backend=backend)
+        key = cache.make_key('posts', ('detail', ('1',)))
+        cache.set(key, (200, b'{}'))
+        self.assertEqual(backend.data[key], (200, b'{}'))
+        self.assertEqual(cache.get(key), (200, b'{}'))
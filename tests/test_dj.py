@@ -1,4 +1,5 @@
 import unittest
+import zlib
 
 try:
     from http.client import responses
@@ -11,17 +12,70 @@ except ImportError:
     settings = None
     DjangoResource = object
 else:
+    import django
     from django.http import Http404
     from django.core.exceptions import ObjectDoesNotExist
 
     # Ugh. Settings for Django.
-    settings.configure(DEBUG=True)
+    settings.configure(
+        DEBUG=True,
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            },
+        },
+        INSTALLED_APPS=['tests'],
+    )
+    django.setup()
+
+    from django.db import connection, models
+    from django.test.utils import CaptureQueriesContext
+
+    from restless.dj import (DjangoResource, get_projection,
+                             get_related_lookups, shortcut_fk_lookups)
+
+    class Author(models.Model):
+        username = models.CharField(max_length=32)
+
+        class Meta(object):
+            app_label = 'tests'
+
+        def shout(self):
+            return self.username.upper()
+
+    class Post(models.Model):
+        user = models.ForeignKey(Author, on_delete=models.CASCADE)
+        editor = models.ForeignKey(
+            Author,
+            null=True,
+            on_delete=models.SET_NULL,
+            related_name='edited_posts'
+        )
+        title = models.CharField(max_length=128)
 
-    from restless.dj import DjangoResource
+        class Meta(object):
+            app_label = 'tests'
+            ordering = ['pk']
+
+    class Comment(models.Model):
+        post = models.ForeignKey(
+            Post,
+            on_delete=models.CASCADE,
+            related_name='comments'
+        )
+        user = models.ForeignKey(Author, on_delete=models.CASCADE)
+        text = models.TextField()
+
+        class Meta(object):
+            app_label = 'tests'
+            ordering = ['pk']
 
 from restless.exceptions import Unauthorized
-from restless.preparers import FieldsPreparer
+from restless.preparers import (CollectionSubPreparer, FieldsPreparer,
+                                SubPreparer)
 from restless.resources import skip_prepare
+from restless.serializers import JSONSerializer, NDJSONSerializer
 from restless.utils import json
 
 from .fakes import FakeHttpRequest, FakeModel
@@ -327,6 +381,16 @@ class DjangoResourceTestCase(unittest.TestCase):
             resp_json['error'], "Unsupported method 'TRACE' for list endpoint.")
         self.assertIn('traceback', resp_json)
 
+    def test_handle_not_allowed(self):
+        self.res.request = FakeHttpRequest('PATCH')
+
+        resp = self.res.handle('schema')
+        self.assertEqual(resp.status_code, 405)
+        self.assertEqual(resp['Allow'], 'GET')
+        resp_json = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(
+            resp_json['error'], "Method 'PATCH' not allowed for schema endpoint.")
+
     def test_handle_not_authenticated(self):
         # Special-cased above for testing.
         self.res.request = FakeHttpRequest('DELETE')
@@ -482,3 +546,428 @@ class DjangoResourceTestCase(unittest.TestCase):
         self.assertEqual(len(self.res.fake_db), 2)
         resp = self.res.handle('detail', pk='de-faced')
         self.assertEqual(resp.status_code, 404)
+
+
+class DjOptimizedPostResource(DjangoResource):
+    optimize_related = True
+    preparer = FieldsPreparer(fields={
+        'id': 'id',
+        'title': 'title',
+        'author': 'user.username',
+        'editor': SubPreparer('editor', FieldsPreparer(fields={
+            'username': 'username',
+        })),
+        'comments': CollectionSubPreparer('comments.all', FieldsPreparer(fields={
+            'text': 'text',
+            'author': 'user.username',
+        })),
+    })
+
+    def list(self):
+        return Post.objects.all()
+
+
+class DjUnoptimizedPostResource(DjOptimizedPostResource):
+    optimize_related = False
+
+
+@unittest.skipIf(not settings, "Django is not available")
+class DjangoRelatedOptimizationTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(DjangoRelatedOptimizationTestCase, cls).setUpClass()
+
+        with connection.schema_editor() as editor:
+            for model in (Author, Post, Comment):
+                editor.create_model(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            for model in (Comment, Post, Author):
+                editor.delete_model(model)
+
+        super(DjangoRelatedOptimizationTestCase, cls).tearDownClass()
+
+    def setUp(self):
+        super(DjangoRelatedOptimizationTestCase, self).setUp()
+        authors = [
+            Author.objects.create(username='author{}'.format(i))
+            for i in range(3)
+        ]
+
+        for i in range(5):
+            post = Post.objects.create(
+                user=authors[i % 3],
+                editor=authors[0] if i % 2 else None,
+                title='Post {}'.format(i)
+            )
+
+            for j in range(2):
+                Comment.objects.create(
+                    post=post,
+                    user=authors[j],
+                    text='Comment {}'.format(j)
+                )
+
+    def tearDown(self):
+        Comment.objects.all().delete()
+        Post.objects.all().delete()
+        Author.objects.all().delete()
+        super(DjangoRelatedOptimizationTestCase, self).tearDown()
+
+    def get_list(self, resource_class, **params):
+        req = FakeHttpRequest('GET', get_request=params)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = resource_class.as_list()(req)
+
+        self.assertEqual(resp.status_code, 200)
+        return json.loads(resp.content.decode('utf-8')), len(queries)
+
+    def test_get_related_lookups(self):
+        self.assertEqual(
+            get_related_lookups(Post, DjOptimizedPostResource.preparer),
+            (['editor', 'user'], ['comments', 'comments__user'])
+        )
+        # Plain columns & the local ``_id`` column don't need anything.
+        self.assertEqual(
+            get_related_lookups(Post, FieldsPreparer(fields={
+                'title': 'title',
+                'user': 'user_id',
+            })),
+            ([], [])
+        )
+        # Custom manager methods won't use prefetched data.
+        self.assertEqual(
+            get_related_lookups(Author, FieldsPreparer(fields={
+                'posts': 'post_set.count',
+                'edited': CollectionSubPreparer(
+                    'edited_posts.all',
+                    FieldsPreparer(fields={'title': 'title'})
+                ),
+            })),
+            ([], ['edited_posts'])
+        )
+
+    def test_query_counts(self):
+        unoptimized, unoptimized_count = self.get_list(DjUnoptimizedPostResource)
+        optimized, optimized_count = self.get_list(DjOptimizedPostResource)
+
+        self.assertEqual(optimized, unoptimized)
+        self.assertEqual(len(optimized['objects']), 5)
+        self.assertEqual(optimized['objects'][1]['editor'], {'username': 'author0'})
+        self.assertEqual(optimized['objects'][1]['comments'], [
+            {'text': 'Comment 0', 'author': 'author0'},
+            {'text': 'Comment 1', 'author': 'author1'},
+        ])
+        # Posts (with authors & editors), comments & comment authors.
+        self.assertEqual(optimized_count, 3)
+        self.assertGreater(unoptimized_count, 20)
+
+    def test_requested_fields(self):
+        class DjSparsePostResource(DjOptimizedPostResource):
+            fields_param = 'fields'
+
+        sparse, sparse_count = self.get_list(
+            DjSparsePostResource,
+            fields='title,author'
+        )
+        self.assertEqual(sparse['objects'][1], {
+            'title': 'Post 1',
+            'author': 'author1',
+        })
+        # Only the posts (with authors) get loaded.
+        self.assertEqual(sparse_count, 1)
+
+    def test_streaming(self):
+        class DjStreamingPostResource(DjOptimizedPostResource):
+            streaming = True
+            stream_chunk_size = 2
+
+        class DjStreamingProjectedPostResource(DjProjectedPostResource):
+            streaming = True
+            stream_chunk_size = 2
+
+        for resource_class, expected_class in (
+            (DjStreamingPostResource, DjOptimizedPostResource),
+            (DjStreamingProjectedPostResource, DjProjectedPostResource),
+        ):
+            expected, _ = self.get_list(expected_class)
+            resp = resource_class.as_list()(FakeHttpRequest('GET'))
+            self.assertTrue(resp.streaming)
+            self.assertEqual(resp['Content-Type'], 'application/json')
+
+            with CaptureQueriesContext(connection) as queries:
+                body = b''.join(resp.streaming_content)
+
+            self.assertEqual(json.loads(body.decode('utf-8')), expected)
+            self.assertGreater(len(queries), 0)
+
+    def test_compress(self):
+        class DjCompressedPostResource(DjOptimizedPostResource):
+            compress = True
+            compress_min_size = 10
+
+        expected, _ = self.get_list(DjOptimizedPostResource)
+        req = FakeHttpRequest('GET', headers={'Accept-Encoding': 'gzip'})
+        resp = DjCompressedPostResource.as_list()(req)
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(resp['Vary'], 'Accept-Encoding')
+        body = zlib.decompress(resp.content, 16 + zlib.MAX_WBITS)
+        self.assertEqual(json.loads(body.decode('utf-8')), expected)
+
+    def test_ndjson(self):
+        class DjExportPostResource(DjProjectedPostResource):
+            serializers = [JSONSerializer(), NDJSONSerializer()]
+
+        expected, _ = self.get_list(DjProjectedPostResource)
+        req = FakeHttpRequest('GET', headers={'Accept': 'application/x-ndjson'})
+        resp = DjExportPostResource.as_list()(req)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(resp.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected['objects'])
+
+    def test_requested_expansions(self):
+        class DjCollapsedPostResource(DjOptimizedPostResource):
+            expand_param = 'expand'
+            preparer = FieldsPreparer(fields={
+                'title': 'title',
+                'author': SubPreparer('user', FieldsPreparer(fields={
+                    'username': 'username',
+                }), collapse='pk'),
+                'comments': CollectionSubPreparer('comments.all', FieldsPreparer(fields={
+                    'text': 'text',
+                }), collapse='pk'),
+            })
+
+        collapsed, collapsed_count = self.get_list(DjCollapsedPostResource)
+        post = Post.objects.get(title='Post 1')
+        self.assertEqual(collapsed['objects'][1], {
+            'title': 'Post 1',
+            'author': post.user_id,
+            'comments': [comment.pk for comment in post.comments.all()],
+        })
+        self.assertEqual(
+            get_related_lookups(Post, DjCollapsedPostResource.preparer),
+            (['user'], ['comments'])
+        )
+        # Authors are read from ``user_id``, so posts & comments.
+        self.assertEqual(collapsed_count, 2)
+
+        expanded, expanded_count = self.get_list(
+            DjCollapsedPostResource,
+            expand='author'
+        )
+        self.assertEqual(expanded['objects'][1]['author'], {
+            'username': 'author1',
+        })
+        self.assertEqual(
+            expanded['objects'][1]['comments'],
+            collapsed['objects'][1]['comments']
+        )
+        self.assertEqual(expanded_count, 2)
+
+
+class DjProjectedPostResource(DjangoResource):
+    projection = True
+    preparer = FieldsPreparer(fields={
+        'id': 'pk',
+        'title': 'title',
+        'shout': 'title.upper',
+        'author': 'user.username',
+        'editor': SubPreparer('editor', FieldsPreparer(fields={
+            'id': 'id',
+            'username': 'username',
+        })),
+    })
+
+    def list(self):
+        return Post.objects.all()
+
+
+class DjUnprojectedPostResource(DjProjectedPostResource):
+    projection = False
+
+
+class DjProjectedOnlyPostResource(DjOptimizedPostResource):
+    projection = True
+    preparer = FieldsPreparer(fields={
+        'title': 'title',
+        'author': 'user.username',
+        'editor': 'editor.shout',
+        'comments': CollectionSubPreparer('comments.all', FieldsPreparer(fields={
+            'text': 'text',
+        })),
+    })
+
+
+@unittest.skipIf(not settings, "Django is not available")
+class DjangoProjectionTestCase(DjangoRelatedOptimizationTestCase):
+    def test_get_projection_values(self):
+        values, only, values_preparer = get_projection(
+            Post,
+            DjProjectedPostResource.preparer
+        )
+        self.assertEqual(values, [
+            'pk',
+            'title',
+            'user__username',
+            'editor__id',
+            'editor__username',
+        ])
+        self.assertEqual(only, [
+            'editor',
+            'title',
+            'user',
+            'user__username',
+            'editor__id',
+            'editor__username',
+        ])
+        self.assertEqual(values_preparer.fields['author'], 'user__username')
+        self.assertEqual(values_preparer.fields['shout'], 'title.upper')
+
+    def test_get_projection_only(self):
+        values, only, values_preparer = get_projection(
+            Post,
+            DjProjectedOnlyPostResource.preparer
+        )
+        self.assertIsNone(values)
+        self.assertIsNone(values_preparer)
+        # ``shout`` is a method, so editors are loaded in full.
+        self.assertEqual(only, [
+            'editor',
+            'title',
+            'user',
+            'user__username',
+            'editor__id',
+            'editor__username',
+        ])
+
+    def test_get_projection_unknown(self):
+        self.assertEqual(
+            get_projection(Post, FieldsPreparer(fields={'me': ''})),
+            (None, None, None)
+        )
+
+    def test_values(self):
+        unprojected, _ = self.get_list(DjUnprojectedPostResource)
+        projected, projected_count = self.get_list(DjProjectedPostResource)
+
+        self.assertEqual(projected, unprojected)
+        self.assertEqual(projected['objects'][0], {
+            'id': projected['objects'][0]['id'],
+            'title': 'Post 0',
+            'shout': 'POST 0',
+            'author': 'author0',
+            'editor': {'id': None, 'username': None},
+        })
+        self.assertEqual(projected_count, 1)
+
+    def test_only(self):
+        projected, projected_count = self.get_list(DjProjectedOnlyPostResource)
+
+        self.assertEqual(len(projected['objects']), 5)
+        self.assertEqual(projected['objects'][1]['author'], 'author1')
+        self.assertEqual(projected['objects'][0]['editor'], None)
+        self.assertEqual(projected['objects'][1]['editor'], 'AUTHOR0')
+        self.assertEqual(projected['objects'][1]['comments'], [
+            {'text': 'Comment 0'},
+            {'text': 'Comment 1'},
+        ])
+        # Posts (with authors & editors) & comments.
+        self.assertEqual(projected_count, 2)
+
+
+class DjNoFkIdPostResource(DjangoResource):
+    # Off by default.
+    preparer = FieldsPreparer(fields={
+        'title': 'title',
+        'author': 'user.pk',
+        'editor': 'editor.id',
+    })
+
+    def list(self):
+        return Post.objects.all()
+
+    def detail(self, pk):
+        return Post.objects.get(pk=pk)
+
+
+class DjFkIdPostResource(DjNoFkIdPostResource):
+    fk_id_shortcut = True
+
+
+@unittest.skipIf(not settings, "Django is not available")
+class DjangoFkIdShortcutTestCase(DjangoRelatedOptimizationTestCase):
+    def test_shortcut_fk_lookups(self):
+        preparer = FieldsPreparer(fields={
+            'title': 'title',
+            'author': 'user.pk',
+            'author_id': 'user.id',
+            'author_name': 'user.username',
+            'comments': CollectionSubPreparer('comments.all', FieldsPreparer(fields={
+                'author': 'user.pk',
+                'post_author': 'post.user.pk',
+            })),
+        })
+        shortcut = shortcut_fk_lookups(Post, preparer)
+        self.assertIsNot(shortcut, preparer)
+        self.assertEqual(shortcut.fields['title'], 'title')
+        self.assertEqual(shortcut.fields['author'], 'user_id')
+        self.assertEqual(shortcut.fields['author_id'], 'user_id')
+        self.assertEqual(shortcut.fields['author_name'], 'user.username')
+        self.assertEqual(shortcut.fields['comments'].lookup, 'comments.all')
+        self.assertEqual(shortcut.fields['comments'].preparer.fields, {
+            'author': 'user_id',
+            'post_author': 'post.user_id',
+        })
+        # The original is left alone.
+        self.assertEqual(preparer.fields['author'], 'user.pk')
+
+        # Nothing to do.
+        preparer = FieldsPreparer(fields={'author': 'user.username'})
+        self.assertIs(shortcut_fk_lookups(Post, preparer), preparer)
+
+    def test_fields_reassigned(self):
+        preparer = FieldsPreparer(fields={'author': 'user.pk'})
+        self.assertEqual(get_related_lookups(Post, preparer), (['user'], []))
+        self.assertEqual(
+            shortcut_fk_lookups(Post, preparer).fields,
+            {'author': 'user_id'}
+        )
+        self.assertEqual(get_projection(Post, preparer)[0], ['user__pk'])
+
+        # Nothing worked out for the old fields is used.
+        preparer.fields = {'title': 'title', 'editor': 'editor.username'}
+        self.assertEqual(get_related_lookups(Post, preparer), (['editor'], []))
+        self.assertIs(shortcut_fk_lookups(Post, preparer), preparer)
+        self.assertEqual(
+            get_projection(Post, preparer)[0],
+            ['title', 'editor__username']
+        )
+
+    def test_list(self):
+        unshortcut, unshortcut_count = self.get_list(DjNoFkIdPostResource)
+        shortcut, shortcut_count = self.get_list(DjFkIdPostResource)
+
+        self.assertEqual(shortcut, unshortcut)
+        self.assertIsNone(shortcut['objects'][0]['editor'])
+        self.assertEqual(shortcut_count, 1)
+        # One per post author & one per (non-null) editor.
+        self.assertEqual(unshortcut_count, 1 + 5 + 2)
+
+    def test_detail(self):
+        post = Post.objects.get(title='Post 1')
+        req = FakeHttpRequest('GET')
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = DjFkIdPostResource.as_detail()(req, pk=post.pk)
+
+        self.assertEqual(json.loads(resp.content.decode('utf-8')), {
+            'title': 'Post 1',
+            'author': post.user_id,
+            'editor': post.editor_id,
+        })
+        self.assertEqual(len(queries), 1)
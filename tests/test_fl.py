@@ -1,4 +1,5 @@
 import unittest
+import zlib
 
 try:
     # Ugh. Globals for Flask.
@@ -95,6 +96,80 @@ class FlaskResourceTestCase(unittest.TestCase):
             # This should do the correct lookup.
             self.assertFalse(self.res.is_debug())
 
+    def test_streaming(self):
+        class FlStreamingTestResource(FlTestResource):
+            streaming = True
+
+        list_endpoint = FlStreamingTestResource.as_list()
+
+        with self.app.test_request_context('/whatever/', method='GET'):
+            resp = list_endpoint()
+            self.assertTrue(resp.is_streamed)
+            self.assertEqual(resp.headers['Content-Type'], 'application/json')
+            self.assertEqual(json.loads(resp.get_data().decode('utf-8')), {
+                'objects': self.res.fake_db,
+            })
+
+    def test_compress(self):
+        class FlCompressedTestResource(FlTestResource):
+            compress = True
+            compress_min_size = 10
+            streaming = True
+
+        list_endpoint = FlCompressedTestResource.as_list()
+
+        with self.app.test_request_context(
+            '/whatever/',
+            method='GET',
+            headers={'Accept-Encoding': 'deflate'}
+        ):
+            resp = list_endpoint()
+            self.assertEqual(resp.headers['Content-Encoding'], 'deflate')
+            self.assertEqual(resp.headers['Vary'], 'Accept-Encoding')
+            self.assertEqual(json.loads(zlib.decompress(resp.get_data())), {
+                'objects': self.res.fake_db,
+            })
+
+    def test_stream_requests(self):
+        class FlStreamingTestResource(FlTestResource):
+            stream_requests = True
+
+            def is_authenticated(self):
+                return True
+
+            def update_list(self):
+                self.__class__.fake_db = list(self.data)
+
+        list_endpoint = FlStreamingTestResource.as_list()
+
+        with self.app.test_request_context(
+            '/whatever/',
+            method='PUT',
+            data=b'[{"id": "f00", "title": "Streamed"}]'
+        ):
+            resp = list_endpoint()
+            self.assertEqual(resp.status_code, 202)
+
+        self.assertEqual(FlStreamingTestResource.fake_db, [
+            {'id': 'f00', 'title': 'Streamed'},
+        ])
+
+    def test_request_header(self):
+        with self.app.test_request_context(
+            '/whatever/',
+            method='GET',
+            headers={'Accept': 'application/msgpack'}
+        ) as ctx:
+            self.res.request = ctx.request
+            self.assertEqual(self.res.request_header('Accept'), 'application/msgpack')
+            self.assertIsNone(self.res.request_header('X-Nope'))
+
+    def test_request_param(self):
+        with self.app.test_request_context('/whatever/?fields=id,title', method='GET') as ctx:
+            self.res.request = ctx.request
+            self.assertEqual(self.res.request_param('fields'), 'id,title')
+            self.assertIsNone(self.res.request_param('expand'))
+
     def test_build_response(self):
         with self.app.test_request_context('/whatever/', method='GET'):
             resp = self.res.build_response('Hello, world!', status=302)
@@ -1,7 +1,10 @@
+import copy
+import gc
+import linecache
 import unittest
 
-from restless.preparers import (CollectionSubPreparer, SubPreparer,
-                                FieldsPreparer)
+from restless.preparers import (CachedPreparer, CollectionSubPreparer, Preparer,
+                                SubPreparer, FieldsPreparer, compile_lookup)
 
 
 class InstaObj(object):
@@ -143,3 +146,620 @@ class LookupDataTestCase(unittest.TestCase):
             {'name': 'Arthur'},
             {'name': 'Beeblebrox'},
         ]})
+
+    def test_prepare_fields_reassigned(self):
+        preparer = FieldsPreparer(fields={
+            'flying': 'say',
+        })
+        self.assertEqual(preparer.prepare(self.obj_data), {'flying': 'what'})
+
+        preparer.fields = {'total': 'count'}
+        self.assertEqual(preparer.prepare(self.obj_data), {'total': 453})
+
+    def test_prepare_custom_lookup_data(self):
+        class UpperPreparer(FieldsPreparer):
+            def lookup_data(self, lookup, data):
+                value = super(UpperPreparer, self).lookup_data(lookup, data)
+                return value.upper()
+
+        preparer = UpperPreparer(fields={
+            'flying': 'say',
+        })
+        self.assertEqual(preparer.prepare(self.obj_data), {'flying': 'WHAT'})
+
+
+class CompileLookupTestCase(unittest.TestCase):
+    def test_cached(self):
+        self.assertIs(compile_lookup('a.b.c'), compile_lookup('a.b.c'))
+
+    def test_empty(self):
+        self.assertEqual(compile_lookup('')('Last value'), 'Last value')
+
+    def test_empty_segment(self):
+        # An empty segment stops the traversal.
+        data = {'a': {'b': 1}}
+        self.assertEqual(compile_lookup('a.')(data), {'b': 1})
+        self.assertEqual(compile_lookup('a..b')(data), {'b': 1})
+
+    def test_mixed(self):
+        data = {
+            'person': InstaObj(name='daniel', parent=None),
+        }
+        self.assertEqual(compile_lookup('person.name')(data), 'daniel')
+        self.assertEqual(compile_lookup('person.dont.panic')(data), 'vogon')
+        self.assertIsNone(compile_lookup('person.parent.name')(data))
+
+    def test_none(self):
+        self.assertIsNone(compile_lookup('name')(None))
+        self.assertIsNone(compile_lookup('person.name')(None))
+
+
+class PrepareManyTestCase(unittest.TestCase):
+    def setUp(self):
+        super(PrepareManyTestCase, self).setUp()
+        self.author_preparer = FieldsPreparer(fields={
+            'name': 'name',
+        })
+        self.preparer = FieldsPreparer(fields={
+            'title': 'title',
+            'shout': 'title.upper',
+            'author': SubPreparer('author', self.author_preparer),
+            'editor': 'editor.name',
+            'tags': CollectionSubPreparer('tags', FieldsPreparer(fields={
+                'tag': 'slug',
+            })),
+        })
+        self.objs = [
+            InstaObj(
+                title='first',
+                author=InstaObj(name='ford'),
+                editor=None,
+                tags=[{'slug': 'a'}, {'slug': 'b'}],
+            ),
+            InstaObj(
+                title='second',
+                author=InstaObj(name='arthur'),
+                editor=InstaObj(name='zaphod'),
+                tags=[],
+            ),
+            InstaObj(
+                title='third',
+                author=InstaObj(name='trillian'),
+                editor=None,
+                tags=[{'slug': 'c'}],
+            ),
+        ]
+
+    def test_objects(self):
+        self.assertEqual(
+            self.preparer.prepare_many(self.objs),
+            [self.preparer.prepare(obj) for obj in self.objs]
+        )
+        self.assertEqual(self.preparer.prepare_many(self.objs)[0], {
+            'title': 'first',
+            'shout': 'FIRST',
+            'author': {'name': 'ford'},
+            'editor': None,
+            'tags': [{'tag': 'a'}, {'tag': 'b'}],
+        })
+
+    def test_dicts(self):
+        dicts = [obj.__dict__ for obj in self.objs]
+        self.assertEqual(
+            self.preparer.prepare_many(dicts),
+            [self.preparer.prepare(obj) for obj in self.objs]
+        )
+
+    def test_mixed(self):
+        mixed = [self.objs[0], self.objs[1].__dict__]
+        self.assertEqual(
+            self.preparer.prepare_many(iter(mixed)),
+            [self.preparer.prepare(obj) for obj in self.objs[:2]]
+        )
+
+    def test_empty(self):
+        self.assertEqual(self.preparer.prepare_many([]), [])
+        self.assertEqual(FieldsPreparer(fields={}).prepare_many(iter([1, 2])), [1, 2])
+
+    def test_miss(self):
+        with self.assertRaises(KeyError):
+            self.preparer.prepare_many([{'title': 'nope'}])
+
+    def test_custom_prepare(self):
+        class CountingPreparer(FieldsPreparer):
+            def prepare(self, data):
+                prepped = super(CountingPreparer, self).prepare(data)
+                prepped['counted'] = True
+                return prepped
+
+        preparer = CountingPreparer(fields={'title': 'title'})
+        self.assertEqual(preparer.prepare_many(self.objs[:1]), [
+            {'title': 'first', 'counted': True},
+        ])
+
+
+class CountingFieldsPreparer(FieldsPreparer):
+    def __init__(self, *args, **kwargs):
+        super(CountingFieldsPreparer, self).__init__(*args, **kwargs)
+        self.prepared = 0
+
+    def prepare(self, data):
+        self.prepared += 1
+        return super(CountingFieldsPreparer, self).prepare(data)
+
+
+class CachedPreparerTestCase(unittest.TestCase):
+    def setUp(self):
+        super(CachedPreparerTestCase, self).setUp()
+        self.inner = CountingFieldsPreparer(fields={
+            'id': 'pk',
+            'title': 'title',
+        })
+        self.preparer = CachedPreparer(self.inner, key=['pk', 'version'])
+        self.objs = [
+            InstaObj(pk=1, version=1, title='first'),
+            InstaObj(pk=2, version=1, title='second'),
+        ]
+
+    def test_prepare(self):
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'first'})
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'first'})
+        self.assertEqual(self.inner.prepared, 1)
+        self.assertEqual(self.preparer.hits, 1)
+        self.assertEqual(self.preparer.misses, 1)
+
+        # A new version gets prepared again.
+        self.objs[0].title = 'changed'
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'first'})
+        self.objs[0].version = 2
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'changed'})
+        self.assertEqual(self.inner.prepared, 2)
+
+    def test_prepare_copies(self):
+        prepped = self.preparer.prepare(self.objs[0])
+        prepped['title'] = 'mangled'
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'first'})
+
+    def test_prepare_copies_nested(self):
+        preparer = CachedPreparer(
+            FieldsPreparer(fields={
+                'author': SubPreparer('author', FieldsPreparer(fields={
+                    'name': 'name',
+                })),
+                'tags': 'tags',
+            }),
+            key=['pk']
+        )
+        obj = InstaObj(pk=1, author=InstaObj(name='ford'), tags=['a'])
+        prepped = preparer.prepare(obj)
+        prepped['author']['name'] = 'mangled'
+        prepped['tags'].append('b')
+        prepped = preparer.prepare_many([obj])[0]
+        self.assertEqual(prepped, {'author': {'name': 'ford'}, 'tags': ['a']})
+        prepped['author']['name'] = 'mangled'
+        self.assertEqual(preparer.prepare(obj), {
+            'author': {'name': 'ford'},
+            'tags': ['a'],
+        })
+
+    def test_restrict(self):
+        self.preparer.prepare(self.objs[0])
+        restricted = self.preparer.restrict(['title'])
+        self.assertIsInstance(restricted, CachedPreparer)
+        self.assertIs(restricted.preparer, self.inner.restrict(['title']))
+        self.assertIs(self.preparer.restrict(['title']), restricted)
+        self.assertEqual(restricted.prepare(self.objs[0]), {'title': 'first'})
+        self.assertEqual(restricted.prepare(self.objs[0]), {'title': 'first'})
+        self.assertEqual(restricted.hits, 1)
+        self.assertEqual(restricted.misses, 1)
+        # The original cache is untouched.
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'id': 1, 'title': 'first'})
+        self.assertEqual(self.preparer.misses, 1)
+
+        with self.assertRaises(KeyError):
+            self.preparer.restrict(['nope'])
+
+        # Nothing to restrict.
+        preparer = CachedPreparer(Preparer(), key=['pk'])
+        self.assertIs(preparer.restrict(['title']), preparer)
+
+    def test_expand(self):
+        preparer = CachedPreparer(
+            FieldsPreparer(fields={
+                'author': SubPreparer(
+                    'author',
+                    FieldsPreparer(fields={'name': 'name'}),
+                    collapse='pk'
+                ),
+            }),
+            key=['pk']
+        )
+        obj = InstaObj(pk=1, author=InstaObj(pk=3, name='ford'))
+        self.assertEqual(preparer.prepare(obj), {'author': 3})
+        expanded = preparer.expand(['author'])
+        self.assertIs(preparer.expand(['author']), expanded)
+        self.assertEqual(expanded.prepare(obj), {'author': {'name': 'ford'}})
+        self.assertEqual(expanded.restrict(['author']).prepare(obj), {
+            'author': {'name': 'ford'},
+        })
+        self.assertEqual(preparer.prepare(obj), {'author': 3})
+
+        with self.assertRaises(KeyError):
+            preparer.expand(['nope'])
+
+    def test_prepare_many(self):
+        self.preparer.prepare(self.objs[1])
+        self.assertEqual(self.preparer.prepare_many(iter(self.objs)), [
+            {'id': 1, 'title': 'first'},
+            {'id': 2, 'title': 'second'},
+        ])
+        self.assertEqual(self.preparer.hits, 1)
+        self.assertEqual(self.preparer.misses, 2)
+        self.assertEqual(self.preparer.prepare_many(self.objs)[0], {'id': 1, 'title': 'first'})
+        self.assertEqual(self.preparer.hits, 3)
+
+    def test_none_key_part(self):
+        # Unsaved objects share a ``None`` pk, so they mustn't share an entry.
+        objs = [
+            InstaObj(pk=None, version=1, title='first'),
+            InstaObj(pk=None, version=1, title='second'),
+        ]
+        self.assertEqual(self.preparer.prepare_many(objs), [
+            {'id': None, 'title': 'first'},
+            {'id': None, 'title': 'second'},
+        ])
+        self.assertEqual(self.preparer.prepare(objs[1]), {'id': None, 'title': 'second'})
+        self.assertEqual(self.inner.prepared, 3)
+        self.assertEqual(len(self.preparer.cache), 0)
+
+    def test_callable_key(self):
+        preparer = CachedPreparer(
+            self.inner,
+            key=lambda obj: None if obj.pk == 1 else obj.pk,
+            maxsize=1
+        )
+        preparer.prepare(self.objs[0])
+        preparer.prepare(self.objs[0])
+        self.assertEqual(self.inner.prepared, 2)
+        self.assertEqual(len(preparer.cache), 0)
+
+        preparer.prepare(self.objs[1])
+        preparer.prepare(self.objs[1])
+        self.assertEqual(self.inner.prepared, 3)
+
+        preparer.clear()
+        preparer.prepare(self.objs[1])
+        self.assertEqual(self.inner.prepared, 4)
+
+
+class MemoizeTestCase(unittest.TestCase):
+    def setUp(self):
+        super(MemoizeTestCase, self).setUp()
+        self.author_preparer = CountingFieldsPreparer(fields={
+            'name': 'name',
+        })
+        self.authors = [InstaObj(pk=1, name='ford'), InstaObj(pk=2, name='arthur')]
+        self.posts = [
+            InstaObj(title=str(i), author=self.authors[i % 2], coauthors=self.authors)
+            for i in range(6)
+        ]
+
+    def test_identity(self):
+        preparer = FieldsPreparer(fields={
+            'title': 'title',
+            'author': SubPreparer('author', self.author_preparer, memoize=True),
+        })
+        prepped = preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 2)
+        self.assertEqual(prepped[2], {'title': '2', 'author': {'name': 'ford'}})
+        self.assertEqual(prepped[3], {'title': '3', 'author': {'name': 'arthur'}})
+
+    def test_lookup_key(self):
+        # Equal, but not the same instances.
+        for post in self.posts:
+            post.author = InstaObj(pk=post.author.pk, name=post.author.name)
+
+        preparer = FieldsPreparer(fields={
+            'author': SubPreparer('author', self.author_preparer, memoize='pk'),
+        })
+        prepped = preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 2)
+        self.assertEqual(prepped[5], {'author': {'name': 'arthur'}})
+
+    def test_missing_key(self):
+        for post in self.posts:
+            post.author = InstaObj(pk=None, name=post.title)
+
+        preparer = FieldsPreparer(fields={
+            'author': SubPreparer('author', self.author_preparer, memoize='pk'),
+        })
+        prepped = preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 6)
+        self.assertEqual(prepped[5], {'author': {'name': '5'}})
+
+    def test_collection(self):
+        preparer = FieldsPreparer(fields={
+            'coauthors': CollectionSubPreparer(
+                'coauthors',
+                self.author_preparer,
+                memoize=lambda author: author.name
+            ),
+        })
+        prepped = preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 2)
+        self.assertEqual(prepped[4], {
+            'coauthors': [{'name': 'ford'}, {'name': 'arthur'}],
+        })
+
+    def test_generate_code(self):
+        preparer = FieldsPreparer(fields={
+            'title': 'title',
+            'author': SubPreparer('author', self.author_preparer, memoize=True),
+            'coauthors': CollectionSubPreparer(
+                'coauthors',
+                self.author_preparer,
+                memoize='pk'
+            ),
+        }, generate_code=True)
+        prepped = preparer.prepare_many(self.posts)
+        # Two for the authors, two for the coauthors.
+        self.assertEqual(self.author_preparer.prepared, 4)
+        self.assertEqual(prepped[3], {
+            'title': '3',
+            'author': {'name': 'arthur'},
+            'coauthors': [{'name': 'ford'}, {'name': 'arthur'}],
+        })
+        self.assertEqual(prepped, [preparer.prepare(post) for post in self.posts])
+
+        # Nested deeper, too.
+        preparer = FieldsPreparer(fields={
+            'post': SubPreparer('', FieldsPreparer(fields={
+                'author': SubPreparer('author', self.author_preparer, memoize=True),
+            })),
+        }, generate_code=True)
+        self.author_preparer.prepared = 0
+        preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 2)
+
+    def test_not_memoized(self):
+        preparer = FieldsPreparer(fields={
+            'author': SubPreparer('author', self.author_preparer),
+        })
+        preparer.prepare_many(self.posts)
+        self.assertEqual(self.author_preparer.prepared, 6)
+
+
+class RestrictTestCase(unittest.TestCase):
+    def setUp(self):
+        super(RestrictTestCase, self).setUp()
+        self.preparer = FieldsPreparer(fields={
+            'id': 'pk',
+            'title': 'title',
+            'author': 'author.name',
+        })
+        self.obj = InstaObj(pk=1, title='first', author=InstaObj(name='ford'))
+
+    def test_restrict(self):
+        restricted = self.preparer.restrict(['author', 'id'])
+        self.assertEqual(list(restricted.fields), ['id', 'author'])
+        self.assertEqual(restricted.prepare(self.obj), {
+            'id': 1,
+            'author': 'ford',
+        })
+        self.assertEqual(len(self.preparer.fields), 3)
+
+    def test_cached(self):
+        restricted = self.preparer.restrict(['title'])
+        self.assertIs(self.preparer.restrict(['title']), restricted)
+        self.assertIsNot(self.preparer.restrict(['id']), restricted)
+
+        # Reassigning the fields throws the variants away.
+        self.preparer.fields = {'title': 'title'}
+        self.assertIsNot(self.preparer.restrict(['title']), restricted)
+
+    def test_max_variants(self):
+        self.preparer.max_variants = 2
+        restricted = self.preparer.restrict(['title'])
+        self.preparer.restrict(['id'])
+        self.preparer.restrict(['author'])
+        self.assertIsNot(self.preparer.restrict(['title']), restricted)
+
+    def test_missing(self):
+        with self.assertRaises(KeyError):
+            self.preparer.restrict(['title', 'nope'])
+
+    def test_generate_code(self):
+        self.preparer.generate_code = True
+        restricted = self.preparer.restrict(['title'])
+        self.assertTrue(restricted.generate_code)
+        self.assertEqual(restricted.prepare(self.obj), {'title': 'first'})
+
+
+class CollapseTestCase(unittest.TestCase):
+    def setUp(self):
+        super(CollapseTestCase, self).setUp()
+        author_preparer = FieldsPreparer(fields={
+            'id': 'pk',
+            'name': 'name',
+        })
+        self.preparer = FieldsPreparer(fields={
+            'title': 'title',
+            'author': SubPreparer('author', author_preparer, collapse='pk'),
+            'editor': SubPreparer('editor', author_preparer, collapse='pk'),
+            'comments': CollectionSubPreparer('comments', FieldsPreparer(fields={
+                'text': 'text',
+                'author': SubPreparer('author', author_preparer, collapse='pk'),
+            }), collapse='pk'),
+        })
+        ford = InstaObj(pk=1, name='ford')
+        self.objs = [
+            InstaObj(
+                title='first',
+                author=ford,
+                editor=None,
+                comments=[
+                    InstaObj(pk=10, text='hi', author=ford),
+                    InstaObj(pk=11, text='bye', author=InstaObj(pk=2, name='arthur')),
+                ]
+            ),
+            InstaObj(title='second', author=ford, editor=ford, comments=[]),
+        ]
+
+    def test_collapsed(self):
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {
+            'title': 'first',
+            'author': 1,
+            'editor': None,
+            'comments': [10, 11],
+        })
+        self.assertEqual(
+            self.preparer.prepare_many(self.objs),
+            [self.preparer.prepare(obj) for obj in self.objs]
+        )
+
+    def test_expand(self):
+        expanded = self.preparer.expand(['author', 'comments.author'])
+        self.assertIs(self.preparer.expand(['comments.author', 'author']), expanded)
+        self.assertEqual(expanded.prepare(self.objs[0]), {
+            'title': 'first',
+            'author': {'id': 1, 'name': 'ford'},
+            'editor': None,
+            'comments': [
+                {'text': 'hi', 'author': {'id': 1, 'name': 'ford'}},
+                {'text': 'bye', 'author': {'id': 2, 'name': 'arthur'}},
+            ],
+        })
+        self.assertEqual(
+            expanded.prepare_many(self.objs),
+            [expanded.prepare(obj) for obj in self.objs]
+        )
+        # The original is untouched.
+        self.assertEqual(self.preparer.prepare(self.objs[1])['author'], 1)
+
+    def test_expand_missing(self):
+        with self.assertRaises(KeyError):
+            self.preparer.expand(['title'])
+
+        with self.assertRaises(KeyError):
+            self.preparer.expand(['nope'])
+
+        with self.assertRaises(KeyError):
+            self.preparer.expand(['comments.text'])
+
+    def test_generate_code(self):
+        for preparer in (self.preparer, self.preparer.expand(['comments'])):
+            generated = copy.copy(preparer)
+            generated.fields = preparer.fields
+            generated.generate_code = True
+            self.assertEqual(
+                generated.prepare_many(self.objs),
+                preparer.prepare_many(self.objs)
+            )
+
+
+class GenerateCodeTestCase(unittest.TestCase):
+    def setUp(self):
+        super(GenerateCodeTestCase, self).setUp()
+        self.fields = {
+            'title': 'title',
+            'shout': 'title.upper',
+            'class': 'class',
+            'author': SubPreparer('author', FieldsPreparer(fields={
+                'name': 'name',
+            })),
+            'editor': SubPreparer('editor', FieldsPreparer(fields={
+                'name': 'name',
+            })),
+            'tags': CollectionSubPreparer('tags', FieldsPreparer(fields={
+                'tag': 'slug',
+            })),
+            'memo': SubPreparer('author', FieldsPreparer(fields={
+                'name': 'name',
+            }), memoize=True),
+        }
+        self.preparer = FieldsPreparer(fields=self.fields, generate_code=True)
+        self.objs = [
+            InstaObj(
+                title='first',
+                author=InstaObj(name='ford'),
+                editor=None,
+                tags=[{'slug': 'a'}, {'slug': 'b'}],
+                **{'class': 'A'}
+            ),
+            InstaObj(
+                title='second',
+                author=InstaObj(name='arthur'),
+                editor=InstaObj(name='zaphod'),
+                tags=[],
+                **{'class': 'B'}
+            ),
+        ]
+
+    def test_prepare(self):
+        interpreted = FieldsPreparer(fields=self.fields)
+
+        for obj in self.objs:
+            self.assertEqual(self.preparer.prepare(obj), interpreted.prepare(obj))
+            self.assertEqual(
+                self.preparer.prepare(obj.__dict__),
+                interpreted.prepare(obj.__dict__)
+            )
+
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {
+            'title': 'first',
+            'shout': 'FIRST',
+            'class': 'A',
+            'author': {'name': 'ford'},
+            'editor': {'name': None},
+            'tags': [{'tag': 'a'}, {'tag': 'b'}],
+            'memo': {'name': 'ford'},
+        })
+        self.assertEqual(
+            self.preparer.prepare_many(self.objs),
+            interpreted.prepare_many(self.objs)
+        )
+
+    def test_prepare_none(self):
+        preparer = FieldsPreparer(fields={'title': 'title'}, generate_code=True)
+        self.assertEqual(preparer.prepare(None), {'title': None})
+
+    def test_miss(self):
+        with self.assertRaises(KeyError):
+            self.preparer.prepare({'title': 'nope'})
+
+        with self.assertRaises(AttributeError):
+            self.preparer.prepare(InstaObj(title='nope'))
+
+    def test_get_source(self):
+        source = self.preparer.get_source()
+        self.assertTrue(source.startswith('def prepare_0(data):'))
+        self.assertIn("value_0 = data['title']", source)
+        self.assertIn('value_0 = data.title', source)
+        self.assertIn("value_2 = getattr(data, 'class')", source)
+        # Nested preparers get their own functions, except for memoized ones.
+        self.assertIn('def prepare_3(data):', source)
+        self.assertNotIn('def prepare_4(data):', source)
+        self.assertIs(self.preparer.get_source(), source)
+
+        # Reassigning the fields starts over.
+        self.preparer.fields = {'title': 'title'}
+        self.assertNotIn('def prepare_1(data):', self.preparer.get_source())
+        self.assertEqual(self.preparer.prepare(self.objs[0]), {'title': 'first'})
+
+    def test_linecache(self):
+        preparer = FieldsPreparer(fields={'title': 'title'}, generate_code=True)
+        filename = preparer.get_generated()[1].__code__.co_filename
+        self.assertEqual(
+            ''.join(linecache.getlines(filename)),
+            preparer.get_source()
+        )
+        other = FieldsPreparer(fields={'title': 'title'}, generate_code=True)
+        self.assertNotEqual(
+            other.get_generated()[1].__code__.co_filename,
+            filename
+        )
+
+        # Dropped along with the preparer.
+        del preparer
+        gc.collect()
+        self.assertNotIn(filename, linecache.cache)
@@ -1,4 +1,5 @@
 import unittest
+import zlib
 
 try:
     from pyramid import testing
@@ -71,6 +72,35 @@ class PyramidResourceTestCase(unittest.TestCase):
             ]
         })
 
+    def test_streaming(self):
+        class PyrStreamingTestResource(PyrTestResource):
+            streaming = True
+
+        list_endpoint = PyrStreamingTestResource.as_list()
+        resp = list_endpoint(FakeHttpRequest('GET'))
+        self.assertEqual(resp.content_type, 'application/json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(b''.join(resp.app_iter).decode('utf-8')), {
+            'objects': self.res.fake_db,
+        })
+
+    def test_compress(self):
+        class PyrCompressedTestResource(PyrTestResource):
+            compress = True
+            compress_min_size = 10
+
+        list_endpoint = PyrCompressedTestResource.as_list()
+        resp = list_endpoint(FakeHttpRequest(
+            'GET',
+            headers={'Accept-Encoding': 'gzip'}
+        ))
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(resp.headers['Vary'], 'Accept-Encoding')
+        body = zlib.decompress(resp.body, 16 + zlib.MAX_WBITS)
+        self.assertEqual(json.loads(body.decode('utf-8')), {
+            'objects': self.res.fake_db,
+        })
+
     def test_as_detail(self):
         detail_endpoint = PyrTestResource.as_detail()
         req = testing.DummyRequest()
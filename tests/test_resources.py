@@ -1,9 +1,22 @@
+import asyncio
+import datetime
+import gc
 import six
 import unittest
+import weakref
+import zlib
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from restless.cache import ResponseCache
 from restless.exceptions import HttpError, NotFound, MethodNotImplemented
-from restless.preparers import Preparer, FieldsPreparer
-from restless.resources import Resource
+from restless.preparers import Preparer, FieldsPreparer, SubPreparer
+from restless.resources import AsyncResource, Resource, build_serializer_map
+from restless.serializers import (JSONSerializer, MsgPackSerializer,
+                                  NDJSONSerializer)
 from restless.utils import json
 
 from .fakes import FakeHttpRequest, FakeHttpResponse
@@ -157,12 +170,12 @@ class ResourceTestCase(unittest.TestCase):
         detail_data = {'hello': 'world'}
 
         # Normal calls.
-        self.assertEqual(self.res.serialize('GET', 'list', list_data), '{"objects": ["a", "c", "b"]}')
-        self.assertEqual(self.res.serialize('GET', 'detail', detail_data), '{"hello": "world"}')
+        self.assertEqual(self.res.serialize('GET', 'list', list_data), b'{"objects": ["a", "c", "b"]}')
+        self.assertEqual(self.res.serialize('GET', 'detail', detail_data), b'{"hello": "world"}')
         # The create special-case.
-        self.assertEqual(self.res.serialize('POST', 'list', detail_data), '{"hello": "world"}')
+        self.assertEqual(self.res.serialize('POST', 'list', detail_data), b'{"hello": "world"}')
         # Make sure other methods aren't special-cased.
-        self.assertEqual(self.res.serialize('PUT', 'list', list_data), '{"objects": ["a", "c", "b"]}')
+        self.assertEqual(self.res.serialize('PUT', 'list', list_data), b'{"objects": ["a", "c", "b"]}')
 
     def test_serialize_list(self):
         data = [
@@ -202,7 +215,7 @@ class ResourceTestCase(unittest.TestCase):
         })
 
         # Make sure we don't try to serialize a ``None``, which would fail.
-        self.assertEqual(self.res.serialize_list(None), '')
+        self.assertEqual(self.res.serialize_list(None), b'')
 
     def test_serialize_detail(self):
         # This isn't very unit-y, but we're also testing that we're using the
@@ -226,7 +239,7 @@ class ResourceTestCase(unittest.TestCase):
         })
 
         # Make sure we don't try to serialize a ``None``, which would fail.
-        self.assertEqual(self.res.serialize_detail(None), '')
+        self.assertEqual(self.res.serialize_detail(None), b'')
 
     def test_prepare(self):
         # Without fields.
@@ -252,6 +265,34 @@ class ResourceTestCase(unittest.TestCase):
             'title': 'Cosmos'
         })
 
+    def test_prepare_many(self):
+        data = [
+            {'title': 'Cosmos', 'author': 'Carl Sagan'},
+            {'title': 'Contact', 'author': 'Carl Sagan'},
+        ]
+
+        self.res.preparer = FieldsPreparer(fields={
+            'title': 'title',
+        })
+        self.assertEqual(self.res.prepare_many(iter(data)), [
+            {'title': 'Cosmos'},
+            {'title': 'Contact'},
+        ])
+
+        # Overriding ``prepare`` on the resource still gets called per-item.
+        class ShoutyResource(self.resource_class):
+            def prepare(self, data):
+                prepped = super(ShoutyResource, self).prepare(data)
+                prepped['title'] = prepped['title'].upper()
+                return prepped
+
+        res = ShoutyResource()
+        res.preparer = self.res.preparer
+        self.assertEqual(res.prepare_many(data), [
+            {'title': 'COSMOS'},
+            {'title': 'CONTACT'},
+        ])
+
     def test_wrap_list_response(self):
         data = ['one', 'three', 'two']
         self.assertEqual(self.res.wrap_list_response(data), {
@@ -341,3 +382,717 @@ class ResourceTestCase(unittest.TestCase):
     def test_endpoint_delete_list(self):
         self.res.handle('delete_list')
         self.assertEqual(self.res.endpoint, 'delete_list')
+
+    def test_dispatch(self):
+        class BookResource(self.resource_class):
+            status_map = dict(Resource.status_map, publish=201)
+            http_methods = {
+                'list': {'GET': 'list', 'POST': 'publish'},
+                'detail': {'GET': 'detail'},
+            }
+
+            def is_authenticated(self):
+                return True
+
+            def list(self):
+                return [{'title': 'Cosmos'}]
+
+            def publish(self):
+                return {'title': 'Contact'}
+
+        table = BookResource().get_dispatch_table()
+        self.assertIs(BookResource().get_dispatch_table(), table)
+        self.assertEqual(table['list'][1], 'GET, POST')
+        self.assertEqual(
+            table['list'][0]['POST'],
+            ('publish', BookResource.publish, 201)
+        )
+        # Each class gets its own.
+        self.assertIsNot(self.res.get_dispatch_table(), table)
+
+        res = BookResource()
+        res.request = FakeHttpRequest('POST', '{}')
+        self.assertEqual(res.handle('list').status_code, 201)
+
+        # Standard methods an endpoint doesn't handle are "not allowed".
+        res = BookResource()
+        res.request = FakeHttpRequest('DELETE')
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 405)
+        self.assertEqual(res.response_headers['Allow'], 'GET')
+        self.assertEqual(json.loads(resp.body), {
+            'error': "Method 'DELETE' not allowed for detail endpoint.",
+        })
+
+        # Anything else is "not implemented".
+        res = BookResource()
+        res.request = FakeHttpRequest('TRACE')
+        self.assertEqual(res.handle('detail').status_code, 501)
+        res.request = FakeHttpRequest('GET')
+        self.assertEqual(res.handle('schema').status_code, 501)
+
+        # Endpoints added per instance still work.
+        res = BookResource()
+        res.http_methods = dict(BookResource.http_methods, schema={'GET': 'schema'})
+        res.schema = lambda: {'fields': []}
+        res.request = FakeHttpRequest('GET')
+        resp = res.handle('schema')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {'fields': []})
+        self.assertIs(BookResource().get_dispatch_table(), table)
+
+    def test_requested_fields(self):
+        class BookResource(self.resource_class):
+            fields_param = 'fields'
+            preparer = FieldsPreparer(fields={
+                'title': 'title',
+                'author': 'author',
+                'synopsis': 'short_desc',
+            })
+
+            def detail(self):
+                return {
+                    'title': 'Cosmos',
+                    'author': 'Carl Sagan',
+                    'short_desc': 'A journey through the stars.',
+                }
+
+        res = BookResource()
+        res.request = FakeHttpRequest(get_request={'fields': 'title, author,title'})
+        resp = res.handle('detail')
+        self.assertEqual(res.requested_fields, ['title', 'author'])
+        self.assertEqual(json.loads(resp.body), {
+            'title': 'Cosmos',
+            'author': 'Carl Sagan',
+        })
+        # The class-level preparer is left alone & variants get reused.
+        self.assertEqual(len(BookResource.preparer.fields), 3)
+        self.assertIs(
+            res.preparer,
+            BookResource.preparer.restrict(['author', 'title'])
+        )
+
+        res = BookResource()
+        res.request = FakeHttpRequest(get_request={'fields': 'title,isbn'})
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(json.loads(resp.body), {
+            'error': 'Unknown field(s): isbn',
+        })
+
+        # Without ``fields_param``, the parameter is ignored.
+        BookResource.fields_param = None
+        res = BookResource()
+        res.request = FakeHttpRequest(get_request={'fields': 'title'})
+        resp = res.handle('detail')
+        self.assertIsNone(res.requested_fields)
+        self.assertEqual(len(json.loads(resp.body)), 3)
+
+    def test_requested_expansions(self):
+        class BookResource(self.resource_class):
+            fields_param = 'fields'
+            expand_param = 'expand'
+            preparer = FieldsPreparer(fields={
+                'title': 'title',
+                'author': SubPreparer('author', FieldsPreparer(fields={
+                    'name': 'name',
+                }), collapse='id'),
+            })
+
+            def detail(self):
+                return {
+                    'title': 'Cosmos',
+                    'author': {'id': 4, 'name': 'Carl Sagan'},
+                }
+
+        res = BookResource()
+        res.request = FakeHttpRequest()
+        resp = res.handle('detail')
+        self.assertIsNone(res.requested_expansions)
+        self.assertEqual(json.loads(resp.body), {
+            'title': 'Cosmos',
+            'author': 4,
+        })
+
+        res = BookResource()
+        res.request = FakeHttpRequest(get_request={
+            'expand': 'author',
+            'fields': 'author',
+        })
+        resp = res.handle('detail')
+        self.assertEqual(res.requested_expansions, ['author'])
+        self.assertEqual(json.loads(resp.body), {
+            'author': {'name': 'Carl Sagan'},
+        })
+
+        res = BookResource()
+        res.request = FakeHttpRequest(get_request={'expand': 'title'})
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(json.loads(resp.body), {
+            'error': "Can't expand field(s): title",
+        })
+
+    def test_serialize_list_stream(self):
+        prepared = []
+
+        class CountingPreparer(FieldsPreparer):
+            def prepare_many(self, items):
+                prepared.append(len(items))
+                return super(CountingPreparer, self).prepare_many(items)
+
+        self.res.streaming = True
+        self.res.stream_chunk_size = 2
+        self.res.preparer = CountingPreparer(fields={'title': 'title'})
+        data = [{'title': 'Post {}'.format(i)} for i in range(5)]
+
+        chunks = self.res.serialize('GET', 'list', data)
+        self.assertNotIsInstance(chunks, bytes)
+        # Nothing gets prepared until the response is sent.
+        self.assertEqual(prepared, [])
+        self.assertEqual(json.loads(b''.join(chunks)), {
+            'objects': [{'title': 'Post {}'.format(i)} for i in range(5)],
+        })
+        self.assertEqual(prepared, [2, 2, 1])
+
+        # Details aren't streamed.
+        self.assertEqual(
+            self.res.serialize('GET', 'detail', data[0]),
+            b'{"title": "Post 0"}'
+        )
+
+    def test_get_content_type(self):
+        self.assertEqual(self.res.get_content_type(), 'application/json')
+        self.assertEqual(self.res.get_content_type(204), 'text/plain')
+
+    def test_serializer_map(self):
+        class BookResource(self.resource_class):
+            serializers = [JSONSerializer(), NDJSONSerializer()]
+
+        mapping = BookResource().get_serializer_map()
+        self.assertIs(BookResource().get_serializer_map(), mapping)
+        self.assertIs(mapping['application/json'], BookResource.serializers[0])
+        self.assertIs(mapping['application/x-ndjson'], BookResource.serializers[1])
+
+        # Reassigning the serializers starts over.
+        BookResource.serializers = [NDJSONSerializer()]
+        self.assertEqual(
+            list(BookResource().get_serializer_map()),
+            list(build_serializer_map(BookResource.serializers))
+        )
+        self.assertNotIn('application/json', BookResource().get_serializer_map())
+
+        res = BookResource()
+        res.serializers = [JSONSerializer()]
+        self.assertEqual(list(res.get_serializer_map()), ['application/json'])
+
+    @unittest.skipIf(not msgpack, 'msgpack is not available')
+    def test_negotiation(self):
+        class BookResource(self.resource_class):
+            serializers = [JSONSerializer(), MsgPackSerializer()]
+
+            def is_authenticated(self):
+                return True
+
+            def detail(self):
+                return {'title': 'Cosmos'}
+
+            def update(self):
+                return self.data
+
+        res = BookResource()
+        res.request = FakeHttpRequest()
+        resp = res.handle('detail')
+        self.assertEqual(res.get_content_type(), 'application/json')
+        self.assertEqual(json.loads(resp.body), {'title': 'Cosmos'})
+
+        res = BookResource()
+        res.request = FakeHttpRequest(headers={
+            'Accept': 'text/html, application/x-msgpack;q=0.9',
+        })
+        resp = res.handle('detail')
+        self.assertEqual(res.get_content_type(), 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(resp.body), {'title': 'Cosmos'})
+
+        res = BookResource()
+        res.request = FakeHttpRequest(headers={'Accept': 'text/html'})
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 406)
+        self.assertEqual(res.get_content_type(), 'application/json')
+        self.assertIn('Available: application/json', json.loads(resp.body)['error'])
+
+        # Request bodies go by the ``Content-Type``.
+        res = BookResource()
+        res.request = FakeHttpRequest(
+            'PUT',
+            headers={'Content-Type': 'application/msgpack'}
+        )
+        res.request.body = msgpack.packb({'title': 'Contact'})
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(json.loads(resp.body), {'title': 'Contact'})
+
+        res = BookResource()
+        res.request = FakeHttpRequest(
+            'PUT',
+            '<title>Contact</title>',
+            headers={'Content-Type': 'text/xml; charset=utf-8'}
+        )
+        resp = res.handle('detail')
+        self.assertEqual(resp.status_code, 415)
+        self.assertEqual(json.loads(resp.body), {
+            'error': "Unsupported content type 'text/xml'.",
+        })
+
+    def test_encode_response(self):
+        body = b'{"title": "Hello"}' * 100
+        self.assertEqual(self.res.encode_response(body), body)
+        self.assertEqual(self.res.response_headers, {})
+
+        self.res.compress = True
+        self.res.request = FakeHttpRequest(headers={
+            'Accept-Encoding': 'deflate, gzip;q=0.5',
+        })
+        compressed = self.res.encode_response(body)
+        self.assertEqual(zlib.decompress(compressed), body)
+        self.assertEqual(self.res.response_headers, {
+            'Content-Encoding': 'deflate',
+            'Vary': 'Accept-Encoding',
+        })
+
+        # Small bodies aren't worth it.
+        self.res.response_headers = {}
+        self.assertEqual(self.res.encode_response(b'{}'), b'{}')
+        self.assertEqual(self.res.response_headers, {'Vary': 'Accept-Encoding'})
+
+        # Neither are clients that didn't ask for it.
+        self.res.request = FakeHttpRequest()
+        self.assertEqual(self.res.encode_response(body), body)
+
+        # Streams are compressed as they go.
+        self.res.request = FakeHttpRequest(headers={'Accept-Encoding': 'gzip'})
+        self.res.compress_encodings = ('gzip',)
+        chunks = self.res.encode_response(iter([body[:50], body[50:]]))
+        self.assertEqual(
+            zlib.decompress(b''.join(chunks), 16 + zlib.MAX_WBITS),
+            body
+        )
+        self.assertEqual(self.res.response_headers['Content-Encoding'], 'gzip')
+
+    def test_etags(self):
+        views = []
+
+        class ETagResource(self.resource_class):
+            etags = True
+            compress = True
+            compress_min_size = 0
+
+            def is_authenticated(self):
+                return True
+
+            def build_response(self, data, status=200):
+                data = self.encode_response(data, status)
+                return super(ETagResource, self).build_response(data, status)
+
+            def list(self):
+                views.append('list')
+                return [{'title': 'Cosmos'}]
+
+        def get(**headers):
+            res = ETagResource()
+            res.request = FakeHttpRequest(headers=headers)
+            resp = res.handle('list')
+            return resp, res.response_headers
+
+        resp, headers = get()
+        self.assertEqual(resp.status_code, 200)
+        etag = headers['ETag']
+        self.assertEqual(len(etag), 42)
+
+        resp, headers = get(**{'If-None-Match': 'W/"nope", ' + etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.body, b'')
+        self.assertEqual(headers['ETag'], etag)
+
+        resp, headers = get(**{'If-None-Match': '"nope"'})
+        self.assertEqual(resp.status_code, 200)
+
+        # Compressed copies get their own tags, which match too.
+        resp, headers = get(**{'Accept-Encoding': 'gzip'})
+        self.assertEqual(headers['ETag'], etag[:-1] + '-gzip"')
+        resp, headers = get(**{
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': headers['ETag'],
+        })
+        self.assertEqual(resp.status_code, 304)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(headers['ETag'], etag[:-1] + '-gzip"')
+        self.assertEqual(len(views), 5)
+
+    def test_conditional_hooks(self):
+        views = []
+
+        class VersionedResource(self.resource_class):
+            version = 1
+            broken = False
+            modified = datetime.datetime(2014, 3, 30, 12, 55, 15, 1234)
+
+            def is_authenticated(self):
+                return True
+
+            def get_etag(self, *args, **kwargs):
+                return self.version
+
+            def get_last_modified(self, *args, **kwargs):
+                return self.modified
+
+            def list(self):
+                if self.broken:
+                    raise ValueError('Nope.')
+
+                views.append('list')
+                return [{'title': 'Cosmos'}]
+
+        def get(**headers):
+            res = VersionedResource()
+            res.request = FakeHttpRequest(headers=headers)
+            resp = res.handle('list')
+            return resp, res.response_headers
+
+        resp, headers = get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(headers['Last-Modified'], 'Sun, 30 Mar 2014 12:55:15 GMT')
+        etag = headers['ETag']
+
+        # The view isn't run at all.
+        resp, headers = get(**{'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        resp, headers = get(**{
+            'If-Modified-Since': 'Sun, 30 Mar 2014 12:55:15 GMT',
+        })
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(views, ['list'])
+
+        resp, headers = get(**{
+            'If-Modified-Since': 'Sun, 30 Mar 2014 12:55:14 GMT',
+        })
+        self.assertEqual(resp.status_code, 200)
+
+        # ``If-None-Match`` wins.
+        resp, headers = get(**{
+            'If-None-Match': '"old"',
+            'If-Modified-Since': 'Sun, 30 Mar 2014 12:55:15 GMT',
+        })
+        self.assertEqual(resp.status_code, 200)
+
+        VersionedResource.version = 2
+        resp, headers = get(**{'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(headers['ETag'], etag)
+        self.assertEqual(len(views), 4)
+
+        # Errors don't get the validators.
+        VersionedResource.broken = True
+        resp, headers = get()
+        self.assertEqual(resp.status_code, 500)
+        self.assertNotIn('ETag', headers)
+        self.assertNotIn('Last-Modified', headers)
+
+    def test_response_cache(self):
+        calls = []
+
+        class CachedResource(self.resource_class):
+            response_cache = ResponseCache()
+            fields_param = 'fields'
+            cache_params = ('page',)
+            preparer = FieldsPreparer(fields={'id': 'id', 'title': 'title'})
+
+            def is_authenticated(self):
+                return True
+
+            def list(self):
+                calls.append('list')
+                return [{'id': 1, 'title': 'Cosmos'}]
+
+            def detail(self, pk):
+                calls.append(pk)
+
+                if pk == 404:
+                    raise NotFound()
+
+                return {'id': pk, 'title': 'Cosmos'}
+
+            def update(self, pk):
+                return self.data
+
+        def get(endpoint, *args, **params):
+            res = CachedResource()
+            res.request = FakeHttpRequest(get_request=params)
+            return res.handle(endpoint, *args)
+
+        first = get('list')
+        self.assertEqual(get('list').body, first.body)
+        self.assertEqual(calls, ['list'])
+
+        # Different params & arguments are cached separately.
+        get('list', page='2')
+        get('list', fields='id')
+        self.assertEqual(get('list', fields='id').body, b'{"objects": [{"id": 1}]}')
+        get('list', other='ignored')
+        get('detail', 1)
+        get('detail', 1)
+        get('detail', 2)
+        self.assertEqual(calls, ['list', 'list', 'list', 1, 2])
+
+        # Writes clear everything cached for the resource.
+        res = CachedResource()
+        res.request = FakeHttpRequest('PUT', '{"id": 1, "title": "Contact"}')
+        self.assertEqual(res.handle('detail', 1).status_code, 202)
+        get('list')
+        get('detail', 1)
+        self.assertEqual(calls, ['list', 'list', 'list', 1, 2, 'list', 1])
+
+        # Errors aren't cached.
+        self.assertEqual(get('detail', 404).status_code, 404)
+        get('detail', 404)
+        self.assertEqual(calls[-2:], [404, 404])
+
+    def test_converters(self):
+        class TagResource(self.resource_class):
+            converters = {set: sorted}
+
+            def detail(self):
+                return {'tags': {'b', 'a'}}
+
+        res = TagResource()
+        res.request = FakeHttpRequest()
+        resp = res.handle('detail')
+        self.assertEqual(json.loads(resp.body), {'tags': ['a', 'b']})
+        self.assertIsNot(res.serializer, Resource.serializer)
+        self.assertIsNone(Resource.serializer.converters.get_converter(set))
+
+        # The converting serializer is reused across requests.
+        serializer = res.serializer
+        res = TagResource()
+        res.request = FakeHttpRequest()
+        res.handle('detail')
+        self.assertIs(res.serializer, serializer)
+
+        # Reassigning the converters starts over.
+        TagResource.converters = {set: lambda tags: sorted(tags, reverse=True)}
+        res = TagResource()
+        res.request = FakeHttpRequest()
+        resp = res.handle('detail')
+        self.assertEqual(json.loads(resp.body), {'tags': ['b', 'a']})
+        self.assertIsNot(res.serializer, serializer)
+
+        # Copies go away with the serializers they were made from.
+        original = JSONSerializer()
+        copied = weakref.ref(res.get_converting_serializer(original))
+        del original
+        gc.collect()
+        self.assertIsNone(copied())
+
+    def test_ndjson_output(self):
+        class ExportResource(self.resource_class):
+            serializers = [JSONSerializer(), NDJSONSerializer()]
+            stream_chunk_size = 2
+
+            def is_authenticated(self):
+                return True
+
+            def list(self):
+                return [{'id': i} for i in range(3)]
+
+            def detail(self):
+                return {'id': 1}
+
+        res = ExportResource()
+        res.request = FakeHttpRequest(headers={'Accept': 'application/x-ndjson'})
+        resp = res.handle('list')
+        self.assertEqual(res.get_content_type(), 'application/x-ndjson')
+        # Streamed without ``streaming = True`` & without the wrapper.
+        self.assertNotIsInstance(resp.body, bytes)
+        self.assertEqual(list(resp.body), [
+            b'{"id": 0}\n{"id": 1}\n',
+            b'{"id": 2}\n',
+        ])
+
+        res = ExportResource()
+        res.request = FakeHttpRequest(headers={'Accept': 'application/x-ndjson'})
+        resp = res.handle('detail')
+        self.assertEqual(resp.body, b'{"id": 1}\n')
+
+        # JSON is unaffected.
+        res = ExportResource()
+        res.request = FakeHttpRequest()
+        resp = res.handle('list')
+        self.assertEqual(json.loads(resp.body), {
+            'objects': [{'id': 0}, {'id': 1}, {'id': 2}],
+        })
+
+    def test_stream_requests(self):
+        class BulkResource(self.resource_class):
+            stream_requests = True
+            serializers = [JSONSerializer(), NDJSONSerializer()]
+            seen = []
+
+            def is_authenticated(self):
+                return True
+
+            def request_body(self):
+                raise AssertionError("The body shouldn't be read in one go.")
+
+            def update_list(self):
+                for item in self.data:
+                    self.seen.append(item['id'])
+
+            def update(self):
+                return self.data
+
+        res = BulkResource()
+        res.request = FakeHttpRequest('PUT', '[{"id": 1}, {"id": 2}]')
+        resp = res.handle('list')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(BulkResource.seen, [1, 2])
+
+        res = BulkResource()
+        res.request = FakeHttpRequest(
+            'PUT',
+            '{"id": 3}\n{"id": 4}\n',
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
+        resp = res.handle('list')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(BulkResource.seen, [1, 2, 3, 4])
+
+        res = BulkResource()
+        res.request = FakeHttpRequest('PUT', '[{"id": 5}, nope]')
+        resp = res.handle('list')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(BulkResource.seen, [1, 2, 3, 4, 5])
+
+        # Detail endpoints still get the whole body.
+        res = BulkResource()
+        res.request = FakeHttpRequest('PUT', '{"id": 6}')
+        res.request_body = lambda: res.request.body
+        resp = res.handle('detail')
+        self.assertEqual(json.loads(resp.body), {'id': 6})
+
+
+class AsyncGenericResource(AsyncResource):
+    def build_response(self, data, status=200):
+        resp = FakeHttpResponse(data, content_type='application/json')
+        resp.status_code = status
+        return resp
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncResourceTestCase(unittest.TestCase):
+    def test_sync_methods(self):
+        class BookResource(AsyncGenericResource):
+            def list(self):
+                return [{'title': 'Cosmos'}]
+
+        res = BookResource()
+        res.request = FakeHttpRequest()
+        resp = run(res.handle('list'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {'objects': [{'title': 'Cosmos'}]})
+
+    def test_coroutines(self):
+        events = []
+
+        class AsyncPreparer(FieldsPreparer):
+            async def prepare(self, data):
+                await asyncio.sleep(0)
+                return super(AsyncPreparer, self).prepare(data)
+
+        class BookResource(AsyncGenericResource):
+            preparer = AsyncPreparer(fields={'title': 'title'})
+
+            async def is_authenticated(self):
+                return True
+
+            async def deserialize_request(self, method, endpoint):
+                await asyncio.sleep(0)
+                return {'title': 'Contact'}
+
+            async def list(self):
+                events.append('start')
+                await asyncio.sleep(0)
+                events.append('end')
+                return [{'title': 'Cosmos', 'isbn': 1}, {'title': 'Contact'}]
+
+            async def detail(self, pk):
+                if pk != 1:
+                    raise NotFound()
+
+                return {'title': 'Cosmos', 'isbn': 1}
+
+            async def update(self, pk):
+                return self.data
+
+            async def build_response(self, data, status=200):
+                return super(BookResource, self).build_response(data, status)
+
+        def handle(method, endpoint, *args):
+            res = BookResource()
+            res.request = FakeHttpRequest(method)
+            return res.handle(endpoint, *args)
+
+        async def handle_both():
+            return await asyncio.gather(
+                handle('GET', 'list'),
+                handle('GET', 'list')
+            )
+
+        first, second = run(handle_both())
+        # The requests were handled concurrently.
+        self.assertEqual(events, ['start', 'start', 'end', 'end'])
+        self.assertEqual(json.loads(first.body), {
+            'objects': [{'title': 'Cosmos'}, {'title': 'Contact'}],
+        })
+        self.assertEqual(first.body, second.body)
+
+        resp = run(handle('GET', 'detail', 1))
+        self.assertEqual(json.loads(resp.body), {'title': 'Cosmos'})
+
+        resp = run(handle('GET', 'detail', 2))
+        self.assertEqual(resp.status_code, 404)
+
+        resp = run(handle('PUT', 'detail', 1))
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(json.loads(resp.body), {'title': 'Contact'})
+
+    def test_async_prepare_many(self):
+        class AsyncPreparer(FieldsPreparer):
+            batches = []
+
+            async def prepare_many(self, data):
+                self.batches.append(len(data))
+                return [self.prepare(item) for item in data]
+
+        class BookResource(AsyncGenericResource):
+            preparer = AsyncPreparer(fields={'title': 'title'})
+            streaming = True
+
+            def list(self):
+                return [{'title': 'Cosmos'}, {'title': 'Contact'}]
+
+        res = BookResource()
+        res.request = FakeHttpRequest()
+        self.assertTrue(res.has_async_preparer())
+        resp = run(res.handle('list'))
+        self.assertEqual(json.loads(b''.join(resp.body)), {
+            'objects': [{'title': 'Cosmos'}, {'title': 'Contact'}],
+        })
+        self.assertEqual(AsyncPreparer.batches, [2])
@@ -0,0 +1,156 @@
+import unittest
+
+from restless.asgi import ASGIResource
+from restless.routing import Router
+from restless.utils import json
+from restless.wsgi import WSGIResource
+
+from .fakes import FakeASGIClient, FakeWSGIClient
+
+
+class PostResource(WSGIResource):
+    http_methods = dict(WSGIResource.http_methods, schema={
+        'GET': 'schema',
+    })
+
+    def list(self):
+        return [{'id': 1}]
+
+    def detail(self, pk):
+        return {'id': pk}
+
+    def schema(self):
+        return {'fields': ['id']}
+
+
+class CommentResource(WSGIResource):
+    def list(self, post_id):
+        return [{'post_id': post_id}]
+
+    def detail(self, post_id, pk):
+        return {'post_id': post_id, 'id': pk}
+
+
+class AsyncPostResource(ASGIResource):
+    events = []
+
+    async def list(self):
+        return [{'id': 1}]
+
+    async def detail(self, pk):
+        return {'id': pk}
+
+    @classmethod
+    def startup(cls):
+        cls.events.append(cls.__name__)
+
+
+class AsyncUserResource(AsyncPostResource):
+    pass
+
+
+class RouterTestCase(unittest.TestCase):
+    def setUp(self):
+        super(RouterTestCase, self).setUp()
+        self.router = Router()
+        self.router.add('/posts/', PostResource)
+        self.router.add_route('/posts/<post_id>/comments/', CommentResource, 'list')
+        self.router.add_route(
+            '/posts/<post_id>/comments/<pk>/', CommentResource, 'detail'
+        )
+
+    def assertMatch(self, path, endpoint_path, kwargs):
+        route, found = self.router.match(path)
+        self.assertEqual(route.path, endpoint_path)
+        self.assertEqual(found, kwargs)
+
+    def test_match(self):
+        self.assertMatch('/posts/', '/posts', {})
+        self.assertMatch('/posts', '/posts', {})
+        self.assertMatch('/posts/5/', '/posts/<pk>', {'pk': '5'})
+        self.assertMatch('/posts/schema/', '/posts/schema', {})
+        self.assertMatch(
+            '/posts/5/comments/',
+            '/posts/<post_id>/comments',
+            {'post_id': '5'}
+        )
+        self.assertMatch(
+            '/posts/5/comments/7/',
+            '/posts/<post_id>/comments/<pk>',
+            {'post_id': '5', 'pk': '7'}
+        )
+        # ``schema`` is static, but nothing under it matches, so it's used as
+        # the argument.
+        self.assertMatch(
+            '/posts/schema/comments/',
+            '/posts/<post_id>/comments',
+            {'post_id': 'schema'}
+        )
+
+        for path in ('/', '/post/', '/posts//comments/', '/posts/5/likes/'):
+            self.assertIsNone(self.router.match(path))
+
+    def test_add(self):
+        router = Router()
+        router.add('/', PostResource)
+        self.assertEqual(router.match('/')[0].path, '/')
+        self.assertEqual(router.match('/5/')[1], {'pk': '5'})
+        self.assertEqual(router.resource_classes, [PostResource])
+
+        with self.assertRaises(ValueError):
+            router.add_route('/<id>/', CommentResource, 'detail')
+
+    def test_many_resources(self):
+        router = Router()
+        resources = [
+            type('Resource{}'.format(i), (PostResource,), {})
+            for i in range(300)
+        ]
+
+        for i, resource_class in enumerate(resources):
+            router.add('/api/v1/resource{}/'.format(i), resource_class)
+
+        route, kwargs = router.match('/api/v1/resource299/12/')
+        self.assertIs(route.resource_class, resources[299])
+        self.assertEqual(kwargs, {'pk': '12'})
+        self.assertIs(
+            router.match('/api/v1/resource150/')[0].resource_class,
+            resources[150]
+        )
+
+    def test_as_wsgi(self):
+        client = FakeWSGIClient(self.router.as_wsgi())
+        resp = client.request('GET', '/posts/5/comments/7/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {'post_id': '5', 'id': '7'})
+
+        resp = client.request('GET', '/posts/schema/')
+        self.assertEqual(json.loads(resp.body), {'fields': ['id']})
+
+        resp = client.request('GET', '/nope/')
+        self.assertEqual(resp.status, '404 Not Found')
+        self.assertEqual(json.loads(resp.body), {'error': 'Resource not found.'})
+
+    def test_as_asgi(self):
+        router = Router()
+        router.add('/posts/', AsyncPostResource)
+        router.add('/users/', AsyncUserResource)
+        client = FakeASGIClient(router.as_asgi())
+
+        resp = client.request('GET', '/users/3/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body), {'id': '3'})
+
+        resp = client.request('GET', '/nope/')
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(json.loads(resp.body), {'error': 'Resource not found.'})
+
+        AsyncPostResource.events = []
+        self.assertEqual(client.lifespan(), [
+            {'type': 'lifespan.startup.complete'},
+            {'type': 'lifespan.shutdown.complete'},
+        ])
+        self.assertEqual(
+            AsyncPostResource.events,
+            ['AsyncPostResource', 'AsyncUserResource']
+        )
@@ -1,10 +1,31 @@
+import dataclasses
 import datetime
 from decimal import Decimal
+import enum
+import io
 import unittest
 import uuid
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 from restless.exceptions import BadRequest
-from restless.serializers import JSONSerializer
+from restless.serializers import (JSONSerializer, MsgPackSerializer,
+                                  NDJSONSerializer, get_json_backend,
+                                  iter_json_array)
+from restless.utils import json
 
 
 class JSONSerializerTestCase(unittest.TestCase):
@@ -25,12 +46,17 @@ class JSONSerializerTestCase(unittest.TestCase):
 
     def test_serialize(self):
         body = self.serializer.serialize(self.dict_data)
-        self.assertIn('"hello": "world"', body)
-        self.assertIn('"abc": 123', body)
-        self.assertIn('"nested": "2014-03-30T12:55:15"', body)
-        self.assertIn('"again": "18.9"', body)
+        self.assertIsInstance(body, bytes)
+        self.assertIn(b'"hello": "world"', body)
+        self.assertIn(b'"abc": 123', body)
+        self.assertIn(b'"nested": "2014-03-30T12:55:15"', body)
+        self.assertIn(b'"again": "18.9"', body)
 
     def test_deserialize(self):
+        self.assertEqual(self.serializer.deserialize(b'{"more": "things"}'), {
+            'more': 'things',
+        })
+        # Plain strings are fine too.
         self.assertEqual(self.serializer.deserialize('{"more": "things"}'), {
             'more': 'things',
         })
@@ -38,3 +64,345 @@ class JSONSerializerTestCase(unittest.TestCase):
     def test_deserialize_invalid(self):
         with self.assertRaises(BadRequest):
             self.serializer.deserialize('not valid!')
+
+    def test_backend(self):
+        self.assertEqual(self.serializer.backend.name, 'json')
+        self.assertIn(
+            JSONSerializer(backend='auto').backend.name,
+            ['orjson', 'rapidjson', 'json']
+        )
+
+        with self.assertRaises(ValueError):
+            get_json_backend('nope')
+
+
+class IterJSONArrayTestCase(unittest.TestCase):
+    def test_iter_json_array(self):
+        data = [
+            {'id': i, 'title': 'P\u00f8st {}'.format(i), 'tags': [1.5, None, True]}
+            for i in range(20)
+        ] + [12345678901234567890, 'last', [], {}]
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+        # Small reads split numbers, strings & multi-byte characters.
+        for read_size in (1, 2, 7, 64, 65536):
+            self.assertEqual(
+                list(iter_json_array(io.BytesIO(body), read_size=read_size)),
+                data
+            )
+
+    def test_numbers(self):
+        # Reads ending just after the integer part of a number mustn't cut it
+        # short.
+        bodies = [
+            b'[2.5]', b'[-2.5]', b'[1e10]', b'[1E-7, 2.25e+3]', b'[0.5, -0, 10]',
+            b'[{"a": 1.5}, 3.25e2, [4.125]]',
+            b'["' + b'x' * 65529 + b'", 1.5]',
+        ]
+
+        for body in bodies:
+            for read_size in range(1, 12):
+                self.assertEqual(
+                    list(iter_json_array(io.BytesIO(body), read_size=read_size)),
+                    json.loads(body)
+                )
+
+            self.assertEqual(list(iter_json_array(io.BytesIO(body))), json.loads(body))
+
+    def test_fails_fast(self):
+        class CountingStream(io.BytesIO):
+            reads = 0
+
+            def read(self, size=-1):
+                self.reads += 1
+                return super(CountingStream, self).read(size)
+
+        stream = CountingStream(b'[1, @' + b' ' * 100000)
+        with self.assertRaises(BadRequest):
+            list(iter_json_array(stream, read_size=16))
+        self.assertLess(stream.reads, 3)
+
+        # Unterminated items are given up on once they're too big.
+        with self.assertRaises(BadRequest):
+            list(iter_json_array(
+                io.BytesIO(b'["' + b'x' * 100000),
+                read_size=16,
+                max_item_size=1000
+            ))
+
+    def test_lazy(self):
+        stream = io.BytesIO(b'[{"id": 1}, {"id": 2}, ' + b' ' * 100 + b'{"id": 3}]')
+        items = iter_json_array(stream, read_size=16)
+        self.assertEqual(next(items), {'id': 1})
+        self.assertLess(stream.tell(), 32)
+
+    def test_empty(self):
+        for body in (b'', b'  ', b'[]', b' [ ]\n'):
+            self.assertEqual(list(iter_json_array(io.BytesIO(body), read_size=1)), [])
+
+    def test_invalid(self):
+        for body in (b'{}', b'[1,', b'[1 2]', b'[1,]', b'[', b'[1]x', b'\xff'):
+            with self.assertRaises(BadRequest):
+                list(iter_json_array(io.BytesIO(body), read_size=1))
+
+
+class NDJSONSerializerTestCase(unittest.TestCase):
+    def setUp(self):
+        super(NDJSONSerializerTestCase, self).setUp()
+        self.serializer = NDJSONSerializer()
+        self.body = b'{"id": 1}\n\n{"id": 2, "title": "two"}\r\n[3]'
+
+    def test_deserialize(self):
+        expected = [{'id': 1}, {'id': 2, 'title': 'two'}, [3]]
+        self.assertEqual(self.serializer.deserialize(self.body), expected)
+        self.assertEqual(
+            self.serializer.deserialize(self.body.decode('utf-8')),
+            expected
+        )
+
+    def test_deserialize_iter(self):
+        self.serializer.read_size = 3
+        self.assertEqual(
+            list(self.serializer.deserialize_iter(io.BytesIO(self.body))),
+            [{'id': 1}, {'id': 2, 'title': 'two'}, [3]]
+        )
+
+        with self.assertRaises(BadRequest):
+            list(self.serializer.deserialize_iter(io.BytesIO(b'{"id": 1}\nnope')))
+
+        for read_size in range(1, 8):
+            self.serializer.read_size = read_size
+            self.assertEqual(
+                list(self.serializer.deserialize_iter(io.BytesIO(self.body))),
+                [{'id': 1}, {'id': 2, 'title': 'two'}, [3]]
+            )
+
+        self.serializer.max_item_size = 10
+        with self.assertRaises(BadRequest):
+            list(self.serializer.deserialize_iter(io.BytesIO(b'{"id": 1}\n' + b' ' * 100)))
+
+    def test_serialize(self):
+        self.assertEqual(
+            self.serializer.serialize([{'id': 1}, {'id': 2, 'title': 'two\nlines'}]),
+            b'{"id": 1}\n{"id": 2, "title": "two\\nlines"}\n'
+        )
+        self.assertEqual(self.serializer.serialize({'id': 1}), b'{"id": 1}\n')
+        self.assertEqual(self.serializer.serialize([]), b'')
+
+    def test_serialize_stream(self):
+        chunks = [[{'id': 1}, {'id': 2}], [], [{'id': 3}]]
+        self.assertEqual(
+            list(self.serializer.serialize_stream('marker', 'marker', iter(chunks))),
+            [b'{"id": 1}\n{"id": 2}\n', b'{"id": 3}\n']
+        )
+
+        with self.assertRaises(ValueError):
+            list(self.serializer.serialize_stream({'objects': 'marker'}, 'marker', chunks))
+
+
+class JSONBackendTestCase(unittest.TestCase):
+    """
+    Every backend should produce the same data as the standard library (once
+    parsed), so the backend-specific test cases just subclass this one.
+    """
+    backend = 'json'
+
+    def setUp(self):
+        super(JSONBackendTestCase, self).setUp()
+        self.serializer = JSONSerializer(backend=self.backend)
+        self.reference = JSONSerializer()
+        tz = datetime.timezone(datetime.timedelta(hours=-5))
+        self.data = {
+            'objects': [
+                {
+                    'id': 1,
+                    'title': 'Hello, w\u00f6rld! </script>',
+                    'price': Decimal('18.90'),
+                    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+                    'created': datetime.datetime(2014, 3, 30, 12, 55, 15),
+                    'updated': datetime.datetime(2014, 3, 30, 12, 55, 15, 1234, tzinfo=tz),
+                    'day': datetime.date(2014, 3, 30),
+                    'time': datetime.time(12, 55, tzinfo=datetime.timezone.utc),
+                    'ratio': 0.1,
+                    'tags': ['a', 'b'],
+                    'empty': None,
+                    'flag': True,
+                },
+            ],
+            # The fast libraries can't always handle these, so they fall back.
+            'big': 2 ** 70,
+            'keys': {1: 'one', None: 'nothing', False: 'no', 2.5: 'more'},
+        }
+
+    def test_serialize(self):
+        body = self.serializer.serialize(self.data)
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(
+            json.loads(body),
+            json.loads(self.reference.serialize(self.data))
+        )
+        self.assertEqual(json.loads(body)['objects'][0]['updated'], '2014-03-30T12:55:15.001234-05:00')
+
+    def test_serialize_non_finite(self):
+        data = {
+            'values': [float('nan'), float('inf'), -float('inf'), 1.5, None],
+        }
+        body = self.serializer.serialize(data)
+        self.assertEqual(
+            body.replace(b' ', b''),
+            b'{"values":[NaN,Infinity,-Infinity,1.5,null]}'
+        )
+        self.assertEqual(
+            json.loads(body)['values'][1:],
+            json.loads(self.reference.serialize(data))['values'][1:]
+        )
+
+    def test_serialize_stream(self):
+        marker = '__marker__'
+        chunks = [self.data['objects'], [], [{'id': 2}, {'id': 3}]]
+        body = b''.join(self.serializer.serialize_stream(
+            {'objects': marker, 'meta': {'big': self.data['big']}},
+            marker,
+            iter(chunks)
+        ))
+        self.assertEqual(json.loads(body), json.loads(self.reference.serialize({
+            'objects': self.data['objects'] + [{'id': 2}, {'id': 3}],
+            'meta': {'big': self.data['big']},
+        })))
+
+        body = b''.join(self.serializer.serialize_stream(
+            {'objects': marker},
+            marker,
+            []
+        ))
+        self.assertEqual(json.loads(body), {'objects': []})
+
+    def test_serialize_unknown(self):
+        with self.assertRaises(TypeError):
+            self.serializer.serialize({'nope': object()})
+
+    def test_converters(self):
+        class Color(enum.Enum):
+            RED = 'red'
+
+        @dataclasses.dataclass
+        class Point(object):
+            x: int
+            y: int
+
+        # Unlike their values, which some libraries would use themselves.
+        serializer = JSONSerializer(
+            backend=self.backend,
+            converters={
+                set: sorted,
+                Color: lambda color: color.name,
+                Point: lambda point: [point.x, point.y],
+            }
+        )
+        body = serializer.serialize({
+            'tags': {'b', 'a'},
+            'color': Color.RED,
+            'point': Point(1, 2),
+            'price': Decimal('18.90'),
+        })
+        self.assertEqual(json.loads(body), {
+            'tags': ['a', 'b'],
+            'color': 'RED',
+            'point': [1, 2],
+            'price': '18.90',
+        })
+
+        # Converters for a base class count too.
+        serializer = JSONSerializer(
+            backend=self.backend,
+            converters={enum.Enum: lambda member: member.name}
+        )
+        self.assertEqual(json.loads(serializer.serialize([Color.RED])), ['RED'])
+
+        # Registering later works too, without touching other serializers.
+        serializer.converters.register(frozenset, sorted)
+        self.assertEqual(json.loads(serializer.serialize(frozenset([2, 1]))), [1, 2])
+
+        with self.assertRaises(TypeError):
+            self.serializer.serialize({'nope': {1}})
+
+    def test_deserialize(self):
+        body = self.reference.serialize(self.data)
+        self.assertEqual(
+            self.serializer.deserialize(body),
+            self.reference.deserialize(body)
+        )
+        self.assertEqual(
+            self.serializer.deserialize(body.decode('utf-8')),
+            self.reference.deserialize(body)
+        )
+
+    def test_deserialize_invalid(self):
+        with self.assertRaises(BadRequest):
+            self.serializer.deserialize('not valid!')
+
+        with self.assertRaises(BadRequest):
+            self.serializer.deserialize(b'\xff')
+
+
+@unittest.skipIf(not orjson, 'orjson is not available')
+class OrjsonBackendTestCase(JSONBackendTestCase):
+    backend = 'orjson'
+
+
+@unittest.skipIf(not rapidjson, 'python-rapidjson is not available')
+class RapidJSONBackendTestCase(JSONBackendTestCase):
+    backend = 'rapidjson'
+
+
+class AutoBackendTestCase(JSONBackendTestCase):
+    backend = 'auto'
+
+
+@unittest.skipIf(not msgpack, 'msgpack is not available')
+class MsgPackSerializerTestCase(unittest.TestCase):
+    def setUp(self):
+        super(MsgPackSerializerTestCase, self).setUp()
+        self.serializer = MsgPackSerializer()
+
+    def test_serialize(self):
+        body = self.serializer.serialize({
+            'hello': 'world',
+            'abc': 123,
+            'nested': datetime.datetime(2014, 3, 30, 12, 55, 15),
+            'again': Decimal('18.9'),
+            'blob': b'\x00\x01',
+        })
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(msgpack.unpackb(body, raw=False), {
+            'hello': 'world',
+            'abc': 123,
+            'nested': '2014-03-30T12:55:15',
+            'again': '18.9',
+            'blob': b'\x00\x01',
+        })
+
+    def test_converters(self):
+        serializer = MsgPackSerializer(converters={set: sorted})
+        body = serializer.serialize({'tags': {'b', 'a'}})
+        self.assertEqual(msgpack.unpackb(body, raw=False), {'tags': ['a', 'b']})
+
+        copied = self.serializer.with_converters({frozenset: sorted})
+        body = copied.serialize(frozenset([2, 1]))
+        self.assertEqual(msgpack.unpackb(body, raw=False), [1, 2])
+
+        with self.assertRaises(TypeError):
+            self.serializer.serialize(frozenset([2, 1]))
+
+    def test_deserialize(self):
+        body = msgpack.packb({'more': ['things', 1]}, use_bin_type=True)
+        self.assertEqual(self.serializer.deserialize(body), {
+            'more': ['things', 1],
+        })
+
+    def test_deserialize_invalid(self):
+        with self.assertRaises(BadRequest):
+            self.serializer.deserialize(b'\xc1')
+
+        with self.assertRaises(BadRequest):
+            self.serializer.deserialize(b'\x92\x01')
@@ -1,6 +1,7 @@
 import unittest
 import socket
 import six
+import zlib
 
 from restless.utils import json
 from restless.constants import UNAUTHORIZED
@@ -102,11 +103,46 @@ class TndAsyncTestResource(TndBaseTestResource):
         self.fake_db.append(self.data)
 
 
+class TndStreamingTestResource(TndBasicTestResource):
+    """
+    streams the list view
+    """
+    streaming = True
+    stream_chunk_size = 2
+
+
+class TndCompressedTestResource(TndStreamingTestResource):
+    """
+    compresses the (streamed) list view
+    """
+    compress = True
+
+
+class TndNativeAsyncTestResource(TndBaseTestResource):
+    """
+    native (``async def``) view_method
+    """
+    async def list(self):
+        await gen.sleep(0)
+        return self.fake_db
+
+
+class TndETagTestResource(TndBasicTestResource):
+    """
+    sends ETags
+    """
+    etags = True
+
+
 app = web.Application([
     (r'/fake', TndBasicTestResource.as_list()),
+    (r'/fake_streaming', TndStreamingTestResource.as_list()),
+    (r'/fake_compressed', TndCompressedTestResource.as_list()),
+    (r'/fake_etag', TndETagTestResource.as_list()),
     (r'/fake/([^/]+)', TndBasicTestResource.as_detail()),
     (r'/fake_async', TndAsyncTestResource.as_list()),
-    (r'/fake_async/([^/]+)', TndAsyncTestResource.as_detail())
+    (r'/fake_async/([^/]+)', TndAsyncTestResource.as_detail()),
+    (r'/fake_native_async', TndNativeAsyncTestResource.as_list()),
 ], debug=True)
 
 
@@ -161,6 +197,51 @@ class TndResourceTestCase(BaseHTTPTestCase):
             'title': 'Another'
         })
 
+    def test_streaming(self):
+        resp = self.fetch(
+            '/fake_streaming',
+            method='GET',
+            follow_redirects=False
+        )
+        self.assertEqual(resp.headers['Content-Type'], 'application/json; charset=UTF-8')
+        self.assertEqual(resp.code, 200)
+        self.assertEqual(json.loads(resp.body.decode('utf-8')), {
+            'objects': [
+                {'id': 'dead-beef', 'title': 'First post'},
+                {'id': 'de-faced', 'title': 'Another'},
+                {'id': 'bad-f00d', 'title': 'Last'},
+            ]
+        })
+
+    def test_compress(self):
+        resp = self.fetch(
+            '/fake_compressed',
+            method='GET',
+            headers={'Accept-Encoding': 'gzip'},
+            decompress_response=False,
+            follow_redirects=False
+        )
+        self.assertEqual(resp.code, 200)
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(resp.headers['Vary'], 'Accept-Encoding')
+        body = zlib.decompress(resp.body, 16 + zlib.MAX_WBITS)
+        self.assertEqual(len(json.loads(body.decode('utf-8'))['objects']), 3)
+
+    def test_etag(self):
+        resp = self.fetch('/fake_etag', method='GET', follow_redirects=False)
+        self.assertEqual(resp.code, 200)
+        etag = resp.headers['Etag']
+
+        resp = self.fetch(
+            '/fake_etag',
+            method='GET',
+            headers={'If-None-Match': etag},
+            follow_redirects=False
+        )
+        self.assertEqual(resp.code, 304)
+        self.assertEqual(resp.headers['Etag'], etag)
+        self.assertEqual(resp.body, b'')
+
     def test_not_authenticated(self):
         resp = self.fetch(
                 '/fake',
@@ -226,6 +307,18 @@ class InternalTestCase(BaseTestCase):
     def test_method(self):
         self.assertEqual(self.new_handler.resource_handler.request_method(), 'GET')
 
+    def test_header(self):
+        resource_handler = self.new_handler.resource_handler
+        resource_handler.request.headers['Accept'] = 'application/msgpack'
+        self.assertEqual(resource_handler.request_header('Accept'), 'application/msgpack')
+        self.assertIsNone(resource_handler.request_header('X-Nope'))
+
+    def test_param(self):
+        resource_handler = self.new_handler.resource_handler
+        resource_handler.request.query_arguments = {'fields': [b'id', b'id,title']}
+        self.assertEqual(resource_handler.request_param('fields'), 'id,title')
+        self.assertIsNone(resource_handler.request_param('expand'))
+
     def test_class(self):
         """ test the generated tornado.web.RequestHandler """
         self.assertEqual(self.new_handler.__class__.__name__, 'TndBasicTestResource__BridgeMixin_restless')
@@ -328,3 +421,11 @@ class TndAsyncResourceTestCase(BaseHTTPTestCase):
             'title': 'Another'
         })
 
+    def test_native_coroutine(self):
+        resp = self.fetch(
+            '/fake_native_async',
+            method='GET',
+            follow_redirects=False
+        )
+        self.assertEqual(resp.code, 200)
+        self.assertEqual(len(json.loads(resp.body.decode('utf-8'))['objects']), 3)
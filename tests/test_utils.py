@@ -1,7 +1,15 @@
+import datetime
+from decimal import Decimal
+import enum
 import sys
 import unittest
+import zlib
 
-from restless.utils import format_traceback
+from restless.utils import (best_encoding, best_match, compress,
+                            compress_iter, default_converters,
+                            format_traceback, http_date, iter_chunks,
+                            parse_accept, parse_etags, parse_http_date,
+                            LRUCache, MoreTypesJSONEncoder, TypeConverters)
 
 
 class FormatTracebackTestCase(unittest.TestCase):
@@ -16,3 +24,234 @@ class FormatTracebackTestCase(unittest.TestCase):
             lines = result.split('\n')
             self.assertGreater(len(lines), 3)
             self.assertEqual(lines[-1], 'ValueError: Because we need an exception.')
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class IterChunksTestCase(unittest.TestCase):
+    def test_iter_chunks(self):
+        self.assertEqual(list(iter_chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(iter_chunks([], 2)), [])
+
+    def test_lazy(self):
+        seen = []
+
+        def numbers():
+            for i in range(5):
+                seen.append(i)
+                yield i
+
+        chunks = iter_chunks(numbers(), 2)
+        self.assertEqual(next(chunks), [0, 1])
+        self.assertEqual(seen, [0, 1])
+
+
+class AcceptTestCase(unittest.TestCase):
+    def test_parse_accept(self):
+        self.assertEqual(
+            parse_accept('application/json, text/*;q=0.5, *;q=bad,'),
+            (('application/json', 1.0), ('text/*', 0.5), ('*/*', 0.0))
+        )
+        self.assertIs(
+            parse_accept('application/json'),
+            parse_accept('application/json')
+        )
+
+    def test_best_match(self):
+        offered = ('application/json', 'application/msgpack')
+        self.assertEqual(best_match('', offered), 'application/json')
+        self.assertEqual(best_match('*/*', offered), 'application/json')
+        self.assertEqual(
+            best_match('application/msgpack', offered),
+            'application/msgpack'
+        )
+        self.assertEqual(
+            best_match('application/json;q=0.5, application/*;q=0.8', offered),
+            'application/msgpack'
+        )
+        # The most specific range wins, even with a lower quality.
+        self.assertEqual(
+            best_match('application/msgpack;q=0, */*', offered),
+            'application/json'
+        )
+        self.assertIsNone(best_match('text/html', offered))
+        self.assertIsNone(best_match('application/json;q=0', offered[:1]))
+
+
+class CompressionTestCase(unittest.TestCase):
+    def test_best_encoding(self):
+        offered = ('gzip', 'deflate')
+        self.assertEqual(best_encoding('gzip, deflate', offered), 'gzip')
+        self.assertEqual(best_encoding('deflate, gzip;q=0.5', offered), 'deflate')
+        self.assertEqual(best_encoding('*', offered), 'gzip')
+        self.assertEqual(best_encoding('br, *;q=0.1, gzip;q=0', offered), 'deflate')
+        self.assertIsNone(best_encoding('br, identity', offered))
+        self.assertIsNone(best_encoding('', offered))
+
+    def test_compress(self):
+        body = b'{"title": "Hello"}' * 100
+        gzipped = compress(body, 'gzip')
+        self.assertEqual(zlib.decompress(gzipped, 16 + zlib.MAX_WBITS), body)
+        # No timestamp, so the same body always compresses the same.
+        self.assertEqual(compress(body, 'gzip'), gzipped)
+        self.assertEqual(zlib.decompress(compress(body, 'deflate')), body)
+        self.assertEqual(zlib.decompress(compress('caf\u00e9', 'deflate')), b'caf\xc3\xa9')
+
+    def test_compress_iter(self):
+        chunks = [b'[', b'1, 2', b'', b', 3]']
+        compressed = list(compress_iter(iter(chunks), 'gzip', level=1))
+        self.assertEqual(len(compressed), 4)
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Each chunk can be decompressed as soon as it arrives.
+        self.assertEqual(decompressor.decompress(compressed[0]), b'[')
+        self.assertEqual(
+            b''.join(decompressor.decompress(chunk) for chunk in compressed[1:]),
+            b'1, 2, 3]'
+        )
+
+
+class ConditionalTestCase(unittest.TestCase):
+    def test_http_date(self):
+        self.assertEqual(
+            http_date(datetime.datetime(2014, 3, 30, 12, 55, 15)),
+            'Sun, 30 Mar 2014 12:55:15 GMT'
+        )
+        tz = datetime.timezone(datetime.timedelta(hours=-5))
+        self.assertEqual(
+            http_date(datetime.datetime(2014, 3, 30, 7, 55, 15, tzinfo=tz)),
+            'Sun, 30 Mar 2014 12:55:15 GMT'
+        )
+
+    def test_parse_http_date(self):
+        self.assertEqual(
+            parse_http_date('Sun, 30 Mar 2014 12:55:15 GMT'),
+            datetime.datetime(2014, 3, 30, 12, 55, 15, tzinfo=datetime.timezone.utc)
+        )
+        self.assertIsNone(parse_http_date('yesterday'))
+        self.assertIsNone(parse_http_date(None))
+
+    def test_parse_etags(self):
+        self.assertEqual(
+            parse_etags('"abc", W/"d,ef",*'),
+            ['"abc"', '"d,ef"', '*']
+        )
+        self.assertEqual(parse_etags(''), [])
+
+
+class TypeConvertersTestCase(unittest.TestCase):
+    def test_convert(self):
+        converters = TypeConverters({set: sorted})
+        self.assertEqual(converters.convert({3, 1, 2}), [1, 2, 3])
+
+        with self.assertRaises(TypeError):
+            converters.convert(object())
+
+    def test_mro(self):
+        class Color(enum.Enum):
+            RED = 'red'
+
+        converters = TypeConverters()
+
+        @converters.register(enum.Enum)
+        def convert_enum(member):
+            return member.value
+
+        self.assertEqual(converters.convert(Color.RED), 'red')
+        self.assertIs(converters.get_converter(Color), convert_enum)
+
+        # Closer matches win.
+        converters.register(Color, lambda member: member.name)
+        self.assertEqual(converters.convert(Color.RED), 'RED')
+
+    def test_parent(self):
+        parent = TypeConverters({int: str})
+        child = TypeConverters({set: sorted}, parent=parent)
+        self.assertEqual(child.convert(5), '5')
+        self.assertEqual(child.convert({2, 1}), [1, 2])
+        self.assertIsNone(parent.get_converter(set))
+
+        # Later registrations on the parent show up, despite the caching.
+        self.assertIsNone(child.get_converter(float))
+        parent.register(float, int)
+        self.assertEqual(child.convert(1.5), 1)
+
+    def test_covers(self):
+        class Color(enum.Enum):
+            RED = 'red'
+
+        parent = TypeConverters({int: str})
+        child = TypeConverters({set: sorted}, parent=parent)
+        self.assertTrue(child.covers(set))
+        self.assertTrue(child.covers(int))
+        self.assertFalse(child.covers(enum.Enum))
+        self.assertFalse(parent.covers(set))
+
+        # Subclasses count, & later registrations show up.
+        parent.register(Color, lambda member: member.name)
+        self.assertTrue(child.covers(enum.Enum))
+        self.assertFalse(child.covers(str))
+
+    def test_defaults(self):
+        self.assertEqual(
+            default_converters.convert(datetime.datetime(2014, 3, 30, 12, 55)),
+            '2014-03-30T12:55:00'
+        )
+        self.assertEqual(default_converters.convert(Decimal('18.9')), '18.9')
+        self.assertEqual(
+            MoreTypesJSONEncoder().encode({'day': datetime.date(2014, 3, 30)}),
+            '{"day": "2014-03-30"}'
+        )
+
+        with self.assertRaises(TypeError):
+            MoreTypesJSONEncoder().encode({'nope': object()})
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_get_set(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b', 'nope'), 'nope')
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # Touch ``a``, so ``b`` is the least recently used.
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = LRUCache(maxsize=2, ttl=10, timer=timer)
+        cache.set('a', 1)
+        timer.now = 9
+        self.assertEqual(cache.get('a'), 1)
+        timer.now = 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_delete_clear(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.delete('a')
+        cache.delete('nope')
+        self.assertIsNone(cache.get('a'))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 0)
@@ -0,0 +1,224 @@
+import gzip
+import io
+import unittest
+from wsgiref.util import FileWrapper
+
+from restless.exceptions import NotFound
+from restless.utils import json
+from restless.wsgi import InputStream, WSGIResource
+
+from .fakes import FakeWSGIClient
+
+
+class WsgiTestResource(WSGIResource):
+    fake_db = []
+    http_methods = dict(WSGIResource.http_methods, schema={
+        'GET': 'schema',
+    })
+
+    def __init__(self, *args, **kwargs):
+        super(WsgiTestResource, self).__init__(*args, **kwargs)
+        self.__class__.fake_db = [
+            {"id": 'dead-beef', "title": 'First post'},
+            {"id": 'de-faced', "title": 'Another'},
+        ]
+
+    def is_authenticated(self):
+        return True
+
+    def list(self):
+        return self.fake_db
+
+    def detail(self, pk):
+        for item in self.fake_db:
+            if item['id'] == pk:
+                return item
+
+        raise NotFound('Model with pk {} not found.'.format(pk))
+
+    def create(self):
+        self.fake_db.append(self.data)
+        return self.data
+
+    def delete(self, pk):
+        # Never touches the body.
+        self.fake_db = [item for item in self.fake_db if item['id'] != pk]
+
+    def schema(self):
+        return {'fields': self.request_param('fields', 'all')}
+
+
+class WsgiExportResource(WsgiTestResource):
+    def serialize_list(self, data):
+        # A pre-rendered export.
+        return io.BytesIO(b'id,title\n' * 10)
+
+
+class WSGIResourceTestCase(unittest.TestCase):
+    def setUp(self):
+        super(WSGIResourceTestCase, self).setUp()
+        self.client = FakeWSGIClient(WsgiTestResource.as_app('/posts/'))
+
+    def test_list(self):
+        resp = self.client.request('GET', '/posts/')
+        self.assertEqual(resp.status, '200 OK')
+        self.assertEqual(resp.headers['Content-Type'], 'application/json')
+        self.assertEqual(resp.headers['Content-Length'], str(len(resp.body)))
+        self.assertEqual(json.loads(resp.body), {
+            'objects': [
+                {"id": 'dead-beef', "title": 'First post'},
+                {"id": 'de-faced', "title": 'Another'},
+            ],
+        })
+
+    def test_detail(self):
+        resp = self.client.request('GET', '/posts/de-faced/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(resp.body)['title'], 'Another')
+
+        resp = self.client.request('GET', '/posts/nope/')
+        self.assertEqual(resp.status, '404 Not Found')
+        self.assertEqual(json.loads(resp.body), {
+            'error': 'Model with pk nope not found.',
+        })
+
+    def test_custom(self):
+        resp = self.client.request('GET', '/posts/schema/', query_string='fields=id')
+        self.assertEqual(json.loads(resp.body), {'fields': 'id'})
+
+    def test_not_found(self):
+        for path in ('/', '/postsx/', '/posts/de-faced/comments/'):
+            resp = self.client.request('GET', path)
+            self.assertEqual(resp.status_code, 404)
+
+    def test_not_allowed(self):
+        resp = self.client.request('PATCH', '/posts/')
+        self.assertEqual(resp.status, '405 Method Not Allowed')
+        self.assertEqual(resp.headers['Allow'], 'GET, POST, PUT, DELETE')
+
+    def test_create(self):
+        body = json.dumps({'id': 'bad-f00d', 'title': 'Last'}).encode('utf-8')
+        resp = self.client.request(
+            'POST',
+            '/posts/',
+            body=body + b'trailing garbage',
+            CONTENT_LENGTH=str(len(body))
+        )
+        self.assertEqual(resp.status, '201 Created')
+        self.assertEqual(json.loads(resp.body), {'id': 'bad-f00d', 'title': 'Last'})
+
+    def test_chunked_body(self):
+        body = json.dumps({'id': 'bad-f00d', 'title': 'Last'}).encode('utf-8')
+
+        # The server has de-chunked it & ends the stream with the body.
+        resp = self.client.request(
+            'POST',
+            '/posts/',
+            body=body,
+            headers={'Transfer-Encoding': 'chunked'},
+            CONTENT_LENGTH='',
+            **{'wsgi.input_terminated': True}
+        )
+        self.assertEqual(resp.status, '201 Created')
+        self.assertEqual(json.loads(resp.body), {'id': 'bad-f00d', 'title': 'Last'})
+
+        # Otherwise, there's no telling where it ends.
+        resp = self.client.request(
+            'POST',
+            '/posts/',
+            body=body,
+            headers={'Transfer-Encoding': 'chunked'},
+            CONTENT_LENGTH=''
+        )
+        self.assertEqual(resp.status, '411 Length Required')
+
+    def test_invalid_content_length(self):
+        resp = self.client.request('POST', '/posts/', CONTENT_LENGTH='nope')
+        self.assertEqual(resp.status, '400 Bad Request')
+        self.assertEqual(json.loads(resp.body), {'error': 'Invalid Content-Length.'})
+
+    def test_lazy_body(self):
+        class ExplodingInput(object):
+            def read(self, size=-1):
+                raise AssertionError('The body was read')
+
+        # Without a body, ``wsgi.input`` is left alone.
+        resp = self.client.request(
+            'DELETE',
+            '/posts/dead-beef/',
+            **{'wsgi.input': ExplodingInput()}
+        )
+        self.assertEqual(resp.status, '204 No Content')
+        self.assertEqual(resp.body, b'')
+
+    def test_as_view(self):
+        client = FakeWSGIClient(WsgiTestResource.as_detail())
+        resp = client.request(
+            'GET',
+            '/',
+            **{'wsgiorg.routing_args': ((), {'pk': 'dead-beef'})}
+        )
+        self.assertEqual(json.loads(resp.body)['title'], 'First post')
+
+    def test_streaming(self):
+        class StreamingResource(WsgiTestResource):
+            streaming = True
+            stream_chunk_size = 1
+
+        client = FakeWSGIClient(StreamingResource.as_app())
+        resp = client.request('GET', '/')
+        self.assertNotIn('Content-Length', resp.headers)
+        self.assertNotIsInstance(resp.result, list)
+        self.assertEqual(len(json.loads(resp.body)['objects']), 2)
+
+    def test_file_wrapper(self):
+        client = FakeWSGIClient(WsgiExportResource.as_app())
+        resp = client.request('GET', '/', **{'wsgi.file_wrapper': FileWrapper})
+        self.assertIsInstance(resp.result, FileWrapper)
+        self.assertEqual(resp.body, b'id,title\n' * 10)
+
+        # Without one, the file's read a block at a time.
+        class SmallBlocksResource(WsgiExportResource):
+            file_block_size = 4
+
+        resp = FakeWSGIClient(SmallBlocksResource.as_app()).request('GET', '/')
+        self.assertEqual(resp.body, b'id,title\n' * 10)
+
+    def test_file_compressed(self):
+        class CompressedExportResource(WsgiExportResource):
+            compress = True
+            compress_min_size = 0
+
+        client = FakeWSGIClient(CompressedExportResource.as_app())
+        resp = client.request(
+            'GET',
+            '/',
+            headers={'Accept-Encoding': 'gzip'},
+            **{'wsgi.file_wrapper': FileWrapper}
+        )
+        self.assertNotIsInstance(resp.result, FileWrapper)
+        self.assertEqual(resp.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual(gzip.decompress(resp.body), b'id,title\n' * 10)
+
+        # Not negotiated, the file's still sent as-is (varying all the same).
+        resp = client.request('GET', '/', **{'wsgi.file_wrapper': FileWrapper})
+        self.assertIsInstance(resp.result, FileWrapper)
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual(resp.body, b'id,title\n' * 10)
+
+    def test_input_stream(self):
+        stream = InputStream(io.BytesIO(b'abcdefgh'), 5)
+        self.assertEqual(stream.read(2), b'ab')
+        self.assertEqual(stream.read(), b'cde')
+        self.assertEqual(stream.read(), b'')
+
+        stream = InputStream(io.BytesIO(b'abc'), 5)
+        self.assertEqual(stream.read(), b'abc')
+        self.assertEqual(stream.read(), b'')
+
+        stream = InputStream(io.BytesIO(b'abcdefgh'), None)
+        self.assertEqual(stream.read(2), b'ab')
+        self.assertEqual(stream.read(), b'cdefgh')
+        self.assertEqual(stream.read(), b'')